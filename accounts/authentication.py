@@ -0,0 +1,62 @@
+"""
+Autenticação por token com cache.
+
+O TokenAuthentication do DRF consulta Token JOIN usuário a cada
+requisição. CachedTokenAuthentication guarda o token (com o usuário já
+carregado) no cache por AUTH_TOKEN_CACHE_TIMEOUT segundos. A chave usa o
+hash do token, que nunca é gravado em claro no cache.
+
+As entradas são removidas do cache quando o token é excluído (logout) e
+quando o usuário é salvo (troca de senha, desativação, edição do perfil);
+ver accounts.signals. A revogação só é imediata em todos os workers com
+um cache compartilhado (Redis, Memcached): com um cache por processo, os
+outros workers continuariam aceitando o token revogado até o TTL. Por
+isso o cache fica desligado por padrão sem CACHE_SHARED, e o system check
+accounts.W001 avisa se ele for ligado assim.
+
+Alterações feitas com QuerySet.update() não disparam sinais e só valem
+para requisições já autenticadas após o TTL.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_KEY = 'accounts:token:{digest}'
+
+
+def token_cache_key(key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return TOKEN_KEY.format(digest=digest)
+
+
+def invalidate_tokens(keys):
+    """
+    Remove os tokens do cache agora e novamente após o commit, para que
+    uma requisição concorrente não guarde o estado anterior à transação.
+    """
+    cache_keys = [token_cache_key(key) for key in keys]
+    if not cache_keys:
+        return
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        timeout = settings.AUTH_TOKEN_CACHE_TIMEOUT
+        if timeout <= 0:
+            return super().authenticate_credentials(key)
+
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is not None:
+            return (token.user, token)
+
+        # Falhas (token inválido, usuário inativo) não são guardadas
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, token, timeout)
+        return (user, token)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, Tags.security)
+def check_token_cache(app_configs, **kwargs):
+    """
+    Sem um cache compartilhado, um token revogado continua válido nos
+    outros workers até o fim do TTL.
+    """
+    if (settings.AUTH_TOKEN_CACHE_TIMEOUT <= 0 or settings.CACHE_SHARED
+            or settings.DEBUG):
+        return []
+    return [Warning(
+        'AUTH_TOKEN_CACHE_TIMEOUT requires a cache shared by all workers.',
+        hint='With a per-process cache (e.g. LocMemCache) a revoked token '
+             'or deactivated user is still accepted by other workers for up '
+             'to AUTH_TOKEN_CACHE_TIMEOUT seconds. Use a shared '
+             'CACHE_BACKEND such as Redis or Memcached, or set '
+             'AUTH_TOKEN_CACHE_TIMEOUT=0.',
+        id='accounts.W001',
+    )]
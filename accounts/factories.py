@@ -0,0 +1,11 @@
+import factory
+from django.contrib.auth import get_user_model
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = get_user_model()
+        skip_postgeneration_save = True
+
+    email = factory.Sequence(lambda n: f'user{n}@example.com')
+    password = factory.PostGenerationMethodCall('set_unusable_password')
@@ -1,3 +1,136 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from . import checks
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+PROFILE_URL = reverse('user_profile')
+
+
+@pytest.fixture(autouse=True)
+def token_cache(settings):
+    # Desligado por padrão sem um cache compartilhado
+    settings.AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='token@example.com', password='OldPass#2024')
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def api_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def auth_queries(client):
+    """Consultas feitas na autenticação de um GET do perfil"""
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(PROFILE_URL)
+    assert response.status_code == 200
+    return [q['sql'] for q in ctx.captured_queries
+            if 'authtoken_token' in q['sql']]
+
+
+def test_token_is_cached_after_first_request(api_client, user):
+    assert len(auth_queries(api_client)) == 1
+    assert auth_queries(api_client) == []
+
+    response = api_client.get(PROFILE_URL)
+    assert response.json()['email'] == user.email
+
+
+def test_invalid_token_is_rejected():
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Token invalido')
+    assert client.get(PROFILE_URL).status_code == 401
+    assert client.get(PROFILE_URL).status_code == 401
+
+
+def test_logout_invalidates_token(api_client):
+    auth_queries(api_client)
+
+    response = api_client.post(reverse('rest_logout'))
+    assert response.status_code == 200
+    assert api_client.get(PROFILE_URL).status_code == 401
+
+
+def test_token_delete_invalidates(api_client, token):
+    auth_queries(api_client)
+    token.delete()
+    assert api_client.get(PROFILE_URL).status_code == 401
+
+
+def test_deactivation_invalidates(api_client, user):
+    auth_queries(api_client)
+    user.is_active = False
+    user.save()
+    assert api_client.get(PROFILE_URL).status_code == 401
+
+
+def test_user_delete_invalidates(api_client, user):
+    auth_queries(api_client)
+    user.delete()
+    assert api_client.get(PROFILE_URL).status_code == 401
+
+
+def test_profile_update_refreshes_cached_user(api_client):
+    auth_queries(api_client)
+
+    response = api_client.patch(PROFILE_URL, {'first_name': 'Maria'},
+                                format='json')
+    assert response.status_code == 200
+    assert len(auth_queries(api_client)) == 1
+    assert api_client.get(PROFILE_URL).json()['first_name'] == 'Maria'
+
+
+def test_password_change_invalidates(api_client, user):
+    auth_queries(api_client)
+
+    response = api_client.post(reverse('change_password'), {
+        'current_password': 'OldPass#2024',
+        'new_password': 'NewPass#2025',
+        'confirm_password': 'NewPass#2025',
+    }, format='json')
+    assert response.status_code == 200
+    assert len(auth_queries(api_client)) == 1
+
+    # A senha nova vale para o usuário vindo do cache recarregado
+    response = api_client.post(reverse('change_password'), {
+        'current_password': 'NewPass#2025',
+        'new_password': 'OtherPass#2026',
+        'confirm_password': 'OtherPass#2026',
+    }, format='json')
+    assert response.status_code == 200
+
+
+@override_settings(AUTH_TOKEN_CACHE_TIMEOUT=0)
+def test_cache_disabled(api_client):
+    assert len(auth_queries(api_client)) == 1
+    assert len(auth_queries(api_client)) == 1
+
+
+def test_check_warns_without_shared_cache(settings):
+    settings.CACHE_SHARED = False
+    settings.DEBUG = False
+    assert [error.id for error in checks.check_token_cache(None)] == [
+        'accounts.W001']
+
+    settings.CACHE_SHARED = True
+    assert checks.check_token_cache(None) == []
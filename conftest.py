@@ -0,0 +1,108 @@
+import difflib
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+QUERY_BUDGET_SIZES = (1, 10, 100)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # O LocMemCache sobrevive entre testes; ids reaproveitados pelo banco
+    # de teste poderiam encontrar respostas de outro teste
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def normalize_sql(sql):
+    """SQL sem literais, para comparar consultas entre execuções."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    return re.sub(r'IN \((?:\?, )*\?\)', 'IN (...)', sql)
+
+
+def assert_constant_queries(request, seed, sizes=QUERY_BUDGET_SIZES,
+                            status=200, prepare=None):
+    """
+    Garante que `request()` faz o mesmo número de consultas com 1, 10 e
+    100 linhas relacionadas.
+
+    `seed(n)` deve criar mais `n` linhas (ou itens do corpo de uma
+    escrita), de modo que o total acompanhe `sizes`; `request()` faz a
+    requisição e retorna a resposta, que deve ter o `status` indicado.
+    `prepare()`, se dada, roda antes de cada requisição, fora da contagem
+    (ex: recriar as linhas que a requisição exclui). Quando o número de
+    consultas cresce, o teste falha com o diff do SQL capturado entre o
+    menor e o maior volume. Retorna o número de consultas.
+    """
+    captured = {}
+    total = 0
+    for size in sizes:
+        seed(size - total)
+        total = size
+        if not captured:
+            # Aquece caches do processo (ContentType, versões, etc.)
+            if prepare is not None:
+                prepare()
+            request()
+        if prepare is not None:
+            prepare()
+        with CaptureQueriesContext(connection) as ctx:
+            response = request()
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        assert response.status_code == status, (
+            f'{size} rows: status {response.status_code}')
+        captured[size] = [query['sql'] for query in ctx.captured_queries]
+
+    base_size = sizes[0]
+    base = captured[base_size]
+    for size in sizes[1:]:
+        if len(captured[size]) != len(base):
+            diff = difflib.unified_diff(
+                [normalize_sql(sql) for sql in base],
+                [normalize_sql(sql) for sql in captured[size]],
+                fromfile=f'{base_size} rows: {len(base)} queries',
+                tofile=f'{size} rows: {len(captured[size])} queries',
+                lineterm='')
+            pytest.fail(
+                'Query count grows with the number of rows:\n'
+                + '\n'.join(diff), pytrace=False)
+    return len(base)
+
+
+@pytest.fixture
+def query_budget(settings):
+    """
+    assert_constant_queries com os caches de resposta desligados, para que
+    toda requisição chegue ao banco.
+    """
+    settings.FINANCE_CACHE_ENABLED = False
+    return assert_constant_queries
+
+
+@pytest.fixture
+def user():
+    from accounts.factories import UserFactory
+    return UserFactory()
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def api_get(api_client):
+    """
+    Requisições GET para o query_budget:
+    `api_get(url, page_size=200)` retorna a função que faz a requisição.
+    """
+    return lambda url, **params: lambda: api_client.get(url, params)
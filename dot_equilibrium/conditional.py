@@ -0,0 +1,86 @@
+"""
+GET condicional (ETag / If-None-Match) para leituras por usuário.
+
+O validador é derivado da versão dos dados do usuário no app (ver
+dot_equilibrium.versioning), da URL completa e do Accept da requisição,
+então é calculado sem consultar o banco nem serializar a resposta.
+
+Como a versão fica no cache, o ETag só é confiável com um cache
+compartilhado por todos os workers; com CONDITIONAL_GET_ENABLED desligado
+(padrão sem CACHE_SHARED) as respostas saem sem ETag.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versioning
+
+
+def compute_etag(request, namespace):
+    user_id = request.user.pk
+    version = versioning.get_data_version(namespace, user_id)
+    raw = ':'.join([
+        namespace, str(user_id), str(version), request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ])
+    return 'W/"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Comparação fraca: ignora o prefixo W/ dos dois lados
+    opaque = etag.removeprefix('W/')
+    return any(
+        tag == '*' or tag.removeprefix('W/') == opaque
+        for tag in parse_etags(header)
+    )
+
+
+def conditional_response(request, namespace, build_response):
+    """
+    Responde 304 se o cliente já tem a versão atual; caso contrário
+    constrói a resposta com `build_response()` e anexa o ETag.
+    """
+    if not settings.CONDITIONAL_GET_ENABLED:
+        return build_response()
+
+    etag = compute_etag(request, namespace)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build_response()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_per_user(namespace):
+    """Decorator de GET condicional para function views de leitura."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return conditional_response(
+                request, namespace,
+                lambda: view_func(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+class ConditionalListMixin:
+    """GET condicional na listagem do viewset."""
+    version_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.version_namespace,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs))
@@ -0,0 +1,102 @@
+"""
+Campos esparsos (?fields= / ?omit=) nas leituras dos viewsets.
+
+`fields` lista os campos desejados e `omit` os que devem ser removidos,
+separados por vírgula. Além de remover os campos do serializer, o
+queryset é restrito com .only() às colunas necessárias, e os viewsets
+podem consultar `wants(campo)` para não calcular anotações ou prefetches
+de campos que não serão exibidos.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _split(value):
+    if value is None:
+        return None
+    # Parâmetro vazio (?fields=) equivale a não informar o parâmetro
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    return names or None
+
+
+class SparseFieldsMixin:
+    # Atributos do modelo lidos por campos que não são colunas (properties,
+    # get_FOO_display...). Campos calculados fora deste mapa impedem o
+    # uso do .only(), já que suas dependências não são conhecidas.
+    sparse_field_dependencies = {}
+
+    def requested_fields(self):
+        """Retorna (fields, omit) da requisição; None se ausentes ou vazios."""
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None, None
+        params = request.query_params
+        return _split(params.get(FIELDS_PARAM)), _split(
+            params.get(OMIT_PARAM))
+
+    def is_sparse(self):
+        return self.requested_fields() != (None, None)
+
+    def wants(self, name):
+        """Indica se o campo será exibido na resposta."""
+        fields, omit = self.requested_fields()
+        return ((fields is None or name in fields)
+                and (omit is None or name not in omit))
+
+    def selected_fields(self, available):
+        """Filtra os nomes disponíveis, mantendo a ordem do serializer."""
+        fields, omit = self.requested_fields()
+        if fields is None and omit is None:
+            return list(available)
+        unknown = ((fields or set()) | (omit or set())) - set(available)
+        if unknown:
+            raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return [name for name in available if self.wants(name)]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.is_sparse():
+            target = getattr(serializer, 'child', serializer)
+            keep = set(self.selected_fields(list(target.fields)))
+            for name in list(target.fields):
+                if name not in keep:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_sparse():
+            columns = self.sparse_columns(queryset.model)
+            if columns is not None:
+                queryset = queryset.only(*columns)
+        return queryset
+
+    def sparse_columns(self, model):
+        """
+        Colunas lidas para os campos selecionados, ou None se algum campo
+        selecionado depender de atributos desconhecidos.
+        """
+        serializer_fields = self.get_serializer_class()().fields
+        columns = {model._meta.pk.name}
+        for name in self.selected_fields(list(serializer_fields)):
+            if name in self.sparse_field_dependencies:
+                columns.update(self.sparse_field_dependencies[name])
+                continue
+            try:
+                field = model._meta.get_field(serializer_fields[name].source)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.many_to_many:
+                return None
+            columns.add(field.name)
+
+        # Campos usados pela paginação por cursor
+        ordering = getattr(self.pagination_class, 'ordering', ())
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        columns.update(field.lstrip('-') for field in ordering)
+        return columns
@@ -0,0 +1,261 @@
+"""
+Métricas por requisição: consultas, tempo de banco, de serialização e de
+renderização.
+
+InstrumentationMiddleware (ativado com INSTRUMENTATION_ENABLED) mede cada
+requisição, devolve as medidas no cabeçalho Server-Timing, grava uma
+linha de log em JSON e acumula agregados por rota neste processo,
+consultáveis em `route_stats`. Desativado, o middleware é removido da
+cadeia na inicialização (MiddlewareNotUsed) e não custa nada.
+
+Em respostas em fluxo (StreamingHttpResponse), o conteúdo é gerado
+depois que o middleware retorna; a medição continua durante a iteração e
+o log e os agregados são gravados quando ela termina. Como os cabeçalhos
+já foram enviados nesse ponto, essas respostas não têm Server-Timing.
+
+O tempo de serialização só é medido nos viewsets com
+InstrumentedViewMixin; consultas feitas durante a serialização (relações
+carregadas sob demanda) contam também no tempo de banco.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('instrumentation_metrics', default=None)
+
+TIMINGS = ('db', 'serialize', 'render', 'total')
+
+
+class RequestMetrics:
+    """Medidas de uma requisição; tempos em segundos"""
+
+    def __init__(self):
+        self.queries = 0
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        self.serializer_used = False
+        self._render_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.timings['db'] += time.perf_counter() - start
+
+    def add_time(self, name, seconds):
+        self.timings[name] += seconds
+
+    def start_render(self):
+        self._render_start = time.perf_counter()
+
+    def end_render(self, response):
+        if self._render_start is not None:
+            self.add_time('render', time.perf_counter() - self._render_start)
+            self._render_start = None
+
+    def as_dict(self):
+        data = {'queries': self.queries}
+        for name, seconds in self.timings.items():
+            if name != 'serialize' or self.serializer_used:
+                data[f'{name}_ms'] = round(seconds * 1000, 3)
+        return data
+
+    def server_timing(self):
+        parts = [f'db;dur={self.timings["db"] * 1000:.2f};'
+                 f'desc="{self.queries} queries"']
+        for name in TIMINGS[1:]:
+            if name != 'serialize' or self.serializer_used:
+                parts.append(f'{name};dur={self.timings[name] * 1000:.2f}')
+        return ', '.join(parts)
+
+
+def current_metrics():
+    """Medidas da requisição em andamento, ou None se desativado."""
+    return _current.get()
+
+
+@contextmanager
+def measure_queries(metrics):
+    """Conta em `metrics` as consultas feitas em todas as conexões."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+def measure_streaming(response, metrics, finish):
+    """
+    Continua a medição durante a iteração de uma resposta em fluxo e chama
+    `finish()` ao final, inclusive se o cliente desconectar.
+
+    Conteúdo assíncrono (ASGI) não é medido: `finish()` é chamada na hora.
+    """
+    if response.is_async:
+        finish()
+        return
+    content = response.streaming_content
+
+    def stream():
+        try:
+            with measure_queries(metrics):
+                yield from content
+        finally:
+            finish()
+    response.streaming_content = stream()
+
+
+class RouteStats:
+    """Agregados por rota das requisições medidas (por processo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, metrics):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    'count': 0, 'queries': 0, 'max_queries': 0,
+                    **{f'{name}_ms': 0.0 for name in TIMINGS},
+                    'max_total_ms': 0.0,
+                }
+            entry['count'] += 1
+            entry['queries'] += metrics.queries
+            entry['max_queries'] = max(entry['max_queries'], metrics.queries)
+            for name, seconds in metrics.timings.items():
+                entry[f'{name}_ms'] += seconds * 1000
+            entry['max_total_ms'] = max(entry['max_total_ms'],
+                                        metrics.timings['total'] * 1000)
+
+    def snapshot(self):
+        """Totais e médias por rota, das rotas mais lentas no total."""
+        with self._lock:
+            routes = {route: dict(entry)
+                      for route, entry in self._routes.items()}
+        result = {}
+        for route, entry in sorted(routes.items(),
+                                   key=lambda item: -item[1]['total_ms']):
+            count = entry['count']
+            entry['avg_queries'] = round(entry['queries'] / count, 2)
+            for name in TIMINGS:
+                entry[f'{name}_ms'] = round(entry[f'{name}_ms'], 3)
+                entry[f'avg_{name}_ms'] = round(
+                    entry[f'{name}_ms'] / count, 3)
+            entry['max_total_ms'] = round(entry['max_total_ms'], 3)
+            result[route] = entry
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+stats = RouteStats()
+
+
+def route_name(request):
+    """Método e nome da view resolvida, ex: 'GET income-list'."""
+    match = getattr(request, 'resolver_match', None)
+    name = match.view_name if match is not None else 'unresolved'
+    return f'{request.method} {name}'
+
+
+class InstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with measure_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        def finish():
+            metrics.add_time('total', time.perf_counter() - start)
+            self.record(request, response, metrics)
+
+        if response.streaming:
+            measure_streaming(response, metrics, finish)
+        else:
+            finish()
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def record(self, request, response, metrics):
+        route = route_name(request)
+        stats.record(route, metrics)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            **metrics.as_dict(),
+        }))
+
+    def process_template_response(self, request, response):
+        # A renderização (DRF Response, TemplateResponse) acontece logo
+        # após este hook
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.end_render)
+        return response
+
+
+class InstrumentedViewMixin:
+    """Mede o tempo de serialização dos serializers do viewset."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = current_metrics()
+        if metrics is not None:
+            to_representation = serializer.to_representation
+
+            def timed(instance):
+                start = time.perf_counter()
+                try:
+                    return to_representation(instance)
+                finally:
+                    metrics.add_time('serialize',
+                                     time.perf_counter() - start)
+            serializer.to_representation = timed
+            metrics.serializer_used = True
+        return serializer
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def route_stats(request):
+    """
+    Agregados por rota das requisições medidas neste processo
+    GET: Totais, médias e máximos por rota
+    DELETE: Zera os agregados
+    """
+    if request.method == 'DELETE':
+        stats.reset()
+    return Response({
+        'enabled': settings.INSTRUMENTATION_ENABLED,
+        'routes': stats.snapshot(),
+    })
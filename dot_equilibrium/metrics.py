@@ -0,0 +1,410 @@
+"""
+Métricas no formato de exposição de texto do Prometheus, em /metrics.
+
+O registro fica em memória no próprio processo: contadores de requisições
+por grupo de rotas, método e status; histogramas de latência, de tempo de
+banco e de consultas por requisição; e os acertos/falhas dos caches
+registrados com `register_cache`.
+
+Com vários workers (gunicorn), cada processo grava periodicamente um
+snapshot em METRICS_MULTIPROC_DIR e o worker que atende /metrics soma os
+snapshots de todos. O nome do arquivo tem o pid e o instante de início do
+processo, para que um pid reaproveitado não sobrescreva o arquivo de um
+worker encerrado. Os arquivos de workers encerrados são somados a um
+agregado persistente e removidos na coleta, então os contadores não
+diminuem e o diretório não acumula arquivos.
+"""
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, sem gunicorn
+    fcntl = None
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+
+from .instrumentation import (RequestMetrics, measure_queries,
+                              measure_streaming)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Grupos de rotas: prefixo do caminho -> rótulo `group`
+ROUTE_GROUPS = (
+    ('/api/finance/', 'api/finance'),
+    ('/api/payroll/', 'api/payroll'),
+    ('/api/accounts/', 'api/accounts'),
+    ('/api/sync/', 'api/sync'),
+    ('/api/auth/', 'auth'),
+    ('/api-token-auth/', 'auth'),
+    ('/admin/', 'admin'),
+    ('/metrics', 'metrics'),
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Nome -> (tipo, descrição, buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requisições atendidas por grupo, método e status', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Latência das requisições', LATENCY_BUCKETS),
+    'http_request_db_seconds': (
+        'histogram', 'Tempo de banco por requisição', LATENCY_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Consultas ao banco por requisição', QUERY_BUCKETS),
+    'cache_hits_total': ('counter', 'Acertos do cache de respostas', None),
+    'cache_misses_total': ('counter', 'Falhas do cache de respostas', None),
+    'cache_hit_ratio': (
+        'gauge', 'Fração de acertos do cache de respostas', None),
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """Contadores e histogramas deste processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            # (nome, rótulos) -> [contagem por bucket..., soma, total]
+            self._histograms = {}
+
+    def register_cache(self, name, stats):
+        """`stats.snapshot()` deve retornar {'hits': n, 'misses': n}."""
+        self._caches[name] = stats
+
+    def inc(self, name, labels, amount=1):
+        key = (name, _key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, _key(labels))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def snapshot(self):
+        """Estado atual, serializável em JSON."""
+        with self._lock:
+            counters = [[name, list(labels), value]
+                        for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(entry)]
+                          for (name, labels), entry
+                          in self._histograms.items()]
+        for cache_name, stats in self._caches.items():
+            cache_stats = stats.snapshot()
+            labels = [['cache', cache_name]]
+            counters.append(['cache_hits_total', labels, cache_stats['hits']])
+            counters.append(
+                ['cache_misses_total', labels, cache_stats['misses']])
+        return {'counters': counters, 'histograms': histograms}
+
+
+registry = Registry()
+
+
+def register_cache(name, stats):
+    registry.register_cache(name, stats)
+
+
+def route_group(path):
+    for prefix, group in ROUTE_GROUPS:
+        if path.startswith(prefix):
+            return group
+    return 'other'
+
+
+def observe_request(request, response, metrics):
+    labels = {'group': route_group(request.path_info)}
+    registry.inc('http_requests_total', {
+        **labels, 'method': request.method,
+        'status': str(response.status_code)})
+    registry.observe('http_request_duration_seconds', labels,
+                     metrics.timings['total'])
+    registry.observe('http_request_db_seconds', labels, metrics.timings['db'])
+    registry.observe('http_request_db_queries', labels, metrics.queries)
+
+
+# Snapshots por processo
+
+AGGREGATE_FILE = 'metrics-aggregate.json'
+LOCK_FILE = 'metrics.lock'
+SNAPSHOT_FILE = re.compile(r'^metrics-(\d+)-(\d+)\.json$')
+
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+# (pid, nome do arquivo); refeito no processo filho após um fork
+_process = None
+
+
+def snapshot_name():
+    """Arquivo deste processo: metrics-<pid>-<início em ns>.json"""
+    global _process
+    pid = os.getpid()
+    if _process is None or _process[0] != pid:
+        _process = (pid, f'metrics-{pid}-{time.time_ns()}.json')
+    return _process[1]
+
+
+def _write_json(directory, path, data):
+    # Gravação atômica: quem lê nunca vê um arquivo pela metade
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # Processo gravando o arquivo neste momento ou arquivo removido
+        return None
+
+
+def flush(force=False):
+    """
+    Grava o snapshot deste processo em METRICS_MULTIPROC_DIR, no máximo
+    a cada METRICS_FLUSH_INTERVAL segundos (sempre com `force`).
+    """
+    global _last_flush
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    with _flush_lock:
+        _last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        _write_json(directory, os.path.join(directory, snapshot_name()),
+                    registry.snapshot())
+
+
+atexit.register(flush, force=True)
+
+
+def merge(snapshots):
+    """Soma os snapshots: {(nome, rótulos): valor ou lista}."""
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, entry in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(
+                    histograms[key], entry)]
+            else:
+                histograms[key] = list(entry)
+    return counters, histograms
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, mas é de outro usuário
+        return True
+    return True
+
+
+def stale_files(names):
+    """
+    Arquivos de processos encerrados: o pid não existe mais ou há um
+    arquivo mais novo com o mesmo pid (pid reaproveitado).
+    """
+    snapshots = []
+    latest = {}
+    for name in names:
+        match = SNAPSHOT_FILE.match(name)
+        if match:
+            pid, started = int(match[1]), int(match[2])
+            snapshots.append((name, pid, started))
+            latest[pid] = max(latest.get(pid, 0), started)
+    own = snapshot_name()
+    return [
+        name for name, pid, started in snapshots
+        if name != own and (started < latest[pid] or not _pid_alive(pid))
+    ]
+
+
+def merge_stale(directory):
+    """
+    Soma os arquivos de processos encerrados ao agregado e os remove.
+
+    O agregado guarda os nomes somados: se o processo falhar antes de
+    removê-los, a próxima coleta não os soma de novo. Deve ser chamada com
+    o lock do diretório.
+    """
+    stale = stale_files(os.listdir(directory))
+    if not stale:
+        return
+    path = os.path.join(directory, AGGREGATE_FILE)
+    aggregate = _read_json(path) or {'counters': [], 'histograms': []}
+    already_merged = set(aggregate.get('files', ()))
+    snapshots = [aggregate]
+    for name in stale:
+        snapshot = (None if name in already_merged
+                    else _read_json(os.path.join(directory, name)))
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    counters, histograms = merge(snapshots)
+    _write_json(directory, path, {
+        'counters': [[name, list(labels), value]
+                     for (name, labels), value in counters.items()],
+        'histograms': [[name, list(labels), entry]
+                       for (name, labels), entry in histograms.items()],
+        'files': stale,
+    })
+    for name in stale:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def collect():
+    """Snapshot deste processo ou de todos os que gravaram no diretório."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return merge([registry.snapshot()])
+    flush(force=True)
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        # Um worker por vez soma e remove os arquivos encerrados; a leitura
+        # fica no mesmo lock para não ver um arquivo já somado ao agregado
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            merge_stale(directory)
+        snapshots = []
+        for name in sorted(os.listdir(directory)):
+            if name == AGGREGATE_FILE or SNAPSHOT_FILE.match(name):
+                snapshot = _read_json(os.path.join(directory, name))
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+    return merge(snapshots)
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    text = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs)
+    return '{' + text + '}'
+
+
+def render(counters, histograms):
+    """Texto no formato de exposição do Prometheus."""
+    hits, misses = {}, {}
+    for (name, labels), value in counters.items():
+        if name == 'cache_hits_total':
+            hits[labels] = value
+        elif name == 'cache_misses_total':
+            misses[labels] = value
+    gauges = {}
+    for labels in hits.keys() | misses.keys():
+        total = hits.get(labels, 0) + misses.get(labels, 0)
+        gauges[('cache_hit_ratio', labels)] = (
+            hits.get(labels, 0) / total if total else 0.0)
+
+    lines = []
+    for metric, (kind, description, buckets) in METRICS.items():
+        source = {'counter': counters, 'gauge': gauges,
+                  'histogram': histograms}[kind]
+        series = sorted((item for item in source.items()
+                         if item[0][0] == metric), key=lambda item: item[0])
+        if not series:
+            continue
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for (_, labels), value in series:
+            if kind != 'histogram':
+                lines.append(f'{metric}{_format_labels(labels)} {value}')
+                continue
+            # Valores acima do último bucket só entram em +Inf
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    metric, _format_labels(labels, [('le', bound)]),
+                    cumulative))
+            lines.append('{}_bucket{} {}'.format(
+                metric, _format_labels(labels, [('le', '+Inf')]), value[-1]))
+            lines.append(f'{metric}_sum{_format_labels(labels)} {value[-2]}')
+            lines.append(f'{metric}_count{_format_labels(labels)} '
+                         f'{value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        start = time.perf_counter()
+        with measure_queries(metrics):
+            response = self.get_response(request)
+
+        def finish():
+            metrics.add_time('total', time.perf_counter() - start)
+            observe_request(request, response, metrics)
+            flush()
+
+        # Respostas em fluxo são observadas ao fim da iteração
+        if response.streaming:
+            measure_streaming(response, metrics, finish)
+        else:
+            finish()
+        return response
+
+
+def metrics_view(request):
+    """
+    GET /metrics para o Prometheus. Com METRICS_TOKEN, exige o cabeçalho
+    `Authorization: Bearer <token>`.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized\n', status=401,
+                            content_type=CONTENT_TYPE)
+    return HttpResponse(render(*collect()), content_type=CONTENT_TYPE)
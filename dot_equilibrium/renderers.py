@@ -0,0 +1,127 @@
+"""
+Renderer e parser JSON rápidos, com orjson como dependência opcional.
+
+A saída é idêntica, byte a byte, à do JSONRenderer do DRF (separadores
+compactos, UTF-8 sem escapes, U+2028/U+2029 escapados e a mesma
+conversão de datas, Decimal etc. do encoder do DRF). Quando o orjson não
+está instalado, JSON_BACKEND = 'stdlib', ou os dados têm algo que o
+orjson representaria de outra forma, a implementação padrão é usada.
+"""
+import math
+import re
+from decimal import Decimal
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+# Datas e dataclasses passam pelo encoder do DRF, como no json padrão
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+# O orjson escreve floats fora de [1e-4, 1e16) de outra forma que o
+# repr() do Python (ex: 1e16 em vez de 1e+16, 0.00001 em vez de 1e-05).
+# Qualquer trecho com essa forma, mesmo dentro de uma string, faz a
+# resposta ser gerada pelo json padrão. As expressões começam por um
+# literal para que a busca em respostas grandes seja rápida.
+EXPONENT = re.compile(rb'e(?<=[0-9]e)')
+SMALL_FLOAT = re.compile(rb'(?<![0-9.])0\.0000')
+
+
+def has_unsafe_float(content):
+    return EXPONENT.search(content) is not None or (
+        b'0.0000' in content and SMALL_FLOAT.search(content) is not None)
+
+
+def has_non_finite(data):
+    """
+    NaN ou infinito em algum float ou Decimal dos dados. O orjson os
+    escreve como null, enquanto o DRF recusa a resposta com ValueError.
+    """
+    stack = [(data,)]
+    while stack:
+        container = stack.pop()
+        values = (container.values() if isinstance(container, dict)
+                  else container)
+        for value in values:
+            # Os tipos comuns primeiro: a busca percorre a resposta inteira
+            kind = type(value)
+            if kind is str or kind is int or value is None or kind is bool:
+                continue
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+            elif isinstance(value, Decimal) and not value.is_finite():
+                return True
+    return False
+
+
+# O orjson lê inteiros acima de 64 bits como float; corpos com sequências
+# de 19 dígitos ou mais ficam com o json padrão
+DIGITS = bytes.maketrans(b'123456789', b'000000000')
+LONG_NUMBER = b'0' * 19
+
+
+def orjson_enabled():
+    return orjson is not None and settings.JSON_BACKEND == 'orjson'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer do DRF com orjson no caminho comum."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (not orjson_enabled() or indent is not None or self.ensure_ascii
+                or not self.compact):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=encoders.JSONEncoder().default,
+                               option=ORJSON_OPTIONS)
+        except TypeError:
+            # Chaves não-string, inteiros acima de 64 bits, aninhamento
+            # muito profundo...
+            return super().render(data, accepted_media_type, renderer_context)
+        if has_unsafe_float(ret) or (b'null' in ret and has_non_finite(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser do DRF com orjson para corpos UTF-8.
+
+    Se o orjson recusar o documento (surrogates isolados, JSON
+    inválido...) ou ele tiver inteiros grandes, o json padrão decide, com
+    as mesmas mensagens de erro.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not orjson_enabled() or encoding.lower().replace(
+                '-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
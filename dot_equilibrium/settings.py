@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'accounts',
     'finance',
     'payroll',
+    'sync',
     'rest_framework',
     'rest_framework.authtoken',
     'dj_rest_auth',
@@ -54,6 +55,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Removidos da cadeia quando METRICS_ENABLED/INSTRUMENTATION_ENABLED
+    # estão desativados
+    'dot_equilibrium.metrics.MetricsMiddleware',
+    'dot_equilibrium.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -96,12 +101,83 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Reuso de conexões entre requisições, verificadas antes do reuso
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True,
+                                     cast=bool),
+        'OPTIONS': {},
     }
 }
 
+# Pool de conexões do psycopg (requer psycopg[pool] >= 3 no lugar do
+# psycopg2). Substitui as conexões persistentes, incompatíveis com o pool.
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        # Segundos de espera por uma conexão livre
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Em produção com vários workers use um backend compartilhado (ex: Redis),
+# pois o LocMemCache é separado por processo.
+
+CACHE_BACKEND = config(
+    'CACHE_BACKEND',
+    default='django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='dot-equilibrium'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+if CACHE_BACKEND.endswith(('LocMemCache', 'FileBasedCache',
+                           'DatabaseCache')):
+    # Limite de entradas dos backends que o suportam
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+    }
+
+# Se o backend é compartilhado entre os workers (Redis, Memcached, banco).
+# Os caches por processo (LocMemCache) ou por máquina (FileBasedCache)
+# desligam por padrão os recursos que dependem de invalidação entre workers
+CACHE_SHARED = config(
+    'CACHE_SHARED',
+    default=not CACHE_BACKEND.endswith(('LocMemCache', 'FileBasedCache',
+                                        'DummyCache')),
+    cast=bool)
+
+# Tokens de autenticação em cache (segundos); 0 desativa. Só com um cache
+# compartilhado: com um cache por processo o logout e a desativação do
+# usuário só removeriam o token do worker que os atendeu
+AUTH_TOKEN_CACHE_TIMEOUT = config('AUTH_TOKEN_CACHE_TIMEOUT',
+                                  default=60 if CACHE_SHARED else 0,
+                                  cast=int)
+
+# Cache das leituras do finance por usuário. Só é seguro com um cache
+# compartilhado: com um cache por processo, a escrita invalida as respostas
+# apenas no worker que a atendeu e os demais servem dados antigos
+FINANCE_CACHE_ENABLED = config('FINANCE_CACHE_ENABLED',
+                               default=CACHE_SHARED, cast=bool)
+FINANCE_CACHE_TIMEOUT = config('FINANCE_CACHE_TIMEOUT', default=300,
+                               cast=int)
+
+# ETag / If-None-Match nas leituras por usuário. O ETag vem da versão dos
+# dados guardada no cache e, como o cache das leituras, exige um cache
+# compartilhado: senão outro worker responderia 304 com dados antigos
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED',
+                                 default=CACHE_SHARED, cast=bool)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -146,14 +222,84 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         # 'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'dot_equilibrium.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'dot_equilibrium.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Métricas por requisição (Server-Timing, log e agregados por rota)
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=False,
+                                 cast=bool)
+
+# Métricas para o Prometheus em /metrics. Com vários workers, defina um
+# diretório compartilhado; os arquivos de workers encerrados são somados a
+# um agregado e removidos na coleta.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5,
+                                cast=float)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'dot_equilibrium.instrumentation': {
+            'handlers': ['console'],
+            'level': config('INSTRUMENTATION_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
 }
 
+# JSON da API: 'orjson' (usado se instalado) ou 'stdlib'
+JSON_BACKEND = config('JSON_BACKEND', default='orjson')
+
+# Paginação por cursor (keyset) das listagens de transações
+FINANCE_PAGE_SIZE = config('FINANCE_PAGE_SIZE', default=50, cast=int)
+FINANCE_MAX_PAGE_SIZE = config('FINANCE_MAX_PAGE_SIZE', default=500, cast=int)
+
+# Endpoints de escrita em lote de receitas e despesas
+FINANCE_BULK_MAX_ITEMS = config('FINANCE_BULK_MAX_ITEMS', default=1000,
+                                cast=int)
+FINANCE_BULK_BATCH_SIZE = config('FINANCE_BULK_BATCH_SIZE', default=500,
+                                 cast=int)
+
+# Importação de extratos (CSV/OFX): linhas gravadas por lote, máximo de
+# erros listados no relatório e regras de categorização padrão, no
+# formato [{"pattern": regex, "category": slug, "kind": "expense"}]
+FINANCE_IMPORT_BATCH_SIZE = config('FINANCE_IMPORT_BATCH_SIZE', default=500,
+                                   cast=int)
+FINANCE_IMPORT_MAX_ERRORS = config('FINANCE_IMPORT_MAX_ERRORS', default=100,
+                                   cast=int)
+FINANCE_IMPORT_CATEGORY_RULES = []
+
+# Feed de alterações (sync): janela relida antes do token e retenção dos
+# registros de exclusão; tokens mais antigos exigem sync completo
+SYNC_WINDOW_SECONDS = config('SYNC_WINDOW_SECONDS', default=30, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config(
+    'SYNC_TOMBSTONE_RETENTION_DAYS', default=90, cast=int)
+# Máximo de objetos e exclusões por página do feed
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=1000, cast=int)
+# Linhas lidas do banco por vez na exportação
+SYNC_EXPORT_CHUNK_SIZE = config('SYNC_EXPORT_CHUNK_SIZE', default=2000,
+                                cast=int)
+
 REST_AUTH = {
     'LOGIN_SERIALIZER': 'accounts.serializers.CustomLoginSerializer',
     'REGISTER_SERIALIZER': 'accounts.serializers.CustomRegisterSerializer',
@@ -18,6 +18,8 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.authtoken import views
 
+from . import instrumentation, metrics
+
 urlpatterns = [
     # Autenticação e cadastro
     path('api/auth/', include('dj_rest_auth.urls')),
@@ -28,6 +30,12 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/finance/', include('finance.urls')),
     path('api/payroll/', include('payroll.urls')),
+    path('api/sync/', include('sync.urls')),
+
+    # Métricas por rota (administradores)
+    path('api/instrumentation/', instrumentation.route_stats,
+         name='instrumentation-stats'),
+    path('metrics', metrics.metrics_view, name='metrics'),
 
     # Admin
     path('admin/', admin.site.urls),
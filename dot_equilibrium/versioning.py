@@ -0,0 +1,148 @@
+"""
+Versão dos dados de cada usuário, por app.
+
+Cada app registra os modelos que pertencem a um usuário; toda escrita
+nesses modelos incrementa a versão do dono guardada no cache. Caches de
+resposta e validadores de GET condicional usam a versão para saber se os
+dados do usuário mudaram sem consultar o banco.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+VERSION_KEY = '{namespace}:version:{user_id}'
+
+# Modelo -> (namespace, campo que leva ao dono ou None se tiver `user`)
+_registry = {}
+
+# Donos dos objetos pais em exclusão, para que a exclusão em cascata dos
+# filhos não precise de uma consulta por filho
+_deleting = threading.local()
+
+# Invalidações pendentes do bloco batch_invalidations() em andamento
+_batch = threading.local()
+
+
+def get_data_version(namespace, user_id):
+    """
+    Retorna a versão atual dos dados do usuário no app.
+
+    A versão inicial é baseada no relógio, para que uma chave de versão
+    descartada pelo backend nunca volte a um valor já usado.
+    """
+    key = VERSION_KEY.format(namespace=namespace, user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(namespace, user_id):
+    """Marca os dados do usuário no app como alterados."""
+    key = VERSION_KEY.format(namespace=namespace, user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_user(namespace, user_id):
+    """
+    Incrementa a versão do usuário agora e novamente após o commit.
+
+    A segunda vez descarta respostas que outra requisição possa ter
+    guardado com os dados anteriores enquanto a transação estava aberta.
+    """
+    bump_data_version(namespace, user_id)
+    transaction.on_commit(lambda: bump_data_version(namespace, user_id))
+
+
+@contextmanager
+def batch_invalidations():
+    """
+    Agrupa as invalidações disparadas pelos sinais dentro do bloco: cada
+    usuário afetado é invalidado uma única vez ao final, em vez de uma vez
+    por objeto. Deve envolver a escrita dentro da mesma transação.
+    """
+    if getattr(_batch, 'pending', None) is not None:
+        # Bloco aninhado: o externo invalida
+        yield
+        return
+    _batch.pending = set()
+    try:
+        yield
+        for namespace, user_id in _batch.pending:
+            invalidate_user(namespace, user_id)
+    finally:
+        _batch.pending = None
+
+
+def owner_id(instance):
+    """Retorna o id do usuário dono de um objeto de um modelo registrado."""
+    _, parent_field = _registry[type(instance)]
+    if parent_field is None:
+        return instance.user_id
+
+    field = instance._meta.get_field(parent_field)
+    if field.is_cached(instance):
+        parent = getattr(instance, field.name)
+        return parent.user_id if parent is not None else None
+
+    parent_id = getattr(instance, field.attname)
+    key = (field.related_model, parent_id)
+    owners = getattr(_deleting, 'owners', {})
+    if key in owners:
+        return owners[key]
+    return field.related_model.objects.filter(
+        pk=parent_id).values_list('user_id', flat=True).first()
+
+
+def register(namespace, user_models=(), child_models=None):
+    """
+    Registra os modelos de um app e conecta os sinais de invalidação.
+
+    user_models: modelos com o campo `user`.
+    child_models: {modelo: campo do pai} para modelos cujo dono é o
+    usuário do objeto pai.
+    """
+    child_models = child_models or {}
+    for model in user_models:
+        _registry[model] = (namespace, None)
+    for model, parent_field in child_models.items():
+        _registry[model] = (namespace, parent_field)
+        parent = model._meta.get_field(parent_field).related_model
+        pre_delete.connect(_remember_deleted_owner, sender=parent,
+                           dispatch_uid=f'versioning-pre-{parent._meta}')
+        post_delete.connect(_forget_deleted_owner, sender=parent,
+                            dispatch_uid=f'versioning-post-{parent._meta}')
+
+    for model in (*user_models, *child_models):
+        post_save.connect(_invalidate_owner, sender=model)
+        post_delete.connect(_invalidate_owner, sender=model)
+
+
+def _invalidate_owner(sender, instance, **kwargs):
+    user_id = owner_id(instance)
+    if user_id is None:
+        return
+    namespace = _registry[sender][0]
+    pending = getattr(_batch, 'pending', None)
+    if pending is not None:
+        pending.add((namespace, user_id))
+    else:
+        invalidate_user(namespace, user_id)
+
+
+def _remember_deleted_owner(sender, instance, **kwargs):
+    if not hasattr(_deleting, 'owners'):
+        _deleting.owners = {}
+    _deleting.owners[(sender, instance.pk)] = instance.user_id
+
+
+def _forget_deleted_owner(sender, instance, **kwargs):
+    getattr(_deleting, 'owners', {}).pop((sender, instance.pk), None)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Debt, Expense, Income, Objective, RecurringBill
+from .models import (Category, Debt, Expense, Income, MonthlyRollup, Objective,
+                     RecurringBill)
 
 
 @admin.register(Objective)
@@ -46,6 +47,15 @@ class RecurringBillAdmin(admin.ModelAdmin):
     ordering = ('due_day', 'name')
 
 
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'year', 'month', 'category', 'total',
+                    'count')
+    list_filter = ('kind', 'year')
+    readonly_fields = ('user', 'kind', 'year', 'month', 'category', 'total',
+                       'count')
+
+
 admin.site.site_header = "Finance Admin"
 admin.site.site_title = "Finance Admin Portal"
 admin.site.index_title = "Welcome to the Finance Admin Portal"
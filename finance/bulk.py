@@ -0,0 +1,78 @@
+"""
+Escritas em lote de receitas e despesas.
+
+bulk_create, bulk_update e as exclusões em lote não passam pelos
+perform_* do viewset (e bulk_create/bulk_update não disparam sinais),
+então estas funções mantêm por conta própria o MonthlyRollup e a versão
+dos dados do usuário, na mesma transação da escrita.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from dot_equilibrium import versioning
+from sync.signals import batch_tombstones
+
+from . import rollups
+from .cache import NAMESPACE
+
+
+def create(model, user, items):
+    """
+    Insere as receitas/despesas validadas (dicionários de atributos)
+    com bulk_create. Retorna as instâncias criadas, com pk.
+    """
+    objs = [model(user=user, **attrs) for attrs in items]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            objs, batch_size=settings.FINANCE_BULK_BATCH_SIZE)
+        rollups.apply(added=[rollups.contribution(obj) for obj in objs])
+        versioning.invalidate_user(NAMESPACE, user.pk)
+    return objs
+
+
+def update(model, user, changes):
+    """
+    Aplica as alterações validadas com bulk_update.
+
+    changes: lista de (instância, dicionário de atributos). Retorna as
+    instâncias atualizadas.
+    """
+    removed = [rollups.contribution(instance) for instance, _ in changes]
+    now = timezone.now()
+    fields = {'updated_at'}
+    for instance, attrs in changes:
+        for name, value in attrs.items():
+            setattr(instance, name, value)
+        fields.update(attrs)
+        # O bulk_update não passa pelo auto_now
+        instance.updated_at = now
+    instances = [instance for instance, _ in changes]
+
+    with transaction.atomic():
+        model.objects.bulk_update(
+            instances, sorted(fields),
+            batch_size=settings.FINANCE_BULK_BATCH_SIZE)
+        rollups.apply(
+            removed=removed,
+            added=[rollups.contribution(obj) for obj in instances])
+        versioning.invalidate_user(NAMESPACE, user.pk)
+    return instances
+
+
+def delete(queryset):
+    """
+    Exclui as receitas/despesas do queryset. Retorna os ids excluídos.
+
+    A exclusão dispara os sinais de cada objeto (cache e Tombstones), mas
+    os Tombstones são gravados juntos em um único INSERT e a versão de
+    cada usuário é incrementada uma única vez.
+    """
+    with (transaction.atomic(), versioning.batch_invalidations(),
+          batch_tombstones()):
+        instances = list(queryset.select_for_update())
+        rollups.apply(
+            removed=[rollups.contribution(obj) for obj in instances])
+        queryset.model.objects.filter(
+            pk__in=[obj.pk for obj in instances]).delete()
+    return [obj.pk for obj in instances]
@@ -0,0 +1,115 @@
+"""
+Cache das leituras do app finance, por usuário.
+
+As respostas em cache incluem na chave a versão dos dados do usuário (ver
+dot_equilibrium.versioning), incrementada a cada escrita nos modelos do
+finance. Uma escrita torna todas as respostas anteriores do usuário
+inalcançáveis sem precisar apagá-las: elas expiram pelo TTL ou são
+descartadas pelo limite de entradas do backend.
+
+Exige um cache compartilhado por todos os workers (CACHE_SHARED): com um
+cache por processo a versão só muda no worker que atendeu a escrita, e os
+outros continuariam servindo as respostas antigas até o TTL. Por isso
+FINANCE_CACHE_ENABLED fica desligado por padrão com LocMemCache, e o
+system check finance.W001 avisa se ele for ligado assim.
+"""
+import hashlib
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from dot_equilibrium import metrics, versioning
+
+NAMESPACE = 'finance'
+RESPONSE_KEY = 'finance:response:{user_id}:{version}:{path}'
+
+
+class CacheStats:
+    """Contadores de acertos e falhas do cache de respostas (por processo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+stats = CacheStats()
+metrics.register_cache(NAMESPACE, stats)
+
+
+def get_data_version(user_id):
+    """Retorna a versão atual dos dados do usuário no finance."""
+    return versioning.get_data_version(NAMESPACE, user_id)
+
+
+def response_cache_key(request):
+    user_id = request.user.pk
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return RESPONSE_KEY.format(
+        user_id=user_id, version=get_data_version(user_id), path=path)
+
+
+def cached_response(request, build_response):
+    """
+    Devolve a resposta em cache para a requisição ou a constrói com
+    `build_response()` e a guarda, se bem-sucedida.
+    """
+    if not settings.FINANCE_CACHE_ENABLED:
+        return build_response()
+
+    key = response_cache_key(request)
+    data = cache.get(key)
+    if data is not None:
+        stats.record(hit=True)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    stats.record(hit=False)
+    response = build_response()
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout=settings.FINANCE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_per_user(view_func):
+    """Decorator para function views de leitura do finance."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        return cached_response(
+            request, lambda: view_func(request, *args, **kwargs))
+    return wrapper
+
+
+class CachedListMixin:
+    """Serve a listagem do viewset a partir do cache por usuário."""
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    O cache de respostas e o ETag dependem de o incremento de versão de uma
+    escrita ser visto por todos os workers.
+    """
+    if settings.CACHE_SHARED or settings.DEBUG:
+        return []
+    errors = []
+    if settings.FINANCE_CACHE_ENABLED:
+        errors.append(Warning(
+            'FINANCE_CACHE_ENABLED requires a cache shared by all workers.',
+            hint='With a per-process cache (e.g. LocMemCache) other workers '
+                 'keep serving stale responses after a write. Use a shared '
+                 'CACHE_BACKEND such as Redis or Memcached, or disable '
+                 'FINANCE_CACHE_ENABLED.',
+            id='finance.W001',
+        ))
+    if settings.CONDITIONAL_GET_ENABLED:
+        errors.append(Warning(
+            'CONDITIONAL_GET_ENABLED requires a cache shared by all workers.',
+            hint='ETags come from the data version kept in the cache; with a '
+                 'per-process cache another worker may answer 304 Not '
+                 'Modified for changed data. Use a shared CACHE_BACKEND such '
+                 'as Redis or Memcached, or disable CONDITIONAL_GET_ENABLED.',
+            id='finance.W002',
+        ))
+    return errors
@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+
+import factory
+
+from accounts.factories import UserFactory
+
+from .models import (Category, Debt, Expense, Income, Objective,
+                     ObjectiveDeposit, RecurringBill, RecurringBillPayment)
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    name = factory.Sequence(lambda n: f'Categoria {n}')
+
+
+class TransactionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        abstract = True
+
+    user = factory.SubFactory(UserFactory)
+    value = Decimal('100.00')
+    description = 'Lançamento'
+    date = factory.Sequence(lambda n: date(2024, 1 + n % 12, 1 + n % 28))
+    category = factory.SubFactory(CategoryFactory)
+
+
+class IncomeFactory(TransactionFactory):
+    class Meta:
+        model = Income
+
+    title = factory.Sequence(lambda n: f'Receita {n}')
+
+
+class ExpenseFactory(TransactionFactory):
+    class Meta:
+        model = Expense
+
+    title = factory.Sequence(lambda n: f'Despesa {n}')
+
+
+class DebtFactory(TransactionFactory):
+    class Meta:
+        model = Debt
+
+    name = factory.Sequence(lambda n: f'Dívida {n}')
+    due_date = factory.SelfAttribute('date')
+
+
+class RecurringBillFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = RecurringBill
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f'Conta {n}')
+    value = Decimal('150.00')
+    due_day = factory.Sequence(lambda n: 1 + n % 28)
+    category = factory.SubFactory(CategoryFactory)
+
+
+class RecurringBillPaymentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = RecurringBillPayment
+
+    recurring_bill = factory.SubFactory(RecurringBillFactory)
+    year = 2024
+    month = 1
+    status = 'paid'
+    amount_paid = Decimal('150.00')
+
+
+class ObjectiveFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Objective
+
+    user = factory.SubFactory(UserFactory)
+    title = factory.Sequence(lambda n: f'Objetivo {n}')
+    target_value = Decimal('1000.00')
+
+
+class ObjectiveDepositFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ObjectiveDeposit
+
+    objective = factory.SubFactory(ObjectiveFactory)
+    amount = Decimal('10.00')
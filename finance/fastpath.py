@@ -0,0 +1,216 @@
+"""
+Caminho rápido de leitura para as listagens de transações.
+
+Em vez de instanciar os modelos e passar cada objeto pelo ModelSerializer,
+a listagem busca as linhas com .values() e as converte em dicionários com
+conversores pré-compilados por campo, derivados uma única vez dos campos
+do próprio serializer. A saída é idêntica à do serializer: mesma ordem de
+chaves, decimais quantizados e formatados com '{:f}', datas em ISO 8601 e
+datas/horas no fuso e formato configurados no DRF.
+
+Serializers com campos que não podem ser lidos direto de uma coluna
+(SerializerMethodField, serializers aninhados, `source` com pontos...) não
+têm conversor e continuam no caminho normal.
+"""
+import decimal
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+_converters = {}
+
+# Campos cujo valor vindo do banco já é a representação do DRF
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class RowConverter:
+    """Converte linhas de .values() na representação do serializer."""
+
+    def __init__(self, names, sources, converters):
+        self.names = names
+        self.sources = sources
+        self.converters = converters
+        # Campos lidos com .values(); o pk é necessário para a paginação
+        self.columns = tuple(dict.fromkeys(('id', *sources)))
+
+    def subset(self, names):
+        """Conversor restrito aos campos informados (na ordem original)."""
+        keep = set(names)
+        selected = [index for index, name in enumerate(self.names)
+                    if name in keep]
+        return RowConverter(
+            tuple(self.names[index] for index in selected),
+            tuple(self.sources[index] for index in selected),
+            tuple(self.converters[index] for index in selected))
+
+    def bind(self):
+        """Conversores prontos para uma listagem."""
+        return tuple(
+            convert.bind() if hasattr(convert, 'bind') else convert
+            for convert in self.converters
+        )
+
+    def convert(self, row, converters=None):
+        converters = converters or self.bind()
+        return {
+            name: (value if convert is None or value is None
+                   else convert(value))
+            for name, convert, value in zip(
+                self.names, converters,
+                [row[source] for source in self.sources])
+        }
+
+    def convert_many(self, rows):
+        converters = self.bind()
+        return [self.convert(row, converters) for row in rows]
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string',
+                               api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.localize or field.normalize_output or not coerce_to_string:
+        return field.to_representation
+    if field.decimal_places is None:
+        return '{:f}'.format
+
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return '{:f}'.format(value.quantize(
+            exponent, rounding=rounding, context=context))
+    return convert
+
+
+def _date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is not None and output_format.lower() == ISO_8601:
+        return date.isoformat
+    return field.to_representation
+
+
+class _LocalDatetimeConverter:
+    """
+    Mesmo resultado de DateTimeField.to_representation para valores com
+    fuso, sem as verificações genéricas de enforce_timezone. O fuso atual
+    é resolvido uma vez por listagem (ver RowConverter.convert_many).
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self):
+        current_timezone = timezone.get_current_timezone()
+        to_representation = self.field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return to_representation(value)
+            text = value.astimezone(current_timezone).isoformat()
+            if text.endswith('+00:00'):
+                text = text[:-6] + 'Z'
+            return text
+        return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if (output_format is None or output_format.lower() != ISO_8601
+            or hasattr(field, 'timezone') or not settings.USE_TZ):
+        return field.to_representation
+    return _LocalDatetimeConverter(field)
+
+
+def _field_converter(field):
+    """
+    Retorna (suportado, conversor); conversor None significa que o valor
+    do banco é usado como está.
+    """
+    if isinstance(field, serializers.ChoiceField):
+        if all(isinstance(key, str) for key in field.choices):
+            return True, None
+        return True, field.to_representation
+    if isinstance(field, IDENTITY_FIELDS):
+        return True, None
+    if isinstance(field, serializers.DecimalField):
+        return True, _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return True, _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        return True, _date_converter(field)
+    return False, None
+
+
+def build_converter(serializer_class):
+    """Compila o conversor do serializer ou retorna None se não suportado."""
+    model = serializer_class.Meta.model
+    names, sources, converters = [], [], []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and (
+                field.pk_field is not None):
+            return None
+        if '.' in field.source or field.source == '*':
+            return None
+        try:
+            model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        supported, convert = _field_converter(field)
+        if not supported:
+            return None
+        names.append(name)
+        sources.append(field.source)
+        converters.append(convert)
+    return RowConverter(tuple(names), tuple(sources), tuple(converters))
+
+
+def get_converter(serializer_class):
+    """Conversor do serializer, compilado na primeira chamada."""
+    if serializer_class not in _converters:
+        _converters[serializer_class] = build_converter(serializer_class)
+    return _converters[serializer_class]
+
+
+class FastListMixin:
+    """
+    Listagem pelo caminho rápido quando o serializer é suportado.
+
+    Deve ficar depois dos mixins de cache na ordem de herança, para que as
+    respostas continuem passando por eles. Com SparseFieldsMixin, apenas
+    os campos selecionados são lidos e convertidos.
+    """
+
+    def list(self, request, *args, **kwargs):
+        converter = get_converter(self.get_serializer_class())
+        if converter is None:
+            return super().list(request, *args, **kwargs)
+        if hasattr(self, 'selected_fields'):
+            converter = converter.subset(
+                self.selected_fields(converter.names))
+
+        # Campos da ordenação da paginação por cursor
+        ordering = getattr(self.pagination_class, 'ordering', ())
+        columns = dict.fromkeys((
+            *converter.columns,
+            *(field.lstrip('-') for field in ordering)))
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(converter.convert_many(page))
+        return Response(converter.convert_many(queryset))
@@ -0,0 +1,48 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class TransactionFilterBackend(BaseFilterBackend):
+    """
+    Filtra receitas, despesas e dívidas por período e categoria.
+
+    Parâmetros aceitos na query string:
+        date_from: data inicial (inclusiva), formato YYYY-MM-DD
+        date_to: data final (inclusiva), formato YYYY-MM-DD
+        category: id da categoria
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        errors = {}
+
+        date_from = self._parse_date(params, 'date_from', errors)
+        date_to = self._parse_date(params, 'date_to', errors)
+        category = params.get('category')
+        if category and not category.isdigit():
+            errors['category'] = 'Category must be an integer id.'
+
+        if errors:
+            raise ValidationError(errors)
+
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        if category:
+            queryset = queryset.filter(category_id=int(category))
+        return queryset
+
+    @staticmethod
+    def _parse_date(params, name, errors):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            errors[name] = 'Invalid date, use the YYYY-MM-DD format.'
+        return parsed
@@ -0,0 +1,387 @@
+"""
+Importação de extratos bancários (CSV e OFX) em receitas e despesas.
+
+O arquivo é lido em fluxo: os parsers são geradores que produzem uma
+linha por vez e a gravação acontece em lotes de tamanho fixo, então nem o
+arquivo nem as transações lidas ficam inteiros em memória.
+
+Valores negativos viram despesas (com o valor absoluto) e positivos,
+receitas; linhas de valor zero (saldos e lançamentos informativos) não
+são gravadas e aparecem como erro da linha. Linhas que já existem para o
+usuário com a mesma (data, valor, título) são ignoradas, o que torna a
+reimportação de um mesmo extrato segura.
+"""
+import csv
+import io
+import itertools
+import json
+import re
+from collections import Counter, namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Max, Q
+
+from . import bulk
+from .models import Category, Expense, Income
+
+Row = namedtuple('Row', 'number date title value description')
+RowError = namedtuple('RowError', 'number message')
+CategoryRule = namedtuple('CategoryRule', 'pattern category_id kind')
+
+COLUMN_ALIASES = {
+    'date': ('date', 'data', 'data lançamento', 'data lancamento'),
+    'title': ('title', 'titulo', 'título', 'descrição', 'descricao',
+              'description', 'histórico', 'historico', 'lançamento',
+              'lancamento'),
+    'value': ('value', 'valor', 'amount', 'quantia'),
+    'description': ('memo', 'detalhes', 'details', 'observação',
+                    'observacao'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y')
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+OFX_CHUNK_SIZE = 64 * 1024
+CENTS = Decimal('0.01')
+
+TITLE_MAX_LENGTH = Income._meta.get_field('title').max_length
+DESCRIPTION_MAX_LENGTH = Income._meta.get_field('description').max_length
+# Valores a partir deste não cabem no campo `value` (10 dígitos, 2 casas)
+MAX_VALUE = Decimal('1e8')
+
+
+class ImportFormatError(ValueError):
+    """Erro que impede a leitura do arquivo inteiro"""
+
+
+def parse_date(text):
+    text = text.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid date: {text!r}')
+
+
+def parse_value(text):
+    """Aceita '1234.56', '1.234,56', '-45,00' e 'R$ 10,00'."""
+    cleaned = text.strip().replace('R$', '').replace(' ', '')
+    if ',' in cleaned and '.' in cleaned:
+        if cleaned.rfind(',') > cleaned.rfind('.'):
+            cleaned = cleaned.replace('.', '').replace(',', '.')
+        else:
+            cleaned = cleaned.replace(',', '')
+    else:
+        cleaned = cleaned.replace(',', '.')
+    try:
+        value = Decimal(cleaned).quantize(CENTS)
+    except InvalidOperation:
+        raise ValueError(f'Invalid value: {text!r}')
+    if not value.is_finite():
+        raise ValueError(f'Invalid value: {text!r}')
+    if abs(value) >= MAX_VALUE:
+        raise ValueError(f'Value too large: {text!r}')
+    return value
+
+
+def _build_row(number, date_text, title, value_text, description):
+    title = (title or '').strip()
+    if not title:
+        raise ValueError('Missing title')
+    value = parse_value(value_text or '')
+    if not value:
+        raise ValueError(f'Zero value: {value_text!r}')
+    return Row(
+        number=number,
+        date=parse_date(date_text or ''),
+        title=title[:TITLE_MAX_LENGTH],
+        value=value,
+        description=((description or '').strip() or title)[
+            :DESCRIPTION_MAX_LENGTH],
+    )
+
+
+def _map_columns(header):
+    normalized = [name.strip().lower() for name in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    missing = {'date', 'title', 'value'} - set(columns)
+    if missing:
+        raise ImportFormatError(
+            f"Missing CSV columns: {', '.join(sorted(missing))}")
+    return columns
+
+
+def parse_csv(lines):
+    """
+    Gera Row/RowError para cada linha de um CSV com cabeçalho.
+
+    O separador (',' ou ';') é detectado no cabeçalho.
+    """
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    reader = csv.reader(itertools.chain([header], lines),
+                        delimiter=delimiter)
+    columns = _map_columns(next(reader))
+
+    def cell(record, field):
+        index = columns.get(field)
+        return record[index] if index is not None and index < len(
+            record) else None
+
+    for record in reader:
+        if not any(value.strip() for value in record):
+            continue
+        try:
+            yield _build_row(
+                reader.line_num, cell(record, 'date'), cell(record, 'title'),
+                cell(record, 'value'), cell(record, 'description'))
+        except ValueError as exc:
+            yield RowError(reader.line_num, str(exc))
+
+
+def _ofx_tags(chunks):
+    # Só processa o texto até o último '<' lido: o restante pode ser uma
+    # tag ou um valor cortado no limite do bloco
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        cut = buffer.rfind('<')
+        if cut <= 0:
+            continue
+        complete, buffer = buffer[:cut], buffer[cut:]
+        yield from OFX_TAG.finditer(complete)
+    yield from OFX_TAG.finditer(buffer)
+
+
+def parse_ofx(chunks):
+    """
+    Gera Row/RowError para cada <STMTTRN> de um OFX (SGML ou XML).
+
+    `chunks` é um iterável de blocos de texto; as transações são
+    numeradas na ordem do arquivo.
+    """
+    current = None
+    number = 0
+    for match in _ofx_tags(chunks):
+        closing, tag, text = match.groups()
+        tag = tag.upper()
+        if tag == 'STMTTRN':
+            if not closing:
+                current = {}
+                continue
+            if current is None:
+                continue
+            number += 1
+            try:
+                yield _build_row(
+                    number,
+                    _ofx_date(current.get('DTPOSTED', '')),
+                    current.get('NAME') or current.get('MEMO'),
+                    current.get('TRNAMT'),
+                    current.get('MEMO'))
+            except ValueError as exc:
+                yield RowError(number, str(exc))
+            current = None
+        elif current is not None and not closing and text.strip():
+            current[tag] = text.strip()
+
+
+def _ofx_date(text):
+    # DTPOSTED: AAAAMMDD[HHMMSS[.XXX][gmt offset]]
+    try:
+        return datetime.strptime(text[:8], '%Y%m%d').date().isoformat()
+    except ValueError:
+        return text
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+}
+
+
+def guess_format(filename):
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    return extension if extension in PARSERS else None
+
+
+def read_file(binary_file, file_format, encoding='utf-8-sig'):
+    """Abre o arquivo binário como texto e devolve o gerador de linhas."""
+    text = io.TextIOWrapper(binary_file, encoding=encoding,
+                            errors='replace', newline='')
+    if file_format == 'csv':
+        return parse_csv(text)
+    return parse_ofx(iter(lambda: text.read(OFX_CHUNK_SIZE), ''))
+
+
+def compile_rules(rules):
+    """
+    Valida as regras de categorização.
+
+    Cada regra é {"pattern": regex, "category": slug ou nome, "kind":
+    "income"/"expense" (opcional)}; a primeira regra cujo padrão casar com
+    o título define a categoria.
+    """
+    if isinstance(rules, str):
+        try:
+            rules = json.loads(rules)
+        except ValueError:
+            raise ImportFormatError('Invalid category rules')
+    if not isinstance(rules, list) or not all(
+            isinstance(rule, dict) for rule in rules):
+        raise ImportFormatError('Invalid category rules')
+
+    names = {str(rule.get('category', '')) for rule in rules}
+    categories = {}
+    for category in Category.objects.filter(
+            Q(slug__in=names) | Q(name__in=names)):
+        categories[category.slug] = category.pk
+        categories[category.name] = category.pk
+
+    compiled = []
+    for rule in rules:
+        category = str(rule.get('category', ''))
+        if category not in categories:
+            raise ImportFormatError(f'Unknown category: {category}')
+        kind = rule.get('kind')
+        if kind not in (None, 'income', 'expense'):
+            raise ImportFormatError(f'Invalid rule kind: {kind}')
+        try:
+            pattern = re.compile(str(rule.get('pattern', '')), re.IGNORECASE)
+        except re.error:
+            raise ImportFormatError(
+                f"Invalid rule pattern: {rule.get('pattern')}")
+        compiled.append(CategoryRule(pattern, categories[category], kind))
+    return compiled
+
+
+def categorize(rules, kind, title):
+    for rule in rules:
+        if rule.kind in (None, kind) and rule.pattern.search(title):
+            return rule.category_id
+    return None
+
+
+class ImportReport:
+    """Contadores da importação e erros por linha (limitados)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.created = {'income': 0, 'expense': 0}
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, error):
+        self.error_count += 1
+        if len(self.errors) < settings.FINANCE_IMPORT_MAX_ERRORS:
+            self.errors.append({'row': error.number, 'error': error.message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'batches': self.batches,
+            'created': dict(self.created),
+            'duplicates': self.duplicates,
+            'error_count': self.error_count,
+            'errors': list(self.errors),
+        }
+
+
+class _Deduplicator:
+    """
+    Descarta linhas que já existiam para o usuário antes da importação.
+
+    Compara multiconjuntos de (data, valor, título): se o banco tinha duas
+    linhas iguais e o arquivo traz três, só a terceira é gravada. Linhas
+    gravadas pela própria importação (id acima do máximo inicial) não
+    contam, para que transações repetidas no arquivo não se anulem.
+    """
+
+    def __init__(self, model, user):
+        self.queryset = model.objects.filter(user=user)
+        self.max_id = self.queryset.aggregate(
+            max_id=Max('id'))['max_id'] or 0
+        self.used = Counter()
+
+    def filter(self, items):
+        if not items or not self.max_id:
+            return items
+        # Uma consulta por lote, coberta pelo índice (user, date, value,
+        # title)
+        existing = Counter(
+            self.queryset.filter(
+                id__lte=self.max_id,
+                date__gte=min(item['date'] for item in items),
+                date__lte=max(item['date'] for item in items),
+                title__in={item['title'] for item in items},
+            ).values_list('date', 'value', 'title')
+        )
+        kept = []
+        for item in items:
+            key = (item['date'], item['value'], item['title'])
+            if existing[key] > self.used[key]:
+                self.used[key] += 1
+            else:
+                kept.append(item)
+        return kept
+
+
+def import_transactions(user, rows, rules=(), batch_size=None,
+                        progress=None):
+    """
+    Grava as linhas do gerador em lotes de `batch_size`.
+
+    Cada lote é gravado em sua própria transação (ver finance.bulk), de
+    modo que uma importação interrompida pode ser repetida: as linhas já
+    gravadas são reconhecidas como duplicadas. `progress(report)` é
+    chamado após cada lote.
+    """
+    batch_size = batch_size or settings.FINANCE_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    models = {'income': Income, 'expense': Expense}
+    deduplicators = {kind: _Deduplicator(model, user)
+                     for kind, model in models.items()}
+
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+
+        pending = {'income': [], 'expense': []}
+        for row in batch:
+            report.rows += 1
+            if isinstance(row, RowError):
+                report.add_error(row)
+                continue
+            kind = 'expense' if row.value < 0 else 'income'
+            pending[kind].append({
+                'title': row.title,
+                'value': abs(row.value),
+                'description': row.description,
+                'date': row.date,
+                'category_id': categorize(rules, kind, row.title),
+            })
+
+        for kind, items in pending.items():
+            kept = deduplicators[kind].filter(items)
+            report.duplicates += len(items) - len(kept)
+            if kept:
+                bulk.create(models[kind], user, kept)
+                report.created[kind] += len(kept)
+
+        report.batches += 1
+        if progress is not None:
+            progress(report)
+    return report
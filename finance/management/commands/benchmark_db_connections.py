@@ -0,0 +1,142 @@
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from finance.models import Income
+
+BENCHMARK_EMAIL = 'benchmark-db@example.invalid'
+
+
+class Command(BaseCommand):
+    help = ("Mede requisições por segundo na listagem de receitas fechando "
+            "a conexão a cada requisição, com conexões persistentes "
+            "(CONN_MAX_AGE) e com o pool do psycopg 3, quando disponível. "
+            "Requer PostgreSQL; os dados de teste são removidos ao final.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requisições por thread em cada modo')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Requisições simultâneas')
+        parser.add_argument('--rows', type=int, default=20,
+                            help='Receitas do usuário de teste')
+
+    def handle(self, *args, **options):
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql':
+            raise CommandError('Este benchmark requer PostgreSQL')
+
+        modes = {
+            'sem reuso': {'CONN_MAX_AGE': 0, 'pool': None},
+            'persistente': {'CONN_MAX_AGE': 600, 'pool': None},
+        }
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        if is_psycopg3:
+            modes['pool'] = {'CONN_MAX_AGE': 0, 'pool': {
+                'min_size': options['threads'],
+                'max_size': options['threads'],
+            }}
+        else:
+            self.stdout.write('psycopg 3 não instalado: modo pool ignorado')
+
+        original = (settings_dict['CONN_MAX_AGE'],
+                    settings_dict['OPTIONS'])
+        token = self.create_data(options['rows'])
+        try:
+            with override_settings(ALLOWED_HOSTS=['*'],
+                                   FINANCE_CACHE_ENABLED=False,
+                                   AUTH_TOKEN_CACHE_TIMEOUT=0):
+                for name, mode in modes.items():
+                    self.apply_mode(settings_dict, original, mode)
+                    self.run(name, token, options['threads'],
+                             options['requests'])
+        finally:
+            self.apply_mode(settings_dict, original, None)
+            get_user_model().objects.filter(email=BENCHMARK_EMAIL).delete()
+
+    def create_data(self, rows):
+        User = get_user_model()
+        User.objects.filter(email=BENCHMARK_EMAIL).delete()
+        user = User.objects.create_user(email=BENCHMARK_EMAIL, password=None)
+        Income.objects.bulk_create(
+            Income(user=user, title=f'Receita {n}', value=Decimal('10.00'),
+                   description='Benchmark', date=date(2024, 1, 1))
+            for n in range(rows))
+        return Token.objects.create(user=user).key
+
+    @staticmethod
+    def apply_mode(settings_dict, original, mode):
+        """
+        Troca a configuração das próximas conexões; mode None restaura a
+        original. O dicionário é compartilhado pelas conexões de todas as
+        threads.
+        """
+        connections.close_all()
+        connections[DEFAULT_DB_ALIAS].close_pool()
+
+        conn_max_age, options = original
+        if mode is not None:
+            conn_max_age = mode['CONN_MAX_AGE']
+            options = {key: value for key, value in options.items()
+                       if key != 'pool'}
+            if mode['pool']:
+                options['pool'] = mode['pool']
+        settings_dict['CONN_MAX_AGE'] = conn_max_age
+        settings_dict['OPTIONS'] = options
+
+    def run(self, name, token, threads, requests):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        path = reverse('income-list')
+        opened = []
+        errors = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        def worker():
+            try:
+                for _ in range(requests):
+                    environ = factory.get(
+                        path, HTTP_AUTHORIZATION=f'Token {token}').environ
+                    status = []
+                    response = handler(
+                        environ, lambda s, headers: status.append(s))
+                    b''.join(response)
+                    # Dispara request_finished, que fecha ou mantém a
+                    # conexão conforme CONN_MAX_AGE
+                    response.close()
+                    if not status[0].startswith('200'):
+                        errors.append(status[0])
+                        return
+            finally:
+                connections.close_all()
+
+        connection_created.connect(count_connection)
+        try:
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            start = time.perf_counter()
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+
+        if errors:
+            raise CommandError(f'{name}: resposta {errors[0]}')
+        total = threads * requests
+        self.stdout.write(
+            f'{name}: {total} requisições em {elapsed:.2f} s, '
+            f'{total / elapsed:.0f} req/s, {len(opened)} conexões abertas')
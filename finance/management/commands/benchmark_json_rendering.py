@@ -0,0 +1,129 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from dot_equilibrium import renderers
+from finance import fastpath
+from finance.models import Debt, Expense, Income, Objective, ObjectiveDeposit
+from finance.serializers import (DebtSerializer, ExpenseSerializer,
+                                 IncomeSerializer, ObjectiveListSerializer,
+                                 YearlySummarySerializer)
+from finance.summary import build_yearly_summary
+
+
+class Command(BaseCommand):
+    help = ("Compara o JSONRenderer/JSONParser do DRF com os de "
+            "dot_equilibrium.renderers em respostas típicas das finanças "
+            "(listagens, objetivos com depósitos e resumo anual). Os dados "
+            "de teste são criados em uma transação desfeita ao final.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help='Linhas por modelo')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Repetições (vale o melhor tempo)')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson não está instalado')
+        with override_settings(JSON_BACKEND='orjson'), transaction.atomic():
+            user = self.create_rows(options['rows'])
+            for name, payload in self.payloads(user):
+                self.compare(name, payload, options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_rows(self, rows):
+        user = get_user_model().objects.create_user(
+            email='benchmark@example.invalid', password=None)
+        start = date(2020, 1, 1)
+        common = [
+            dict(user=user, value=Decimal(n % 1000) + Decimal('0.99'),
+                 description='Benchmark ção', date=start + timedelta(days=n))
+            for n in range(rows)
+        ]
+        Income.objects.bulk_create(
+            Income(title=f'Receita {n}', **attrs)
+            for n, attrs in enumerate(common))
+        Expense.objects.bulk_create(
+            Expense(title=f'Despesa {n}', **attrs)
+            for n, attrs in enumerate(common))
+        Debt.objects.bulk_create(
+            Debt(name=f'Dívida {n}', due_date=attrs['date'], **attrs)
+            for n, attrs in enumerate(common))
+
+        objectives = Objective.objects.bulk_create(
+            Objective(user=user, title=f'Objetivo {n}', slug=f'bench-{n}',
+                      target_value=Decimal('10000.00'),
+                      deadline=start + timedelta(days=n))
+            for n in range(max(rows // 50, 1)))
+        ObjectiveDeposit.objects.bulk_create(
+            ObjectiveDeposit(objective=objective, amount=Decimal('12.34'))
+            for objective in objectives for _ in range(5))
+        return user
+
+    def payloads(self, user):
+        for model, serializer_class in ((Income, IncomeSerializer),
+                                        (Expense, ExpenseSerializer),
+                                        (Debt, DebtSerializer)):
+            converter = fastpath.get_converter(serializer_class)
+            rows = model.objects.filter(user=user).order_by('-date', '-id')
+            yield model.__name__, {
+                'next': None, 'previous': None,
+                'results': converter.convert_many(
+                    rows.values(*converter.columns)),
+            }
+
+        objectives = Objective.objects.filter(user=user).annotate(
+            deposits_count=Count('deposits'))
+        for objective in objectives:
+            objective.recent_deposits = list(objective.deposits.all()[:3])
+        yield 'Objective', ObjectiveListSerializer(objectives, many=True).data
+
+        yield 'YearlySummary', YearlySummarySerializer(
+            build_yearly_summary(user, 2020)).data
+
+    def compare(self, name, payload, repeat):
+        drf_renderer, fast_renderer = (JSONRenderer(),
+                                       renderers.FastJSONRenderer())
+        body = drf_renderer.render(payload)
+        if fast_renderer.render(payload) != body:
+            raise CommandError(f'{name}: saídas diferentes entre os renderers')
+
+        slow = self.best_time(lambda: drf_renderer.render(payload), repeat)
+        fast = self.best_time(lambda: fast_renderer.render(payload), repeat)
+        self.stdout.write(
+            f'{name} ({len(body) / 1024:.0f} KiB): render DRF '
+            f'{slow * 1000:.2f} ms, rápido {fast * 1000:.2f} ms '
+            f'({slow / fast:.1f}x)')
+
+        drf_parser, fast_parser = JSONParser(), renderers.FastJSONParser()
+
+        def parse(parser):
+            return parser.parse(BytesIO(body))
+
+        if parse(fast_parser) != parse(drf_parser):
+            raise CommandError(f'{name}: leituras diferentes entre os parsers')
+        slow = self.best_time(lambda: parse(drf_parser), repeat)
+        fast = self.best_time(lambda: parse(fast_parser), repeat)
+        self.stdout.write(
+            f'{" " * len(name)} parse DRF {slow * 1000:.2f} ms, '
+            f'rápido {fast * 1000:.2f} ms ({slow / fast:.1f}x)')
+
+    @staticmethod
+    def best_time(func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,91 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from finance import fastpath
+from finance.models import Debt, Expense, Income
+from finance.serializers import (DebtSerializer, ExpenseSerializer,
+                                 IncomeSerializer)
+
+CASES = [
+    (Income, IncomeSerializer),
+    (Expense, ExpenseSerializer),
+    (Debt, DebtSerializer),
+]
+
+
+class Command(BaseCommand):
+    help = ("Compara o ModelSerializer com o caminho rápido (.values() e "
+            "conversores) na serialização das listagens de transações. Os "
+            "dados de teste são criados em uma transação desfeita ao final.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000,
+                            help='Linhas por modelo')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Repetições (vale o melhor tempo)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_rows(options['rows'])
+            for model, serializer_class in CASES:
+                self.compare(model, serializer_class, options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_rows(self, rows):
+        from datetime import date, timedelta
+        from decimal import Decimal
+
+        user = get_user_model().objects.create_user(
+            email='benchmark@example.invalid', password=None)
+        start = date(2020, 1, 1)
+        common = [
+            dict(user=user, value=Decimal(n % 1000) + Decimal('0.99'),
+                 description='Benchmark', date=start + timedelta(days=n))
+            for n in range(rows)
+        ]
+        Income.objects.bulk_create(
+            Income(title=f'Receita {n}', **attrs)
+            for n, attrs in enumerate(common))
+        Expense.objects.bulk_create(
+            Expense(title=f'Despesa {n}', **attrs)
+            for n, attrs in enumerate(common))
+        Debt.objects.bulk_create(
+            Debt(name=f'Dívida {n}', due_date=attrs['date'], **attrs)
+            for n, attrs in enumerate(common))
+
+    def compare(self, model, serializer_class, repeat):
+        converter = fastpath.get_converter(serializer_class)
+        queryset = model.objects.order_by('-date', '-id')
+
+        def serializer_path():
+            return serializer_class(list(queryset), many=True).data
+
+        def fast_path():
+            return converter.convert_many(
+                list(queryset.values(*converter.columns)))
+
+        renderer = JSONRenderer()
+        if renderer.render(serializer_path()) != renderer.render(
+                fast_path()):
+            raise CommandError(
+                f'{model.__name__}: saídas diferentes entre os caminhos')
+
+        slow = self.best_time(serializer_path, repeat)
+        fast = self.best_time(fast_path, repeat)
+        self.stdout.write(
+            f'{model.__name__}: serializer {slow * 1000:.1f} ms, '
+            f'rápido {fast * 1000:.1f} ms ({slow / fast:.1f}x)')
+
+    @staticmethod
+    def best_time(func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import importer
+
+
+class Command(BaseCommand):
+    help = ("Importa um extrato bancário (CSV ou OFX) como receitas e "
+            "despesas de um usuário")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo do extrato')
+        parser.add_argument(
+            '--user', required=True, help='Email do usuário')
+        parser.add_argument(
+            '--format', choices=sorted(importer.PARSERS),
+            help='Formato do arquivo (padrão: extensão)')
+        parser.add_argument(
+            '--encoding', default='utf-8-sig', help='Codificação do arquivo')
+        parser.add_argument(
+            '--rules', help='Arquivo JSON com as regras de categorização')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.FINANCE_IMPORT_BATCH_SIZE,
+            help='Linhas gravadas por lote')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário não encontrado: {options['user']}")
+
+        file_format = options['format'] or importer.guess_format(
+            options['path'])
+        if file_format is None:
+            raise CommandError('Formato não reconhecido; use --format')
+
+        try:
+            rules = settings.FINANCE_IMPORT_CATEGORY_RULES
+            if options['rules']:
+                with open(options['rules'], encoding='utf-8') as rules_file:
+                    rules = rules_file.read()
+            rules = importer.compile_rules(rules)
+
+            with open(options['path'], 'rb') as statement:
+                rows = importer.read_file(
+                    statement, file_format, encoding=options['encoding'])
+                report = importer.import_transactions(
+                    user, rows, rules, batch_size=options['batch_size'],
+                    progress=self.show_progress)
+        except (OSError, LookupError, importer.ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report.errors:
+            self.stdout.write(f"Linha {error['row']}: {error['error']}")
+        if report.error_count > len(report.errors):
+            self.stdout.write(
+                f"... e mais {report.error_count - len(report.errors)} "
+                "erro(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rows} linha(s): {report.created['income']} receita(s) "
+            f"e {report.created['expense']} despesa(s) criadas, "
+            f"{report.duplicates} duplicada(s), {report.error_count} "
+            "erro(s)"))
+
+    def show_progress(self, report):
+        self.stdout.write(
+            f"Lote {report.batches}: {report.rows} linha(s) processada(s)")
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from finance import rollups
+
+
+class Command(BaseCommand):
+    help = ("Recria ou verifica o consolidado mensal (MonthlyRollup) a "
+            "partir das receitas e despesas")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Apenas compara o consolidado com as transações')
+        parser.add_argument(
+            '--user', help='Email do usuário (padrão: todos)')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(
+                    f"Usuário não encontrado: {options['user']}")
+
+        if options['verify']:
+            differences = rollups.verify(user)
+            for key, expected, stored in differences:
+                self.stdout.write(
+                    f"{key}: esperado={expected} gravado={stored}")
+            if differences:
+                raise CommandError(
+                    f"{len(differences)} divergência(s) no consolidado")
+            self.stdout.write(self.style.SUCCESS('Consolidado consistente'))
+            return
+
+        count = rollups.rebuild(user)
+        self.stdout.write(self.style.SUCCESS(
+            f"Consolidado recriado: {count} linha(s)"))
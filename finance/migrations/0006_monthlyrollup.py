@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def populate_rollups(apps, schema_editor):
+    MonthlyRollup = apps.get_model('finance', 'MonthlyRollup')
+    rollups = []
+    for model_name, kind in (('Income', 'income'), ('Expense', 'expense')):
+        model = apps.get_model('finance', model_name)
+        rows = (
+            model.objects
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .values('user', 'year', 'month', 'category')
+            .annotate(total=Sum('value'), count=Count('id'))
+            .order_by()
+        )
+        rollups.extend(
+            MonthlyRollup(
+                user_id=row['user'], kind=kind, year=row['year'],
+                month=row['month'], category_id=row['category'],
+                total=row['total'], count=row['count'])
+            for row in rows
+        )
+    MonthlyRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_debt_finance_deb_user_id_7e389a_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=10)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='finance.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Consolidado Mensal',
+                'verbose_name_plural': 'Consolidados Mensais',
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'year', 'month', 'category'), name='finance_monthlyrollup_unique_period', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
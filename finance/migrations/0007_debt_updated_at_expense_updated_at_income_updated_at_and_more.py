@@ -0,0 +1,73 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_monthlyrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debt',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='income',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='objective',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='objectivedeposit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='recurringbill',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_deb_user_id_754646_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_exp_user_id_0ddfc0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_inc_user_id_e6afb5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='objective',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_obj_user_id_746905_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='objectivedeposit',
+            index=models.Index(fields=['updated_at'], name='finance_obj_updated_83a4f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringbill',
+            index=models.Index(fields=['user', 'updated_at'], name='finance_rec_user_id_654279_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringbillpayment',
+            index=models.Index(fields=['updated_at'], name='finance_rec_updated_6af537_idx'),
+        ),
+    ]
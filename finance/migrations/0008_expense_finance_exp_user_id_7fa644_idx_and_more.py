@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_debt_updated_at_expense_updated_at_income_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date', 'value', 'title'], name='finance_exp_user_id_7fa644_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'date', 'value', 'title'], name='finance_inc_user_id_716a6d_idx'),
+        ),
+    ]
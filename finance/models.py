@@ -1,7 +1,8 @@
 from decimal import Decimal
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DEFERRED, Case, F, Q, Value, When
 from django.utils.text import slugify
 
 
@@ -31,6 +32,19 @@ class Income(models.Model):
     date = models.DateField()
     category = models.ForeignKey(
         'Category', on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Suporte à paginação por cursor ordenada por (date, id); também
+            # atende filtros por (user, date) por ser prefixo do índice.
+            models.Index(fields=['user', 'date', 'id']),
+            models.Index(fields=['user', 'category', 'date']),
+            # Feed de sincronização (alterações desde um instante)
+            models.Index(fields=['user', 'updated_at']),
+            # Detecção de duplicadas na importação de extratos
+            models.Index(fields=['user', 'date', 'value', 'title']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.value}"
@@ -45,6 +59,19 @@ class Expense(models.Model):
     date = models.DateField()
     category = models.ForeignKey(
         'Category', on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Suporte à paginação por cursor ordenada por (date, id); também
+            # atende filtros por (user, date) por ser prefixo do índice.
+            models.Index(fields=['user', 'date', 'id']),
+            models.Index(fields=['user', 'category', 'date']),
+            # Feed de sincronização (alterações desde um instante)
+            models.Index(fields=['user', 'updated_at']),
+            # Detecção de duplicadas na importação de extratos
+            models.Index(fields=['user', 'date', 'value', 'title']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.value}"
@@ -61,6 +88,17 @@ class Debt(models.Model):
     paid = models.BooleanField(default=False)
     category = models.ForeignKey(
         'Category', on_delete=models.SET_NULL, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Suporte à paginação por cursor ordenada por (date, id); também
+            # atende filtros por (user, date) por ser prefixo do índice.
+            models.Index(fields=['user', 'date', 'id']),
+            models.Index(fields=['user', 'category', 'date']),
+            # Feed de sincronização (alterações desde um instante)
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.value}"
@@ -118,6 +156,7 @@ class RecurringBillPayment(models.Model):
         indexes = [
             models.Index(fields=['year', 'month']),
             models.Index(fields=['status']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -128,15 +167,7 @@ class RecurringBillPayment(models.Model):
     @property
     def due_date(self):
         """Calcula a data de vencimento para este período específico."""
-        from datetime import date
-        try:
-            return date(self.year, self.month, self.recurring_bill.due_day)
-        except ValueError:
-            # Para casos onde o dia não existe no mês (ex: 31 de fevereiro)
-            from calendar import monthrange
-            last_day = monthrange(self.year, self.month)[1]
-            due_day = min(self.recurring_bill.due_day, last_day)
-            return date(self.year, self.month, due_day)
+        return self.recurring_bill.get_due_date(self.year, self.month)
 
     @property
     def is_overdue(self):
@@ -195,14 +226,31 @@ class RecurringBill(models.Model):
     deactivated_at = models.DateTimeField(
         null=True, blank=True, help_text="Data em que a conta foi desativada"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Conta Recorrente"
         verbose_name_plural = "Contas Recorrentes"
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - R$ {self.value} (dia {self.due_day})"
 
+    def get_due_date(self, year, month):
+        """
+        Calcula a data de vencimento da conta em um período específico.
+        """
+        from datetime import date
+        try:
+            return date(year, month, self.due_day)
+        except ValueError:
+            # Para casos onde o dia não existe no mês (ex: 31 de fevereiro)
+            from calendar import monthrange
+            last_day = monthrange(year, month)[1]
+            return date(year, month, min(self.due_day, last_day))
+
     def get_payment_for_period(self, year, month):
         """
         Retorna o pagamento para um período específico.
@@ -272,6 +320,28 @@ class RecurringBill(models.Model):
         # Se foi desativada antes do período, não deve aparecer
         return self.deactivated_at.date() > period_start
 
+    def get_active_months(self, year):
+        """
+        Retorna o conjunto de meses do ano em que a conta estava ativa.
+
+        Equivale a chamar `is_active_for_period` para cada mês, mas a data
+        de desativação é avaliada uma única vez para o ano inteiro.
+        """
+        if not self.deactivated_at:
+            return set(range(1, 13)) if self.is_active else set()
+
+        from datetime import date
+        deactivated_on = self.deactivated_at.date()
+        if deactivated_on.year > year:
+            return set(range(1, 13))
+        if deactivated_on.year < year:
+            return set()
+        # Ativa nos meses cujo primeiro dia é anterior à desativação
+        last_month = deactivated_on.month
+        if deactivated_on == date(year, last_month, 1):
+            last_month -= 1
+        return set(range(1, last_month + 1))
+
 
 class Objective(models.Model):
     CATEGORY_CHOICES = [
@@ -298,6 +368,38 @@ class Objective(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     achieved = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Campos cujos valores salvos são lembrados na instância
+    TRACKED_FIELDS = ('achieved',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda os valores vindos do banco para o save comparar o estado
+        # anterior sem precisar de uma nova consulta
+        instance._loaded_values = {
+            name: value for name, value in zip(
+                field_names, (v for v in values if v is not DEFERRED))
+            if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def _remember_saved_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS
+            if name not in deferred
+        }
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_saved_values()
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -306,11 +408,14 @@ class Objective(models.Model):
         # Verificar se objetivo foi recém concluído
         was_achieved = False
         if self.pk:  # Se já existe no banco
-            try:
-                old_obj = Objective.objects.get(pk=self.pk)
-                was_achieved = old_obj.achieved
-            except Objective.DoesNotExist:
-                pass
+            loaded = getattr(self, '_loaded_values', {})
+            if 'achieved' in loaded:
+                was_achieved = loaded['achieved']
+            else:
+                # Instância não carregada do banco (ex: criada com pk)
+                was_achieved = Objective.objects.filter(
+                    pk=self.pk).values_list('achieved', flat=True).first()
+                was_achieved = bool(was_achieved)
 
         # Auto-atualizar achieved baseado no progresso
         if self.current_value >= self.target_value:
@@ -325,6 +430,7 @@ class Objective(models.Model):
                 self.completed_at = None
 
         super().save(*args, **kwargs)
+        self._remember_saved_values()
 
     @property
     def progress_percentage(self):
@@ -354,26 +460,79 @@ class Objective(models.Model):
         """Status baseado no achieved"""
         return 'concluido' if self.achieved else 'ativo'
 
+    def _apply_balance_change(self, delta, condition):
+        """
+        Soma `delta` ao saldo em um único UPDATE atômico.
+
+        A condição e os novos valores de `achieved`/`completed_at` são
+        avaliados pelo banco sobre a linha atual, então depósitos e saques
+        concorrentes não sobrescrevem o saldo um do outro. Retorna False se
+        a condição não for satisfeita.
+
+        Em caso de sucesso, a instância recebe os mesmos valores calculados
+        em memória, sem uma nova leitura. Se outra transação alterou o saldo
+        depois que a instância foi carregada, os valores em memória ficam
+        defasados como em qualquer instância; o banco continua correto.
+        """
+        from django.utils import timezone
+
+        now = timezone.now()
+        reached = Q(current_value__gte=F('target_value') - delta)
+        updated = Objective.objects.filter(condition, pk=self.pk).update(
+            current_value=F('current_value') + delta,
+            # O UPDATE direto não passa pelo auto_now
+            updated_at=now,
+            achieved=Case(
+                When(reached, then=Value(True)),
+                default=Value(False),
+            ),
+            completed_at=Case(
+                # Mesmas regras do save(): data de conclusão definida ao
+                # atingir a meta e removida ao deixar de atingi-la
+                When(reached & Q(achieved=False), then=Value(now)),
+                When(~reached & Q(achieved=True), then=Value(None)),
+                default=F('completed_at'),
+                output_field=models.DateTimeField(),
+            ),
+        )
+        if not updated:
+            return False
+
+        self.current_value += delta
+        achieved = self.current_value >= self.target_value
+        if achieved and not self.achieved:
+            self.completed_at = now
+        elif not achieved and self.achieved:
+            self.completed_at = None
+        self.achieved = achieved
+        self.updated_at = now
+        self._remember_saved_values()
+        return True
+
     def add_deposit(self, amount, description=""):
         """Adiciona um valor ao objetivo"""
         deposit_amount = Decimal(str(amount))
 
-        # Verificar se o depósito não excede o valor restante para a meta
-        remaining = self.remaining_amount
-        if deposit_amount > remaining and remaining > 0:
-            raise ValueError(
-                f"Valor do depósito (R$ {deposit_amount}) excede o valor "
-                f"restante para atingir a meta (R$ {remaining})"
-            )
-
-        self.current_value += deposit_amount
-        self.save()
-
-        # Criar registro do depósito
-        return ObjectiveDeposit.objects.create(
-            objective=self,
-            amount=deposit_amount,
-            description=description
+        # O depósito não pode exceder o valor restante para a meta, exceto
+        # quando a meta já foi atingida
+        within_remaining = (
+            Q(current_value__gte=F('target_value')) |
+            Q(current_value__lte=F('target_value') - deposit_amount)
+        )
+        with transaction.atomic():
+            if self._apply_balance_change(deposit_amount, within_remaining):
+                # Criar registro do depósito
+                deposit = ObjectiveDeposit.objects.create(
+                    objective=self,
+                    amount=deposit_amount,
+                    description=description
+                )
+                return deposit
+
+        self.refresh_from_db(fields=['current_value', 'target_value'])
+        raise ValueError(
+            f"Valor do depósito (R$ {deposit_amount}) excede o valor "
+            f"restante para atingir a meta (R$ {self.remaining_amount})"
         )
 
     def withdraw(self, amount, description=""):
@@ -381,19 +540,20 @@ class Objective(models.Model):
         withdrawal_amount = Decimal(str(amount))
 
         # Verificar se há valor suficiente
-        if withdrawal_amount > self.current_value:
-            raise ValueError(
-                "Valor de saque maior que o valor atual do objetivo"
-            )
-
-        self.current_value -= withdrawal_amount
-        self.save()
-
-        # Criar registro do saque (valor negativo)
-        return ObjectiveDeposit.objects.create(
-            objective=self,
-            amount=-withdrawal_amount,  # Valor negativo para indicar saque
-            description=description or "Saque"
+        enough_balance = Q(current_value__gte=withdrawal_amount)
+        with transaction.atomic():
+            if self._apply_balance_change(-withdrawal_amount, enough_balance):
+                # Criar registro do saque (valor negativo)
+                withdrawal = ObjectiveDeposit.objects.create(
+                    objective=self,
+                    amount=-withdrawal_amount,
+                    description=description or "Saque"
+                )
+                return withdrawal
+
+        self.refresh_from_db(fields=['current_value'])
+        raise ValueError(
+            "Valor de saque maior que o valor atual do objetivo"
         )
 
     def __str__(self):
@@ -407,9 +567,53 @@ class ObjectiveDeposit(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     description = models.TextField(blank=True)
     date_added = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-date_added']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.objective.title} - R$ {self.amount}"
+
+
+class MonthlyRollup(models.Model):
+    """
+    Totais mensais de receitas e despesas por usuário e categoria.
+
+    Mantido incrementalmente pelas escritas de IncomeViewSet e
+    ExpenseViewSet (ver finance.rollups), para que gráficos anuais leiam no
+    máximo 12 x categorias linhas em vez das transações.
+    """
+    KIND_CHOICES = [
+        ('income', 'Receita'),
+        ('expense', 'Despesa'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    category = models.ForeignKey(
+        'Category', on_delete=models.CASCADE, null=True, blank=True)
+    total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Consolidado Mensal"
+        verbose_name_plural = "Consolidados Mensais"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'kind', 'year', 'month', 'category'],
+                name='finance_monthlyrollup_unique_period',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return (f"{self.get_kind_display()} {self.month:02d}/{self.year} - "
+                f"R$ {self.total}")
@@ -0,0 +1,151 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por chave (keyset) sobre o par (campo de ordenação, id).
+
+    Ao contrário da paginação por offset, cada página é obtida com um
+    filtro `(campo, id) < (valor, id)` sobre o índice composto, então o
+    custo não cresce conforme o cliente avança nas páginas. O cursor é
+    opaco para o cliente (base64 de um JSON com a posição).
+    """
+    ordering = ('-date', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.FINANCE_PAGE_SIZE
+        self.max_page_size = settings.FINANCE_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        field_name = self.ordering[0].lstrip('-')
+        cursor = self.decode_cursor(request, queryset.model, field_name)
+
+        if cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = cursor
+
+        # Navegar para trás equivale a inverter a ordenação e depois
+        # devolver os resultados na ordem original.
+        if reverse:
+            order = [self._invert(field) for field in self.ordering]
+        else:
+            order = list(self.ordering)
+        queryset = queryset.order_by(*order)
+
+        if position is not None:
+            value, pk = position
+            descending = order[0].startswith('-')
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field_name}__{lookup}': value}) |
+                Q(**{field_name: value, f'pk__{lookup}': pk})
+            )
+
+        results = list(queryset[:page_size + 1])
+        has_extra = len(results) > page_size
+        results = results[:page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_extra
+        else:
+            self.has_next = has_extra
+            self.has_previous = position is not None
+
+        self.page = results
+        self.field_name = field_name
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True,
+                         'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True,
+                             'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, item, reverse):
+        # Aceita instâncias e linhas de .values() (ver finance.fastpath)
+        if isinstance(item, dict):
+            value, pk = item[self.field_name], item['id']
+        else:
+            value, pk = getattr(item, self.field_name), item.pk
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = json.dumps([value, pk, int(reverse)],
+                             separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model, field_name):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(encoded.encode()).decode()
+            value, pk, reverse = json.loads(payload)
+            value = model._meta.get_field(field_name).to_python(value)
+            pk = int(pk)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), (value, pk)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class DepositPagination(KeysetPagination):
+    """Paginação do histórico de depósitos de um objetivo"""
+    ordering = ('-date_added', '-id')
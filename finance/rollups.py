@@ -0,0 +1,152 @@
+"""
+Manutenção incremental da tabela MonthlyRollup.
+
+Cada receita ou despesa contribui com (valor, 1) para a linha do
+consolidado identificada por (usuário, tipo, ano, mês, categoria). As
+escritas chamam `apply` com as contribuições removidas e adicionadas, na
+mesma transação da alteração da transação financeira.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .models import Expense, Income, MonthlyRollup
+
+KINDS = {
+    Income: 'income',
+    Expense: 'expense',
+}
+
+
+def contribution(instance):
+    """Retorna a chave do consolidado e o valor de uma receita/despesa."""
+    key = (
+        instance.user_id,
+        KINDS[type(instance)],
+        instance.date.year,
+        instance.date.month,
+        instance.category_id,
+    )
+    return key, instance.value
+
+
+def apply(removed=(), added=()):
+    """
+    Aplica ao consolidado as contribuições removidas e adicionadas.
+
+    As variações são somadas por chave antes de gravar, então uma edição
+    que não muda data, categoria nem valor não gera nenhuma escrita.
+    """
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+    for key, value in removed:
+        deltas[key][0] -= value
+        deltas[key][1] -= 1
+    for key, value in added:
+        deltas[key][0] += value
+        deltas[key][1] += 1
+
+    with transaction.atomic():
+        for key, (total, count) in deltas.items():
+            if total or count:
+                _apply_delta(key, total, count)
+
+
+def _apply_delta(key, total, count):
+    user_id, kind, year, month, category_id = key
+    lookup = {
+        'user_id': user_id,
+        'kind': kind,
+        'year': year,
+        'month': month,
+        'category_id': category_id,
+    }
+    delta = {'total': F('total') + total, 'count': F('count') + count}
+    if MonthlyRollup.objects.filter(**lookup).update(**delta):
+        return
+    try:
+        with transaction.atomic():
+            MonthlyRollup.objects.create(total=total, count=count, **lookup)
+    except IntegrityError:
+        # Outra transação criou a linha entre o UPDATE e o INSERT
+        MonthlyRollup.objects.filter(**lookup).update(**delta)
+
+
+def merge_category(category):
+    """Move os totais de uma categoria removida para o grupo sem categoria."""
+    rollups = MonthlyRollup.objects.filter(category=category)
+    with transaction.atomic():
+        for rollup in rollups:
+            _apply_delta(
+                (rollup.user_id, rollup.kind, rollup.year, rollup.month,
+                 None),
+                rollup.total, rollup.count)
+        rollups.delete()
+
+
+def compute(user=None):
+    """Calcula o consolidado a partir das transações, agregando no banco."""
+    expected = {}
+    for model, kind in KINDS.items():
+        queryset = model.objects.all()
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        rows = (
+            queryset
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .values('user', 'year', 'month', 'category')
+            .annotate(total=Sum('value'), count=Count('id'))
+            .order_by()
+        )
+        for row in rows:
+            key = (row['user'], kind, row['year'], row['month'],
+                   row['category'])
+            expected[key] = (row['total'], row['count'])
+    return expected
+
+
+def stored(user=None):
+    """Retorna o consolidado gravado, ignorando linhas zeradas."""
+    queryset = MonthlyRollup.objects.exclude(count=0)
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return {
+        (r.user_id, r.kind, r.year, r.month, r.category_id):
+            (r.total, r.count)
+        for r in queryset
+    }
+
+
+def verify(user=None):
+    """
+    Compara o consolidado gravado com o recalculado.
+
+    Retorna a lista de divergências como (chave, esperado, gravado).
+    """
+    expected = compute(user)
+    current = stored(user)
+    return [
+        (key, expected.get(key), current.get(key))
+        for key in sorted(set(expected) | set(current), key=str)
+        if expected.get(key) != current.get(key)
+    ]
+
+
+def rebuild(user=None):
+    """Recria o consolidado do zero. Retorna a quantidade de linhas."""
+    expected = compute(user)
+    with transaction.atomic():
+        queryset = MonthlyRollup.objects.all()
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        queryset.delete()
+        MonthlyRollup.objects.bulk_create([
+            MonthlyRollup(
+                user_id=user_id, kind=kind, year=year, month=month,
+                category_id=category_id, total=total, count=count)
+            for (user_id, kind, year, month, category_id), (total, count)
+            in expected.items()
+        ], batch_size=1000)
+    return len(expected)
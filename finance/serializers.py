@@ -26,6 +26,16 @@ class ObjectiveSerializer(serializers.ModelSerializer):
         read_only_fields = ('user', 'achieved', 'completed_at')
 
 
+class ObjectiveListSerializer(ObjectiveSerializer):
+    """
+    Representação do objetivo para listagens: em vez do histórico completo
+    de depósitos, traz apenas os mais recentes e a quantidade total.
+    """
+    deposits = None
+    recent_deposits = ObjectiveDepositSerializer(many=True, read_only=True)
+    deposits_count = serializers.IntegerField(read_only=True)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -77,7 +87,109 @@ class RecurringBillSerializer(serializers.ModelSerializer):
             year = request.query_params.get('year')
             month = request.query_params.get('month')
             if year and month:
-                payment = obj.get_payment_for_period(int(year), int(month))
+                if hasattr(obj, 'period_payments'):
+                    # Pagamentos já carregados pelo prefetch do viewset
+                    payments = obj.period_payments
+                    payment = payments[0] if payments else None
+                else:
+                    payment = obj.get_payment_for_period(
+                        int(year), int(month))
                 if payment:
                     return RecurringBillPaymentSerializer(payment).data
         return None
+
+
+class RecurringBillMonthSerializer(serializers.Serializer):
+    """Situação de uma conta recorrente em um mês do ano"""
+    month = serializers.IntegerField()
+    is_active = serializers.BooleanField()
+    status = serializers.CharField(allow_null=True)
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2,
+                                           allow_null=True)
+    paid_date = serializers.DateTimeField(allow_null=True)
+    due_date = serializers.DateField()
+
+
+class RecurringBillYearSerializer(serializers.ModelSerializer):
+    """
+    Conta recorrente com a situação de cada um dos 12 meses de um ano.
+
+    Espera no contexto o `year` e um dicionário `payments` no formato
+    {bill_id: {month: RecurringBillPayment}}, carregado previamente.
+    """
+    months = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecurringBill
+        fields = ('id', 'name', 'description', 'value', 'due_day',
+                  'frequency', 'category', 'is_active', 'deactivated_at',
+                  'months')
+
+    def get_months(self, obj):
+        year = self.context['year']
+        payments = self.context['payments'].get(obj.pk, {})
+        active_months = obj.get_active_months(year)
+
+        months = []
+        for month in range(1, 13):
+            payment = payments.get(month)
+            is_active = month in active_months
+            if not is_active:
+                status = None
+            else:
+                status = payment.status if payment else 'pending'
+            months.append({
+                'month': month,
+                'is_active': is_active,
+                'status': status,
+                'amount_paid': payment.amount_paid if payment else None,
+                'paid_date': payment.paid_date if payment else None,
+                'due_date': obj.get_due_date(year, month),
+            })
+        return RecurringBillMonthSerializer(months, many=True).data
+
+
+class CategoryTotalSerializer(serializers.Serializer):
+    category = serializers.IntegerField(allow_null=True)
+    category_name = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class RecurringBillsSummarySerializer(serializers.Serializer):
+    due_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    paid_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    pending_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class CategoriesSummarySerializer(serializers.Serializer):
+    incomes = CategoryTotalSerializer(many=True)
+    expenses = CategoryTotalSerializer(many=True)
+
+
+class MonthlySummarySerializer(serializers.Serializer):
+    """Resumo financeiro mensal calculado por agregações no banco"""
+    year = serializers.IntegerField()
+    month = serializers.IntegerField()
+    income_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+    unpaid_debt_total = serializers.DecimalField(max_digits=14,
+                                                 decimal_places=2)
+    recurring_bills = RecurringBillsSummarySerializer()
+    categories = CategoriesSummarySerializer()
+
+
+class MonthTotalsSerializer(serializers.Serializer):
+    month = serializers.IntegerField()
+    income_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class YearlySummarySerializer(serializers.Serializer):
+    """Resumo anual lido do consolidado mensal"""
+    year = serializers.IntegerField()
+    income_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    months = MonthTotalsSerializer(many=True)
+    categories = CategoriesSummarySerializer()
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from dot_equilibrium import versioning
+
+from . import rollups
+from .cache import NAMESPACE
+from .models import (Category, Debt, Expense, Income, Objective,
+                     ObjectiveDeposit, RecurringBill, RecurringBillPayment)
+
+# Toda escrita nestes modelos invalida o cache do usuário dono
+versioning.register(
+    NAMESPACE,
+    user_models=(Income, Expense, Debt, RecurringBill, Objective),
+    child_models={
+        RecurringBillPayment: 'recurring_bill',
+        ObjectiveDeposit: 'objective',
+    },
+)
+
+# Modelos que apontam para uma categoria. As categorias não têm dono: uma
+# escrita nelas invalida o cache dos usuários com objetos na categoria
+CATEGORIZED_MODELS = (Income, Expense, Debt, RecurringBill)
+
+
+def invalidate_category_owners(category):
+    owners = set()
+    for model in CATEGORIZED_MODELS:
+        owners.update(
+            model.objects.filter(category=category)
+            .order_by().values_list('user_id', flat=True).distinct())
+    for user_id in owners:
+        versioning.invalidate_user(NAMESPACE, user_id)
+
+
+@receiver(pre_delete, sender=Category)
+def merge_category_rollups(sender, instance, **kwargs):
+    # As transações da categoria passam a ficar sem categoria (SET_NULL),
+    # com um UPDATE direto que não dispara os sinais dos objetos
+    rollups.merge_category(instance)
+    invalidate_category_owners(instance)
+    # O UPDATE também não passa pelo auto_now: marca os objetos como
+    # alterados para que o feed de sync os entregue sem a categoria
+    now = timezone.now()
+    for model in CATEGORIZED_MODELS:
+        model.objects.filter(category=instance).update(updated_at=now)
+
+
+@receiver(post_save, sender=Category)
+def invalidate_renamed_category(sender, instance, created, **kwargs):
+    # O nome da categoria aparece nos resumos em cache
+    if not created:
+        invalidate_category_owners(instance)
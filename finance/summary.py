@@ -0,0 +1,135 @@
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import (Debt, Expense, Income, MonthlyRollup, RecurringBill,
+                     RecurringBillPayment)
+
+ZERO = Decimal('0.00')
+
+
+def _category_totals(model, user, start, end):
+    """Soma os valores do período agrupados por categoria (uma consulta)."""
+    rows = (
+        model.objects
+        .filter(user=user, date__gte=start, date__lte=end)
+        .values('category', 'category__name')
+        .annotate(total=Sum('value'))
+        .order_by('category__name')
+    )
+    return [
+        {
+            'category': row['category'],
+            'category_name': row['category__name'],
+            'total': row['total'] or ZERO,
+        }
+        for row in rows
+    ]
+
+
+def build_monthly_summary(user, year, month):
+    """
+    Calcula o resumo financeiro de um mês com agregações no banco.
+
+    Nenhuma transação é carregada: cada bloco do resumo é uma única
+    consulta agregada sobre o intervalo de datas do mês, que usa os
+    índices compostos (user, date) e (user, category, date).
+    """
+    start = date(year, month, 1)
+    end = date(year, month, monthrange(year, month)[1])
+
+    incomes = _category_totals(Income, user, start, end)
+    expenses = _category_totals(Expense, user, start, end)
+    income_total = sum((row['total'] for row in incomes), ZERO)
+    expense_total = sum((row['total'] for row in expenses), ZERO)
+
+    unpaid_debt_total = Debt.objects.filter(
+        user=user, paid=False, due_date__gte=start, due_date__lte=end
+    ).aggregate(total=Sum('value'))['total'] or ZERO
+
+    # Mesma regra de RecurringBill.is_active_for_period: a conta vale para
+    # o mês se não foi desativada ou se foi desativada após o dia 1º
+    deactivated_after_start = datetime.combine(
+        start + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    bills_due_total = RecurringBill.objects.filter(
+        Q(deactivated_at__isnull=True, is_active=True) |
+        Q(deactivated_at__gte=deactivated_after_start),
+        user=user,
+    ).aggregate(total=Sum('value'))['total'] or ZERO
+
+    bills_paid_total = RecurringBillPayment.objects.filter(
+        recurring_bill__user=user, year=year, month=month, status='paid'
+    ).aggregate(
+        total=Sum(Coalesce('amount_paid', 'recurring_bill__value'))
+    )['total'] or ZERO
+
+    return {
+        'year': year,
+        'month': month,
+        'income_total': income_total,
+        'expense_total': expense_total,
+        'balance': income_total - expense_total,
+        'unpaid_debt_total': unpaid_debt_total,
+        'recurring_bills': {
+            'due_total': bills_due_total,
+            'paid_total': bills_paid_total,
+            'pending_total': max(bills_due_total - bills_paid_total, ZERO),
+        },
+        'categories': {
+            'incomes': incomes,
+            'expenses': expenses,
+        },
+    }
+
+
+def build_yearly_summary(user, year):
+    """
+    Totais mês a mês e por categoria de um ano, lidos do MonthlyRollup.
+
+    Lê no máximo 12 x categorias linhas por tipo, sem tocar nas
+    transações.
+    """
+    months = {
+        month: {'month': month, 'income_total': ZERO, 'expense_total': ZERO}
+        for month in range(1, 13)
+    }
+    categories = {'income': {}, 'expense': {}}
+
+    rows = (
+        MonthlyRollup.objects
+        .filter(user=user, year=year)
+        .values('kind', 'month', 'category', 'category__name', 'total')
+    )
+    for row in rows:
+        months[row['month']][f"{row['kind']}_total"] += row['total']
+        by_category = categories[row['kind']]
+        entry = by_category.setdefault(row['category'], {
+            'category': row['category'],
+            'category_name': row['category__name'],
+            'total': ZERO,
+        })
+        entry['total'] += row['total']
+
+    for month in months.values():
+        month['balance'] = month['income_total'] - month['expense_total']
+
+    def sorted_totals(kind):
+        return sorted(categories[kind].values(),
+                      key=lambda entry: entry['category_name'] or '')
+
+    return {
+        'year': year,
+        'income_total': sum(
+            (m['income_total'] for m in months.values()), ZERO),
+        'expense_total': sum(
+            (m['expense_total'] for m in months.values()), ZERO),
+        'months': list(months.values()),
+        'categories': {
+            'incomes': sorted_totals('income'),
+            'expenses': sorted_totals('expense'),
+        },
+    }
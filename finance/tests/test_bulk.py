@@ -0,0 +1,170 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from dot_equilibrium import versioning
+
+from .. import rollups
+from ..cache import NAMESPACE
+from ..models import Category, Expense, Income
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='bulk@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def item(title, value="10.00", day=1, **extra):
+    return {
+        "title": title,
+        "value": value,
+        "description": "Extrato",
+        "date": str(date(2024, 5, day)),
+        **extra,
+    }
+
+
+def test_bulk_create_in_one_insert(
+        user, api_client, django_assert_max_num_queries):
+    category = Category.objects.create(name="Mercado")
+    items = [item(f"Compra {n}", category=category.pk) for n in range(50)]
+
+    # Validação das categorias, INSERT e consolidado: não cresce por item
+    # além da busca de categoria feita pelo serializer
+    with django_assert_max_num_queries(50 + 10):
+        response = api_client.post(
+            reverse('expense-bulk'), items, format='json')
+    assert response.status_code == 201
+    assert len(response.data) == 50
+    assert all(row['id'] for row in response.data)
+    assert Expense.objects.filter(user=user).count() == 50
+    assert rollups.verify(user) == []
+
+
+def test_bulk_create_reports_item_errors(user, api_client):
+    items = [item("Boa"), item("Ruim", value="abc"), {"title": "Sem data"}]
+    response = api_client.post(reverse('income-bulk'), items, format='json')
+    assert response.status_code == 400
+    assert [error['index'] for error in response.data['errors']] == [1, 2]
+    assert 'value' in response.data['errors'][0]['errors']
+    assert not Income.objects.exists()
+
+    response = api_client.post(
+        reverse('income-bulk'), item("Solta"), format='json')
+    assert response.status_code == 400
+    assert response.data == {'error': 'Expected a list of items'}
+
+
+def test_bulk_update_and_delete(user, api_client):
+    created = api_client.post(
+        reverse('income-bulk'), [item(f"Receita {n}") for n in range(3)],
+        format='json').data
+    ids = [row['id'] for row in created]
+    other = Income.objects.create(
+        user=User.objects.create_user(email='outro@example.com',
+                                      password='x'),
+        title="Alheia", value=Decimal("1.00"), description="",
+        date=date(2024, 5, 1))
+
+    response = api_client.patch(reverse('income-bulk'), [
+        {'id': ids[0], 'value': "25.00"},
+        {'id': ids[1], 'date': str(date(2024, 6, 1))},
+    ], format='json')
+    assert response.status_code == 200
+    assert Income.objects.get(pk=ids[0]).value == Decimal("25.00")
+    assert rollups.verify(user) == []
+
+    # Objetos de outro usuário, ids repetidos e dados inválidos
+    response = api_client.patch(reverse('income-bulk'), [
+        {'id': other.pk, 'value': "1.00"},
+        {'id': ids[2], 'value': "x"},
+        {'id': ids[0], 'value': "1.00"},
+        {'id': ids[0], 'value': "2.00"},
+    ], format='json')
+    assert response.status_code == 400
+    assert [error['index'] for error in response.data['errors']] == [0, 1, 3]
+    assert Income.objects.get(pk=ids[0]).value == Decimal("25.00")
+
+    response = api_client.put(reverse('income-bulk'), [
+        {'id': ids[2], 'value': "5.00"},
+    ], format='json')
+    assert response.status_code == 400
+
+    response = api_client.delete(
+        reverse('income-bulk'), {'ids': [ids[0], ids[1], other.pk]},
+        format='json')
+    assert response.status_code == 200
+    assert response.data == {'deleted': sorted(ids[:2]),
+                             'not_found': [other.pk]}
+    assert list(Income.objects.filter(user=user).values_list(
+        'pk', flat=True)) == [ids[2]]
+    assert Income.objects.filter(pk=other.pk).exists()
+    assert rollups.verify(user) == []
+
+
+def test_bulk_update_reports_missing_and_invalid_ids(user, api_client):
+    income = Income.objects.create(
+        user=user, title="Receita", value=Decimal("1.00"), description="",
+        date=date(2024, 5, 1))
+
+    response = api_client.patch(reverse('income-bulk'), [
+        {'value': "1.00"},
+        {'value': "2.00"},
+        {'id': "abc", 'value': "3.00"},
+        {'id': True, 'value': "4.00"},
+        {'id': str(income.pk), 'value': "5.00"},
+    ], format='json')
+    assert response.status_code == 400
+    assert response.data['errors'] == [
+        {'index': 0, 'errors': {'id': ['This field is required.']}},
+        {'index': 1, 'errors': {'id': ['This field is required.']}},
+        {'index': 2, 'errors': {'id': ['A valid integer is required.']}},
+        {'index': 3, 'errors': {'id': ['A valid integer is required.']}},
+    ]
+
+    response = api_client.delete(
+        reverse('income-bulk'), {'ids': [True]}, format='json')
+    assert response.status_code == 400
+    assert response.data == {'error': 'Ids must be integers'}
+    assert Income.objects.filter(pk=income.pk).exists()
+
+
+def test_bulk_writes_invalidate_list_cache(api_client, settings):
+    settings.CONDITIONAL_GET_ENABLED = True
+    url = reverse('income-list')
+    etag = api_client.get(url)['ETag']
+    api_client.post(reverse('income-bulk'), [item("Nova")], format='json')
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(response.data['results']) == 1
+
+
+def test_bulk_delete_invalidates_user_once(user, api_client, monkeypatch):
+    incomes = [
+        Income.objects.create(user=user, title=f"Receita {n}",
+                              value=Decimal("10.00"), description="Extrato",
+                              date=date(2024, 5, 1))
+        for n in range(3)
+    ]
+    calls = []
+    monkeypatch.setattr(versioning, 'invalidate_user',
+                        lambda *args: calls.append(args))
+    response = api_client.delete(reverse('income-bulk'), {
+        'ids': [income.pk for income in incomes]}, format='json')
+    assert response.status_code == 200
+    assert calls == [(NAMESPACE, user.pk)]
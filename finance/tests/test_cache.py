@@ -0,0 +1,205 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import cache, checks
+from ..models import Category, Income, Objective, RecurringBill
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def enabled(settings):
+    # Desligados por padrão sem um cache compartilhado
+    settings.FINANCE_CACHE_ENABLED = True
+    settings.CONDITIONAL_GET_ENABLED = True
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username='testuser',
+        email='test@example.com',
+        password='testpass123'
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def income_data(title):
+    return {
+        "title": title,
+        "value": "10.00",
+        "description": "Teste",
+        "date": str(date(2024, 5, 1)),
+    }
+
+
+def test_list_served_from_cache_until_write(
+        api_client, django_assert_num_queries):
+    """Leituras repetidas não vão ao banco até a próxima escrita"""
+    cache.stats.reset()
+    url = reverse('income-list')
+    api_client.post(url, income_data("Primeira"))
+
+    response = api_client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    with django_assert_num_queries(0):
+        response = api_client.get(url)
+    assert response['X-Cache'] == 'HIT'
+    assert len(response.data['results']) == 1
+
+    api_client.post(url, income_data("Segunda"))
+    response = api_client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert len(response.data['results']) == 2
+    assert cache.stats.snapshot()['hits'] == 1
+    assert cache.stats.snapshot()['misses'] == 2
+
+
+def test_cache_key_per_user_and_query(user, api_client):
+    url = reverse('income-list')
+    api_client.post(url, income_data("Minha"))
+    api_client.get(url)
+
+    other = User.objects.create_user(email='outro@example.com',
+                                     password='testpass123')
+    other_client = APIClient()
+    other_client.force_authenticate(user=other)
+    response = other_client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['results'] == []
+
+    response = api_client.get(url, {'date_from': '2024-06-01'})
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['results'] == []
+
+
+def test_child_writes_invalidate_owner(user, api_client):
+    """Pagamentos e depósitos invalidam o cache do dono do objeto pai"""
+    bill = RecurringBill.objects.create(
+        user=user, name="Luz", value=Decimal("100.00"), due_day=10)
+    objective = Objective.objects.create(
+        user=user, title="Reserva", target_value=Decimal("500.00"))
+
+    version = cache.get_data_version(user.pk)
+    bill.mark_paid_for_period(2024, 5)
+    assert cache.get_data_version(user.pk) != version
+
+    version = cache.get_data_version(user.pk)
+    objective.add_deposit(Decimal("50.00"))
+    assert cache.get_data_version(user.pk) != version
+
+    url = reverse('finance-summary')
+    params = {'year': 2024, 'month': 5}
+    assert api_client.get(url, params)['X-Cache'] == 'MISS'
+    assert api_client.get(url, params)['X-Cache'] == 'HIT'
+
+    objective.delete()
+    assert api_client.get(url, params)['X-Cache'] == 'MISS'
+
+
+def test_category_writes_invalidate_owners(user, api_client):
+    """Renomear ou excluir uma categoria invalida o cache de quem a usa"""
+    category = Category.objects.create(name="Salário")
+    Income.objects.create(
+        user=user, title="Maio", value=Decimal("10.00"),
+        description="Teste", date=date(2024, 5, 1), category=category)
+
+    url = reverse('finance-summary')
+    params = {'year': 2024, 'month': 5}
+    api_client.get(url, params)
+    category.name = "Salário líquido"
+    category.save()
+    response = api_client.get(url, params)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['categories']['incomes'][0]['category_name'] == (
+        "Salário líquido")
+
+    url = reverse('income-list')
+    assert api_client.get(url).data['results'][0]['category'] == category.pk
+    category.delete()
+    response = api_client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['results'][0]['category'] is None
+
+
+def test_check_warns_without_shared_cache(settings):
+    settings.CACHE_SHARED = False
+    settings.DEBUG = False
+    assert [error.id for error in checks.check_shared_cache(None)] == [
+        'finance.W001', 'finance.W002']
+
+    settings.CACHE_SHARED = True
+    assert checks.check_shared_cache(None) == []
+
+
+def test_cache_stats_requires_admin(api_client):
+    response = api_client.get(reverse('finance-cache-stats'))
+    assert response.status_code == 403
+
+
+def test_conditional_get_returns_304_until_write(
+        api_client, django_assert_num_queries):
+    """Com If-None-Match do ETag atual a listagem responde 304 sem consultas"""
+    url = reverse('income-list')
+    api_client.post(url, income_data("Primeira"))
+
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.status_code == 200
+    assert etag.startswith('W/"')
+    assert 'private' in response['Cache-Control']
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert not response.content
+
+    # Comparação fraca e listas de ETags
+    response = api_client.get(
+        url, HTTP_IF_NONE_MATCH=f'"outro", {etag.removeprefix("W/")}')
+    assert response.status_code == 304
+
+    api_client.post(url, income_data("Segunda"))
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert len(response.data['results']) == 2
+
+
+def test_etag_varies_with_query_and_summary(api_client):
+    url = reverse('income-list')
+    first = api_client.get(url)['ETag']
+    assert api_client.get(url, {'page_size': 5})['ETag'] != first
+
+    summary_url = reverse('finance-summary')
+    response = api_client.get(summary_url, {'year': 2024, 'month': 5})
+    etag = response['ETag']
+    response = api_client.get(
+        summary_url, {'year': 2024, 'month': 5}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    # Erros de validação não recebem ETag
+    response = api_client.get(summary_url)
+    assert response.status_code == 400
+    assert 'ETag' not in response
+
+
+def test_conditional_get_disabled(api_client, settings):
+    settings.CONDITIONAL_GET_ENABLED = False
+    url = reverse('income-list')
+    response = api_client.get(url, HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == 200
+    assert 'ETag' not in response
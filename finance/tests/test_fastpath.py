@@ -0,0 +1,106 @@
+from datetime import date
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .. import fastpath
+from ..models import Category, Debt, Expense, Income
+from ..serializers import (DebtSerializer, ExpenseSerializer,
+                           IncomeSerializer, ObjectiveSerializer)
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='fast@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def transactions(user):
+    category = Category.objects.create(name="Casa")
+    for n, value in enumerate(["10", "0.5", "1234.56", "-3.10", "0"]):
+        kwargs = dict(user=user, value=Decimal(value), description="Teste",
+                      date=date(2024, 5, n + 1),
+                      category=category if n % 2 else None)
+        Income.objects.create(title=f"Receita {n}", **kwargs)
+        Expense.objects.create(title=f"Despesa {n}", **kwargs)
+        Debt.objects.create(name=f"Dívida {n}", due_date=date(2024, 6, 1),
+                            paid=bool(n % 2), **kwargs)
+
+
+@pytest.mark.parametrize('model, serializer_class', [
+    (Income, IncomeSerializer),
+    (Expense, ExpenseSerializer),
+    (Debt, DebtSerializer),
+])
+def test_converter_matches_serializer(transactions, model, serializer_class):
+    converter = fastpath.get_converter(serializer_class)
+    queryset = model.objects.order_by('pk')
+    expected = serializer_class(queryset, many=True).data
+    fast = converter.convert_many(queryset.values(*converter.columns))
+
+    # Mesmo JSON, byte a byte (inclui a ordem das chaves)
+    renderer = JSONRenderer()
+    assert renderer.render(fast) == renderer.render(expected)
+
+    # Datas/horas em UTC terminam com 'Z', como no DRF
+    with timezone.override(dt_timezone.utc):
+        expected = serializer_class(queryset, many=True).data
+        fast = converter.convert_many(queryset.values(*converter.columns))
+    assert fast[0]['updated_at'].endswith('Z')
+    assert renderer.render(fast) == renderer.render(expected)
+
+
+def test_unsupported_serializers_fall_back():
+    class WithMethod(IncomeSerializer):
+        extra = serializers.SerializerMethodField()
+
+        def get_extra(self, obj):
+            return 1
+
+        class Meta(IncomeSerializer.Meta):
+            fields = '__all__'
+
+    assert fastpath.build_converter(WithMethod) is None
+    assert fastpath.build_converter(ObjectiveSerializer) is None
+
+
+def test_list_endpoint_uses_fast_path(
+        transactions, api_client, django_assert_num_queries):
+    url = reverse('income-list')
+    with django_assert_num_queries(1):
+        response = api_client.get(url, {'page_size': 2})
+    assert [row['title'] for row in response.data['results']] == [
+        "Receita 4", "Receita 3"]
+    assert response.data['results'][0]['value'] == "0.00"
+
+    # O cursor é gerado a partir das linhas de .values()
+    response = api_client.get(response.data['next'])
+    assert [row['title'] for row in response.data['results']] == [
+        "Receita 2", "Receita 1"]
+    response = api_client.get(response.data['previous'])
+    assert [row['title'] for row in response.data['results']] == [
+        "Receita 4", "Receita 3"]
+
+
+def test_benchmark_command(user):
+    call_command('benchmark_list_serialization', rows=20, repeat=1)
+    assert not Income.objects.exists()
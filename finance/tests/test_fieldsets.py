@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Category, Income, Objective, RecurringBill
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='fields@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def income(user):
+    return Income.objects.create(
+        user=user, title="Salário", value=Decimal("100.00"),
+        description="Mensal", date=date(2024, 5, 1),
+        category=Category.objects.create(name="Trabalho"))
+
+
+def test_fields_trim_output_and_columns(income, api_client):
+    url = reverse('income-list')
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, {'fields': 'id,date,value,category'})
+    assert response.status_code == 200
+    assert response.data['results'] == [{
+        'id': income.pk, 'value': "100.00", 'date': "2024-05-01",
+        'category': income.category_id}]
+    sql = queries.captured_queries[0]['sql']
+    assert '"title"' not in sql and '"description"' not in sql
+
+    response = api_client.get(url, {'omit': 'description,updated_at'})
+    row = response.data['results'][0]
+    assert 'description' not in row and 'updated_at' not in row
+    assert row['title'] == "Salário"
+
+    # O cursor continua funcionando sem a data na saída
+    api_client.post(url, {"title": "Extra", "value": "5.00",
+                          "description": "x", "date": "2024-04-01"})
+    response = api_client.get(url, {'fields': 'id', 'page_size': 1})
+    response = api_client.get(response.data['next'])
+    assert list(response.data['results'][0]) == ['id']
+
+
+def test_fields_on_detail_and_unknown_fields(income, api_client):
+    url = reverse('income-detail', args=[income.pk])
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, {'fields': 'title'})
+    assert response.data == {'title': "Salário"}
+    assert '"description"' not in queries.captured_queries[0]['sql']
+
+    response = api_client.get(url, {'fields': 'title,nope'})
+    assert response.status_code == 400
+    assert 'nope' in response.data['detail']
+
+
+@pytest.mark.parametrize('value', ['', ' , '])
+def test_empty_fields_returns_all_fields(income, api_client, value):
+    url = reverse('income-list')
+    response = api_client.get(url, {'fields': value, 'omit': value})
+    assert response.status_code == 200
+    assert response.data['results'] == api_client.get(url).data['results']
+    assert response.data['results'][0]['title'] == "Salário"
+
+
+def test_objective_computed_fields_skipped(
+        user, api_client, django_assert_num_queries):
+    objective = Objective.objects.create(
+        user=user, title="Reserva", target_value=Decimal("1000.00"))
+    objective.add_deposit(Decimal("250.00"))
+    url = reverse('objective-list')
+
+    # Sem prefetch dos depósitos nem contagem
+    with django_assert_num_queries(1):
+        response = api_client.get(url, {'fields': 'id,title'})
+    assert response.data == [{'id': objective.pk, 'title': "Reserva"}]
+
+    # Propriedades leem apenas as colunas de que dependem, sem consultas
+    # extras por objeto
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            url, {'fields': 'title,progress_percentage,status'})
+    assert response.data == [{'title': "Reserva", 'progress_percentage': 25.0,
+                              'status': 'ativo'}]
+
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            reverse('objective-detail', args=[objective.slug]),
+            {'omit': 'deposits'})
+    assert 'deposits' not in response.data
+
+
+def test_recurring_bill_payment_skipped(
+        user, api_client, django_assert_num_queries):
+    RecurringBill.objects.create(
+        user=user, name="Internet", value=Decimal("99.90"), due_day=10)
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('recurringbill-list'), {
+            'year': 2024, 'month': 5, 'fields': 'id,name,value'})
+    assert list(response.data[0]) == ['id', 'name', 'value']
@@ -0,0 +1,180 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import importer, rollups
+from ..models import Category, Expense, Income
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+CSV_STATEMENT = """Data;Histórico;Valor
+01/05/2024;Salário;5.000,00
+02/05/2024;Supermercado Bom Preço;-250,40
+02/05/2024;Supermercado Bom Preço;-250,40
+03/05/2024;Padaria;abc
+04/05/2024;Posto Shell;-120,00
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240510120000[-3:BRT]
+<TRNAMT>-89.90
+<FITID>1
+<NAME>Farmácia Central
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240511
+<TRNAMT>1500.00
+<FITID>2
+<MEMO>Pix recebido
+</STMTTRN>
+<STMTTRN>
+<DTPOSTED>2024xx11
+<TRNAMT>1.00
+<NAME>Data inválida
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='import@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def upload(name, content):
+    return SimpleUploadedFile(name, content.encode('utf-8'))
+
+
+def test_csv_parser_formats_and_errors():
+    rows = list(importer.parse_csv(CSV_STATEMENT.splitlines(True)))
+    assert rows[0] == importer.Row(
+        2, date(2024, 5, 1), "Salário", Decimal("5000.00"), "Salário")
+    assert rows[1].value == Decimal("-250.40")
+    assert rows[3] == importer.RowError(5, "Invalid value: 'abc'")
+
+    with pytest.raises(importer.ImportFormatError):
+        list(importer.parse_csv(["nome,quantia\n", "x,1\n"]))
+
+
+@pytest.mark.parametrize('text', ['100000000', '-100.000.000,00', '1e20'])
+def test_parse_value_rejects_values_too_large_for_the_field(text):
+    with pytest.raises(ValueError, match='Value too large'):
+        importer.parse_value(text)
+    assert importer.parse_value('99.999.999,99') == Decimal('99999999.99')
+
+    rows = list(importer.parse_csv(
+        ["Data;Histórico;Valor\n", f"01/05/2024;Prêmio;{text}\n"]))
+    assert rows == [importer.RowError(2, f"Value too large: {text!r}")]
+
+
+def test_zero_value_rows_are_errors(user):
+    # Linhas de saldo e informativas vêm com valor zero
+    rows = list(importer.parse_csv([
+        "Data;Histórico;Valor\n",
+        "01/05/2024;Saldo anterior;0,00\n",
+        "02/05/2024;Tarifa;-0,001\n",
+        "03/05/2024;Padaria;-12,00\n",
+    ]))
+    assert rows[0] == importer.RowError(2, "Zero value: '0,00'")
+    assert rows[1] == importer.RowError(3, "Zero value: '-0,001'")
+
+    report = importer.import_transactions(user, rows)
+    assert report.created == {'income': 0, 'expense': 1}
+    assert report.error_count == 2
+    assert not Income.objects.exists()
+
+
+def test_ofx_parser_handles_chunk_boundaries():
+    # Blocos pequenos cortam tags e valores no meio
+    chunks = [OFX_STATEMENT[i:i + 7] for i in range(0, len(OFX_STATEMENT), 7)]
+    rows = list(importer.parse_ofx(chunks))
+    assert rows[0] == importer.Row(
+        1, date(2024, 5, 10), "Farmácia Central", Decimal("-89.90"),
+        "Farmácia Central")
+    assert rows[1].title == "Pix recebido"
+    assert isinstance(rows[2], importer.RowError)
+
+
+def test_import_endpoint_with_rules_and_duplicates(user, api_client, settings):
+    settings.FINANCE_IMPORT_BATCH_SIZE = 2
+    Category.objects.create(name="Mercado")
+    rules = '[{"pattern": "supermercado", "category": "mercado"}]'
+    url = reverse('finance-import')
+
+    response = api_client.post(url, {
+        'file': upload('maio.csv', CSV_STATEMENT), 'rules': rules})
+    assert response.status_code == 200
+    assert response.data['rows'] == 5
+    assert response.data['batches'] == 3
+    assert response.data['created'] == {'income': 1, 'expense': 3}
+    assert response.data['duplicates'] == 0
+    assert response.data['errors'] == [
+        {'row': 5, 'error': "Invalid value: 'abc'"}]
+
+    # Transações repetidas no arquivo são mantidas
+    groceries = Expense.objects.filter(user=user, title__startswith="Super")
+    assert groceries.count() == 2
+    assert all(expense.category.name == "Mercado" for expense in groceries)
+    assert rollups.verify(user) == []
+
+    # Reimportar o mesmo extrato não duplica nada
+    response = api_client.post(url, {
+        'file': upload('maio.csv', CSV_STATEMENT)})
+    assert response.data['created'] == {'income': 0, 'expense': 0}
+    assert response.data['duplicates'] == 4
+    assert Expense.objects.filter(user=user).count() == 3
+
+
+def test_import_endpoint_errors(api_client, settings):
+    url = reverse('finance-import')
+    assert api_client.post(url, {}).status_code == 400
+
+    response = api_client.post(url, {'file': upload('extrato.pdf', 'x')})
+    assert response.data == {'error': 'Unsupported file format'}
+
+    response = api_client.post(url, {
+        'file': upload('maio.csv', CSV_STATEMENT),
+        'rules': '[{"pattern": "x", "category": "inexistente"}]'})
+    assert response.status_code == 400
+    assert response.data == {'error': 'Unknown category: inexistente'}
+    assert not Income.objects.exists()
+
+
+def test_import_endpoint_streams_temporary_upload(user, api_client, settings):
+    # Força o upload em arquivo temporário, como nos extratos grandes
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+    response = api_client.post(reverse('finance-import'), {
+        'file': upload('maio.ofx', OFX_STATEMENT)})
+    assert response.status_code == 200
+    assert response.data['created'] == {'income': 1, 'expense': 1}
+    assert response.data['error_count'] == 1
+
+
+def test_import_command(user, tmp_path):
+    statement = tmp_path / 'maio.ofx'
+    statement.write_text(OFX_STATEMENT, encoding='utf-8')
+    call_command('import_statement', str(statement), user=user.email,
+                 batch_size=1)
+    assert Expense.objects.get(user=user).value == Decimal("89.90")
+    assert Income.objects.get(user=user).title == "Pix recebido"
@@ -0,0 +1,145 @@
+import json
+import logging
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from dot_equilibrium import instrumentation
+
+from ..models import Income, Objective
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+STATS_URL = reverse('instrumentation-stats')
+
+
+@pytest.fixture(autouse=True)
+def enabled():
+    instrumentation.stats.reset()
+    with override_settings(INSTRUMENTATION_ENABLED=True):
+        yield
+    instrumentation.stats.reset()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='metrics@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    # O cliente é criado com o middleware já configurado
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for part in header.split(', '):
+        name, *params = part.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header(api_client, user):
+    Income.objects.create(user=user, title='Salário', value=Decimal('10'),
+                          description='Mensal', date=date(2024, 1, 1))
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get(reverse('income-list'))
+    assert response.status_code == 200
+
+    timing = parse_server_timing(response['Server-Timing'])
+    assert set(timing) == {'db', 'render', 'total'}
+    assert timing['db']['desc'] == f'"{len(ctx.captured_queries)} queries"'
+    assert float(timing['total']['dur']) >= float(timing['db']['dur'])
+
+
+def test_serializer_time_with_mixin(api_client, user):
+    Objective.objects.create(user=user, title='Viagem',
+                             target_value=Decimal('1000.00'))
+
+    response = api_client.get(reverse('objective-list'))
+    assert response.status_code == 200
+    assert 'serialize' in parse_server_timing(response['Server-Timing'])
+
+
+def test_structured_log(api_client, caplog):
+    # O logger não propaga para o root, onde fica o handler do caplog
+    logger = logging.getLogger(instrumentation.__name__)
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger=instrumentation.__name__):
+            api_client.get(reverse('income-list'))
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['route'] == 'GET income-list'
+    assert record['path'] == reverse('income-list')
+    assert record['status'] == 200
+    assert record['queries'] >= 1
+    assert {'db_ms', 'render_ms', 'total_ms'} <= set(record)
+
+
+def test_streaming_response_measured_until_exhausted(api_client, user):
+    Income.objects.create(user=user, title='Salário', value=Decimal('10'),
+                          description='Mensal', date=date(2024, 1, 1))
+
+    response = api_client.get(reverse('sync-export'))
+    assert response.streaming
+    assert 'Server-Timing' not in response
+    # Nada é registrado antes de o conteúdo ser gerado
+    assert instrumentation.stats.snapshot() == {}
+
+    with CaptureQueriesContext(connection) as ctx:
+        content = b''.join(response.streaming_content)
+    assert b'Sal\xc3\xa1rio' in content
+    route = instrumentation.stats.snapshot()['GET sync-export']
+    assert route['count'] == 1
+    assert route['queries'] == len(ctx.captured_queries) > 0
+    assert route['db_ms'] > 0
+
+
+def test_route_stats_admin_only(api_client, user):
+    api_client.get(reverse('income-list'))
+    api_client.get(reverse('income-list'))
+    assert api_client.get(STATS_URL).status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = api_client.get(STATS_URL)
+    assert response.status_code == 200
+    assert response.data['enabled'] is True
+    route = response.data['routes']['GET income-list']
+    assert route['count'] == 2
+    assert route['avg_queries'] == route['queries'] / 2
+    assert route['max_total_ms'] >= route['avg_total_ms']
+
+    response = api_client.delete(STATS_URL)
+    assert list(response.data['routes']) == []
+
+
+def test_disabled_middleware_is_removed(user):
+    with override_settings(INSTRUMENTATION_ENABLED=False):
+        with pytest.raises(MiddlewareNotUsed):
+            instrumentation.InstrumentationMiddleware(lambda request: None)
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get(reverse('income-list'))
+
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response
+    assert instrumentation.stats.snapshot() == {}
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from dot_equilibrium import metrics
+
+from .. import cache
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+METRICS_URL = reverse('metrics')
+
+
+@pytest.fixture(autouse=True)
+def enabled():
+    metrics.registry.reset()
+    cache.stats.reset()
+    with override_settings(METRICS_ENABLED=True, METRICS_TOKEN='',
+                           METRICS_MULTIPROC_DIR='',
+                           FINANCE_CACHE_ENABLED=True):
+        yield
+    metrics.registry.reset()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='prometheus@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def scrape(client=None, **headers):
+    response = (client or APIClient()).get(METRICS_URL, **headers)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples, response.content.decode()
+
+
+def test_requests_grouped_by_app(api_client):
+    api_client.get(reverse('income-list'))
+    api_client.get(reverse('income-list'))
+    api_client.get(reverse('employee-list'))
+    api_client.get(reverse('user_profile'))
+    APIClient().post(reverse('rest_login'), {'email': 'x@example.com',
+                                             'password': 'errada'})
+
+    samples, _ = scrape()
+    assert samples['http_requests_total{group="api/finance",method="GET",'
+                   'status="200"}'] == 2
+    assert samples['http_requests_total{group="api/payroll",method="GET",'
+                   'status="200"}'] == 1
+    assert samples['http_requests_total{group="api/accounts",method="GET",'
+                   'status="200"}'] == 1
+    assert samples['http_requests_total{group="auth",method="POST",'
+                   'status="400"}'] == 1
+
+
+def test_latency_and_query_histograms(api_client):
+    for _ in range(3):
+        api_client.get(reverse('income-list'))
+
+    samples, text = scrape()
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    group = 'group="api/finance"'
+    assert samples[
+        f'http_request_duration_seconds_bucket{{{group},le="+Inf"}}'] == 3
+    assert samples[f'http_request_duration_seconds_count{{{group}}}'] == 3
+    assert samples[f'http_request_db_queries_count{{{group}}}'] == 3
+    assert samples[f'http_request_db_queries_sum{{{group}}}'] >= 1
+
+    # Buckets acumulados e crescentes
+    buckets = [value for name, value in samples.items() if name.startswith(
+        f'http_request_duration_seconds_bucket{{{group}')]
+    assert buckets == sorted(buckets)
+
+
+def test_streaming_response_observed_after_iteration(api_client):
+    response = api_client.get(reverse('sync-export'))
+    samples, _ = scrape()
+    assert 'http_request_db_queries_count{group="api/sync"}' not in samples
+
+    b''.join(response.streaming_content)
+    samples, _ = scrape()
+    assert samples['http_request_db_queries_count{group="api/sync"}'] == 1
+    assert samples['http_request_db_queries_sum{group="api/sync"}'] >= 1
+
+
+def test_cache_hit_ratio(api_client):
+    api_client.get(reverse('income-list'))
+    api_client.get(reverse('income-list'))
+
+    samples, _ = scrape()
+    assert samples['cache_hits_total{cache="finance"}'] == 1
+    assert samples['cache_misses_total{cache="finance"}'] == 1
+    assert samples['cache_hit_ratio{cache="finance"}'] == 0.5
+
+
+def test_multiprocess_aggregation(api_client, tmp_path):
+    other = {
+        'counters': [
+            ['http_requests_total', [['group', 'api/finance'],
+                                     ['method', 'GET'], ['status', '200']],
+             5],
+            ['cache_hits_total', [['cache', 'finance']], 3],
+        ],
+        'histograms': [
+            ['http_request_db_queries', [['group', 'api/finance']],
+             [0, 5, 0, 0, 0, 0, 0, 0, 0, 0, 5, 5]],
+        ],
+    }
+    # Arquivo de outro worker ainda ativo (o processo pai)
+    live = f'metrics-{os.getppid()}-{time.time_ns()}.json'
+    (tmp_path / live).write_text(json.dumps(other))
+
+    with override_settings(METRICS_MULTIPROC_DIR=str(tmp_path)):
+        api_client.get(reverse('income-list'))
+        samples, _ = scrape()
+
+    assert (tmp_path / metrics.snapshot_name()).exists()
+    assert (tmp_path / live).exists()
+    assert samples['http_requests_total{group="api/finance",method="GET",'
+                   'status="200"}'] == 6
+    assert samples['cache_hits_total{cache="finance"}'] == 3
+    assert samples['cache_hit_ratio{cache="finance"}'] == 0.75
+    assert samples[
+        'http_request_db_queries_bucket{group="api/finance",le="1"}'] >= 5
+    assert samples['http_request_db_queries_count{group="api/finance"}'] == 6
+
+
+def test_stale_snapshots_merged_into_aggregate(tmp_path):
+    def snapshot(requests):
+        return json.dumps({'counters': [
+            ['http_requests_total', [['group', 'api/finance'],
+                                     ['method', 'GET'], ['status', '200']],
+             requests]], 'histograms': []})
+
+    # Processo encerrado e arquivo antigo de um pid reaproveitado por
+    # este processo
+    (tmp_path / 'metrics-999999999-1.json').write_text(snapshot(5))
+    (tmp_path / f'metrics-{os.getpid()}-1.json').write_text(snapshot(2))
+    (tmp_path / 'metrics.lock').touch()
+    key = 'http_requests_total{group="api/finance",method="GET",status="200"}'
+
+    with override_settings(METRICS_MULTIPROC_DIR=str(tmp_path)):
+        assert scrape()[0][key] == 7
+        assert sorted(os.listdir(tmp_path)) == sorted([
+            'metrics-aggregate.json', 'metrics.lock',
+            metrics.snapshot_name()])
+
+        # Contagem estável nas coletas seguintes
+        assert scrape()[0][key] == 7
+
+        # Falha entre gravar o agregado e remover os arquivos: não soma de
+        # novo o que o agregado já registra
+        (tmp_path / 'metrics-999999998-1.json').write_text(snapshot(4))
+        metrics.merge_stale(str(tmp_path))
+        (tmp_path / 'metrics-999999998-1.json').write_text(snapshot(4))
+        assert scrape()[0][key] == 7 + 4
+
+
+def test_metrics_token():
+    with override_settings(METRICS_TOKEN='segredo'):
+        assert APIClient().get(METRICS_URL).status_code == 401
+        samples, _ = scrape(HTTP_AUTHORIZATION='Bearer segredo')
+    assert samples
+
+
+def test_disabled(user):
+    with override_settings(METRICS_ENABLED=False):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get(reverse('income-list'))
+        assert client.get(METRICS_URL).status_code == 404
+    assert metrics.registry.snapshot()['counters'] == [
+        ['cache_hits_total', [['cache', 'finance']], 0],
+        ['cache_misses_total', [['cache', 'finance']], 1],
+    ]
+
+
+def test_label_values_are_escaped():
+    text = metrics.render(
+        {('http_requests_total', (('group', 'a"b\\c'),)): 1}, {})
+    assert re.search(r'group="a\\"b\\\\c"\} 1', text)
@@ -1,10 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 
-from ..models import Category, Debt, Expense, Income, Objective
+from ..models import (Category, Debt, Expense, Income, Objective,
+                      ObjectiveDeposit)
 
 User = get_user_model()
 pytestmark = pytest.mark.django_db
@@ -121,3 +124,87 @@ def test_create_objective(user):
     assert objective.slug == "viagem"
     assert str(objective) == "Viagem - 3000.00"
     assert not objective.achieved
+
+
+def test_objective_deposit_queries(user, django_assert_num_queries):
+    """Depósito e saque não consultam o objetivo antes de gravar"""
+    objective = Objective.objects.create(
+        user=user,
+        title="Reserva",
+        target_value=Decimal("100.00"),
+    )
+    objective = Objective.objects.get(pk=objective.pk)
+
+    # UPDATE do saldo + INSERT do depósito (e o savepoint da transação)
+    with django_assert_num_queries(4) as captured:
+        objective.add_deposit(Decimal("100.00"))
+    statements = [
+        q['sql'].split()[0] for q in captured.captured_queries
+        if 'SAVEPOINT' not in q['sql']
+    ]
+    assert statements == ['UPDATE', 'INSERT']
+
+    # Valores em memória iguais aos gravados pelo UPDATE
+    in_memory = (objective.current_value, objective.achieved,
+                 objective.completed_at, objective.updated_at)
+    objective.refresh_from_db()
+    assert in_memory == (objective.current_value, objective.achieved,
+                         objective.completed_at, objective.updated_at)
+    assert objective.achieved
+    assert objective.completed_at is not None
+
+    objective.withdraw(Decimal("30.00"))
+    objective.refresh_from_db()
+    assert objective.current_value == Decimal("70.00")
+    assert not objective.achieved
+    assert objective.completed_at is None
+
+
+def test_objective_deposit_rejects_amount_above_remaining(user):
+    objective = Objective.objects.create(
+        user=user,
+        title="Bicicleta",
+        target_value=Decimal("100.00"),
+        current_value=Decimal("80.00"),
+    )
+    with pytest.raises(ValueError, match="R\\$ 20.00"):
+        objective.add_deposit(Decimal("30.00"))
+    with pytest.raises(ValueError):
+        objective.withdraw(Decimal("90.00"))
+
+    objective.refresh_from_db()
+    assert objective.current_value == Decimal("80.00")
+    assert not ObjectiveDeposit.objects.filter(objective=objective).exists()
+
+
+# Exige o bloqueio de linhas (SELECT ... FOR UPDATE) entre conexões
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='requer bloqueio de linhas do PostgreSQL')
+@pytest.mark.django_db(transaction=True)
+def test_objective_concurrent_deposits(user):
+    """Depósitos paralelos no mesmo objetivo não perdem atualizações"""
+    objective = Objective.objects.create(
+        user=user,
+        title="Viagem",
+        target_value=Decimal("1000.00"),
+    )
+    workers = 8
+    deposits_per_worker = 5
+
+    def deposit(_):
+        try:
+            # Cada thread usa sua própria conexão e instância do objetivo
+            instance = Objective.objects.get(pk=objective.pk)
+            for _ in range(deposits_per_worker):
+                instance.add_deposit(Decimal("10.00"))
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(deposit, range(workers)))
+
+    objective.refresh_from_db()
+    total = workers * deposits_per_worker
+    assert objective.current_value == Decimal("10.00") * total
+    assert ObjectiveDeposit.objects.filter(
+        objective=objective).count() == total
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Expense
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username='testuser',
+        email='test@example.com',
+        password='testpass123'
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def expenses(user):
+    # Duas despesas por dia para exercitar o desempate por id
+    start = date(2024, 1, 1)
+    created = []
+    for day in range(5):
+        for n in range(2):
+            created.append(Expense.objects.create(
+                user=user,
+                title=f"Despesa {day}-{n}",
+                value=Decimal("10.00"),
+                description="Teste",
+                date=start + timedelta(days=day),
+            ))
+    return created
+
+
+def expected_order(items):
+    return [e.id for e in sorted(items, key=lambda e: (e.date, e.id),
+                                 reverse=True)]
+
+
+def test_keyset_pagination_walks_all_pages(api_client, expenses):
+    """Percorre todas as páginas sem repetir nem pular registros."""
+    url = reverse('expense-list') + '?page_size=3'
+    seen = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data['results']) <= 3
+        seen.extend(item['id'] for item in response.data['results'])
+        url = response.data['next']
+    assert seen == expected_order(expenses)
+
+
+def test_keyset_pagination_previous_link(api_client, expenses):
+    """O link anterior devolve exatamente a página anterior."""
+    first = api_client.get(reverse('expense-list') + '?page_size=4')
+    assert first.data['previous'] is None
+    second = api_client.get(first.data['next'])
+    assert second.data['previous'] is not None
+    back = api_client.get(second.data['previous'])
+    assert back.data['results'] == first.data['results']
+
+
+def test_keyset_pagination_only_user_rows(api_client, expenses):
+    """Registros de outros usuários não aparecem nas páginas."""
+    other = User.objects.create_user(email='other@example.com',
+                                     password='testpass123')
+    Expense.objects.create(
+        user=other, title="Outra", value=Decimal("1.00"),
+        description="Outra", date=date(2024, 1, 3))
+    response = api_client.get(reverse('expense-list') + '?page_size=100')
+    ids = [item['id'] for item in response.data['results']]
+    assert ids == expected_order(expenses)
+    assert response.data['next'] is None
+
+
+def test_keyset_pagination_invalid_cursor(api_client, expenses):
+    response = api_client.get(reverse('expense-list') + '?cursor=invalido')
+    assert response.status_code == 404
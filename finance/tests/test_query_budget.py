@@ -0,0 +1,185 @@
+"""
+Número de consultas das leituras e das escritas em lote do finance: não
+pode crescer com a quantidade de linhas (1, 10 e 100).
+"""
+import itertools
+from datetime import date
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from ..factories import (CategoryFactory, DebtFactory, ExpenseFactory,
+                         IncomeFactory, ObjectiveDepositFactory,
+                         ObjectiveFactory, RecurringBillFactory,
+                         RecurringBillPaymentFactory)
+from ..models import Income
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('factory, url_name', [
+    (IncomeFactory, 'income-list'),
+    (ExpenseFactory, 'expense-list'),
+    (DebtFactory, 'debt-list'),
+])
+def test_transaction_lists(query_budget, api_get, user, factory, url_name):
+    query_budget(
+        api_get(reverse(url_name), page_size=200),
+        lambda n: factory.create_batch(n, user=user))
+
+
+def test_categories(query_budget, api_get):
+    query_budget(api_get(reverse('category-list')),
+                 CategoryFactory.create_batch)
+
+
+def test_objective_list_with_deposits(query_budget, api_get, user):
+    def seed(n):
+        for objective in ObjectiveFactory.create_batch(n, user=user):
+            ObjectiveDepositFactory.create_batch(3, objective=objective)
+
+    query_budget(api_get(reverse('objective-list')), seed)
+
+
+def test_objective_detail_deposits(query_budget, api_get, user):
+    objective = ObjectiveFactory(user=user)
+    url = reverse('objective-detail', args=[objective.slug])
+
+    query_budget(api_get(url), lambda n: (
+        ObjectiveDepositFactory.create_batch(n, objective=objective)))
+    query_budget(
+        api_get(reverse('objective-deposits', args=[objective.slug])),
+        lambda n: ObjectiveDepositFactory.create_batch(
+            n, objective=objective))
+
+
+def test_recurring_bills_payment_for_period(query_budget, api_get, user):
+    def seed(n):
+        for bill in RecurringBillFactory.create_batch(n, user=user):
+            RecurringBillPaymentFactory(recurring_bill=bill, month=3)
+
+    query_budget(
+        api_get(reverse('recurringbill-list'), year=2024, month=3),
+        seed)
+
+
+def test_recurring_bills_year_matrix(query_budget, api_get, user):
+    def seed(n):
+        for bill in RecurringBillFactory.create_batch(n, user=user):
+            RecurringBillPaymentFactory(recurring_bill=bill, month=5)
+
+    query_budget(
+        api_get(reverse('recurringbill-year-matrix'), year=2024),
+        seed)
+
+
+def test_summaries(query_budget, api_get, user):
+    def seed(n):
+        IncomeFactory.create_batch(n, user=user)
+        ExpenseFactory.create_batch(n, user=user)
+        DebtFactory.create_batch(n, user=user)
+        RecurringBillFactory.create_batch(n, user=user)
+
+    query_budget(
+        api_get(reverse('finance-summary'), year=2024, month=1), seed)
+    query_budget(
+        api_get(reverse('finance-summary-yearly'), year=2024), seed)
+
+
+# Escritas: o consolidado mensal recebe uma escrita por (mês, categoria)
+# alterado, limitada pelos meses e categorias e não pelas linhas; as
+# linhas ficam no mesmo mês e sem categoria para medir só o custo por linha
+
+def bulk_item(title):
+    return {'title': title, 'value': "10.00", 'description': "Lote",
+            'date': "2024-05-01"}
+
+
+def same_month(n, user):
+    return IncomeFactory.create_batch(
+        n, user=user, date=date(2024, 5, 1), category=None)
+
+
+def test_bulk_create(query_budget, api_client):
+    items = []
+    # Títulos novos a cada requisição
+    calls = itertools.count()
+
+    def request():
+        call = next(calls)
+        return api_client.post(reverse('income-bulk'), [
+            bulk_item(f"{item['title']} {call}") for item in items
+        ], format='json')
+
+    query_budget(request, lambda n: items.extend(
+        bulk_item(f"Receita {len(items) + i}") for i in range(n)),
+        status=201)
+
+
+def test_bulk_update(query_budget, api_client, user):
+    incomes = []
+    # Valor novo a cada requisição, para o consolidado mudar
+    calls = itertools.count(20)
+
+    def request():
+        value = f"{next(calls)}.00"
+        return api_client.patch(reverse('income-bulk'), [
+            {'id': income.pk, 'value': value} for income in incomes
+        ], format='json')
+
+    query_budget(request, lambda n: incomes.extend(same_month(n, user)))
+
+
+def test_bulk_delete(query_budget, api_client, user):
+    size = 0
+    ids = []
+
+    def seed(n):
+        nonlocal size
+        size += n
+
+    def prepare():
+        # A requisição anterior excluiu as linhas
+        ids[:] = [income.pk for income in same_month(size, user)]
+
+    query_budget(
+        lambda: api_client.delete(
+            reverse('income-bulk'), {'ids': ids}, format='json'),
+        seed, prepare=prepare)
+
+
+def test_import(query_budget, api_client):
+    lines = []
+    calls = itertools.count()
+
+    def request():
+        # Títulos novos a cada requisição, para não serem duplicatas
+        call = next(calls)
+        content = 'Data;Histórico;Valor\n' + ''.join(
+            f'{line} {call};-10,00\n' for line in lines)
+        return api_client.post(reverse('finance-import'), {
+            'file': SimpleUploadedFile('extrato.csv', content.encode()),
+        }, format='multipart')
+
+    query_budget(request, lambda n: lines.extend(
+        f'01/05/2024;Compra {len(lines) + i}' for i in range(n)))
+
+
+def test_budget_failure_shows_sql_diff(query_budget, api_client, user):
+    # Uma view com N+1 de propósito: uma consulta por receita
+    def request():
+        response = api_client.get(reverse('income-list'))
+        for item in response.json()['results']:
+            Income.objects.get(pk=item['id'])
+        return response
+
+    with pytest.raises(pytest.fail.Exception) as error:
+        query_budget(request, lambda n: IncomeFactory.create_batch(
+            n, user=user), sizes=(1, 3))
+
+    message = str(error.value)
+    assert 'Query count grows with the number of rows' in message
+    assert '--- 1 rows:' in message
+    assert '+++ 3 rows:' in message
+    assert '+SELECT' in message
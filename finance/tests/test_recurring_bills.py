@@ -3,7 +3,9 @@ from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from django.utils import timezone
+from rest_framework.test import APIClient
 
 from ..models import Category, RecurringBill
 
@@ -227,3 +229,89 @@ def test_recurring_bill_payment_str_representation(recurring_bill):
     payment.mark_as_paid()
     expected_str_paid = "Conta de Luz - 08/2024 - Pago"
     assert str(payment) == expected_str_paid
+
+
+def test_list_payment_for_period_constant_queries(
+        user, category, django_assert_num_queries):
+    """A listagem com ano/mês não faz uma consulta por conta"""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    for n in range(5):
+        bill = RecurringBill.objects.create(
+            user=user,
+            name=f"Conta {n}",
+            value=Decimal("100.00"),
+            due_day=10,
+            category=category
+        )
+        if n % 2 == 0:
+            bill.mark_paid_for_period(2024, 8)
+
+    url = reverse('recurringbill-list')
+    # Uma consulta para as contas e outra para os pagamentos do período
+    with django_assert_num_queries(2):
+        response = client.get(url, {'year': 2024, 'month': 8})
+
+    assert response.status_code == 200
+    payments = {
+        bill['name']: bill['payment_for_period'] for bill in response.data
+    }
+    assert payments["Conta 0"]["status"] == 'paid'
+    assert payments["Conta 1"] is None
+
+
+def test_get_active_months_matches_is_active_for_period(recurring_bill):
+    """Os meses ativos equivalem a is_active_for_period mês a mês"""
+    recurring_bill.deactivated_at = timezone.make_aware(
+        datetime(2024, 6, 15, 12, 0))
+    recurring_bill.is_active = False
+
+    for year in (2023, 2024, 2025):
+        expected = {
+            month for month in range(1, 13)
+            if recurring_bill.is_active_for_period(year, month)
+        }
+        assert recurring_bill.get_active_months(year) == expected
+
+
+def test_year_matrix(user, category, django_assert_num_queries):
+    """A matriz anual traz as 12 situações de cada conta"""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    bills = [
+        RecurringBill.objects.create(
+            user=user,
+            name=f"Conta {n}",
+            value=Decimal("100.00"),
+            due_day=31,
+            category=category
+        )
+        for n in range(3)
+    ]
+    bills[0].mark_paid_for_period(2024, 2, Decimal("90.00"))
+    bills[1].get_or_create_payment_for_period(2024, 3)
+
+    url = reverse('recurringbill-year-matrix')
+    # Uma consulta para as contas e outra para os pagamentos do ano
+    with django_assert_num_queries(2):
+        response = client.get(url, {'year': 2024})
+
+    assert response.status_code == 200
+    assert response.data['year'] == 2024
+    matrix = {bill['name']: bill['months'] for bill in response.data['bills']}
+    assert len(matrix) == 3
+    assert all(len(months) == 12 for months in matrix.values())
+
+    february = matrix["Conta 0"][1]
+    assert february['status'] == 'paid'
+    assert february['amount_paid'] == "90.00"
+    assert february['due_date'] == "2024-02-29"
+    assert matrix["Conta 1"][2]['status'] == 'pending'
+    assert matrix["Conta 2"][0]['amount_paid'] is None
+
+    response = client.get(url)
+    assert response.status_code == 400
+    # Anos fora do intervalo de date() não chegam a get_due_date
+    for year in ('0', '10000'):
+        response = client.get(url, {'year': year})
+        assert response.status_code == 400
@@ -0,0 +1,150 @@
+import uuid
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from dot_equilibrium import renderers
+
+from ..models import Income
+from ..serializers import IncomeSerializer
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+requires_orjson = pytest.mark.skipif(renderers.orjson is None,
+                                     reason='orjson não instalado')
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='json@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+PAYLOADS = [
+    {'value': Decimal('1234.50'), 'date': date(2024, 2, 29)},
+    {'created_at': datetime(2024, 1, 2, 3, 4, 5, 678900,
+                            tzinfo=dt_timezone.utc),
+     'naive': datetime(2024, 1, 2, 3, 4, 5), 'time': time(10, 30)},
+    {'id': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    {'title': 'Pão de açúcar   linha   \x00\x1f "aspas" \\ / 😀'},
+    {'label': gettext_lazy('Salário')},
+    {'floats': [0.1, 1.5, 1e16, 1e-5, 0.00012, 123456789.125, -0.0]},
+    {1: 'chave inteira', None: 'chave nula'},
+    {'big': 2 ** 70, 'negative': -2 ** 64},
+    [[], {}, True, False, None, 0, '', ('tupla', 1)],
+    {'results': [{'id': n, 'value': f'{n}.00'} for n in range(200)]},
+]
+
+
+@requires_orjson
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_renderer_matches_drf_output(payload):
+    expected = JSONRenderer().render(payload)
+    assert renderers.FastJSONRenderer().render(payload) == expected
+
+
+@requires_orjson
+def test_renderer_matches_serializer_output(user):
+    Income.objects.create(
+        user=user, title='Salário', value=Decimal('5000.10'),
+        description='Mensal', date=date(2024, 3, 1))
+    data = IncomeSerializer(Income.objects.all(), many=True).data
+
+    assert renderers.FastJSONRenderer().render(data) == (
+        JSONRenderer().render(data))
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_renderer_stdlib_backend(payload):
+    with override_settings(JSON_BACKEND='stdlib'):
+        output = renderers.FastJSONRenderer().render(payload)
+    assert output == JSONRenderer().render(payload)
+
+
+def test_renderer_indent_and_empty():
+    renderer = renderers.FastJSONRenderer()
+    payload = {'value': Decimal('1.00')}
+
+    assert renderer.render(payload, 'application/json; indent=2') == (
+        JSONRenderer().render(payload, 'application/json; indent=2'))
+    assert renderer.render(None) == b''
+
+
+@requires_orjson
+@pytest.mark.parametrize('value', [
+    float('nan'), float('inf'), [1.5, -float('inf')], Decimal('NaN')])
+def test_renderer_rejects_non_finite_floats_like_drf(value):
+    # O orjson escreveria null; o DRF (strict) recusa NaN e infinito
+    payload = {'value': value, 'category': None}
+    with pytest.raises(ValueError) as expected:
+        JSONRenderer().render(payload)
+    with pytest.raises(ValueError) as error:
+        renderers.FastJSONRenderer().render(payload)
+    assert str(error.value) == str(expected.value)
+
+    with pytest.raises(ValueError):
+        renderers.FastJSONRenderer().render(value)
+
+
+@pytest.mark.parametrize('content', [
+    b'{"value":"10.50","date":"2024-01-01","items":[1,2.5,null,true]}',
+    '{"title":"Pão \\u2028 😀"}'.encode(),
+    b'{"big":123456789012345678901234567890}',
+    b'[1e400]',
+])
+def test_parser_matches_drf(content):
+    parsed = renderers.FastJSONParser().parse(BytesIO(content))
+    assert parsed == JSONParser().parse(BytesIO(content))
+
+
+@pytest.mark.parametrize('content', [b'{"value": ', b'{"value": NaN}', b''])
+def test_parser_errors_match_drf(content):
+    with pytest.raises(ParseError) as expected:
+        JSONParser().parse(BytesIO(content))
+    with pytest.raises(ParseError) as error:
+        renderers.FastJSONParser().parse(BytesIO(content))
+    assert str(error.value) == str(expected.value)
+
+
+def test_api_uses_fast_renderer_and_parser(api_client):
+    response = api_client.post(
+        reverse('income-list'),
+        {'title': 'Freela', 'value': '150.00', 'description': 'Projeto',
+         'date': '2024-05-10'},
+        format='json')
+    assert response.status_code == 201
+    assert isinstance(response.accepted_renderer, renderers.FastJSONRenderer)
+
+    response = api_client.get(reverse('income-list'))
+    assert response.status_code == 200
+    assert response.content == JSONRenderer().render(response.data)
+    assert response.json()['results'][0]['value'] == '150.00'
+
+
+@requires_orjson
+def test_benchmark_json_rendering_command():
+    out = StringIO()
+    call_command('benchmark_json_rendering', rows=20, repeat=1, stdout=out)
+    output = out.getvalue()
+    assert 'Income' in output
+    assert 'YearlySummary' in output
@@ -0,0 +1,119 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import rollups
+from ..models import Category, Expense, Income, MonthlyRollup
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username='testuser',
+        email='test@example.com',
+        password='testpass123'
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name="Alimentação")
+
+
+def expense_data(category, value, day):
+    return {
+        "title": "Mercado",
+        "value": value,
+        "description": "Compras",
+        "date": str(date(2024, 3, day)),
+        "category": category.pk if category else "",
+    }
+
+
+def test_rollup_follows_viewset_writes(user, api_client, category):
+    """Criação, edição e exclusão mantêm o consolidado consistente"""
+    url = reverse('expense-list')
+    first = api_client.post(url, expense_data(category, "100.00", 5))
+    api_client.post(url, expense_data(category, "50.00", 10))
+    rollup = MonthlyRollup.objects.get(
+        user=user, kind='expense', year=2024, month=3, category=category)
+    assert (rollup.total, rollup.count) == (Decimal("150.00"), 2)
+
+    # Move a despesa para outro mês e sem categoria
+    detail = reverse('expense-detail', args=[first.data['id']])
+    api_client.put(detail, {
+        **expense_data(None, "120.00", 5), "date": "2024-04-02"})
+    rollup.refresh_from_db()
+    assert (rollup.total, rollup.count) == (Decimal("50.00"), 1)
+    april = MonthlyRollup.objects.get(
+        user=user, kind='expense', year=2024, month=4, category=None)
+    assert (april.total, april.count) == (Decimal("120.00"), 1)
+
+    api_client.delete(detail)
+    april.refresh_from_db()
+    assert (april.total, april.count) == (Decimal("0.00"), 0)
+    assert rollups.verify(user) == []
+
+
+def test_rollup_category_delete_moves_totals(user, category):
+    income = Income.objects.create(
+        user=user, title="Venda", value=Decimal("80.00"),
+        description="Venda", date=date(2024, 3, 1), category=category)
+    rollups.apply(added=[rollups.contribution(income)])
+
+    category.delete()
+
+    rollup = MonthlyRollup.objects.get(user=user, kind='income')
+    assert rollup.category is None
+    assert rollup.total == Decimal("80.00")
+    assert rollups.verify(user) == []
+
+
+def test_rebuild_and_verify_command(user, category):
+    # Escritas diretas no ORM não passam pelos viewsets
+    Expense.objects.create(
+        user=user, title="Luz", value=Decimal("90.00"),
+        description="Conta", date=date(2024, 1, 15), category=category)
+    with pytest.raises(CommandError):
+        call_command('rebuild_monthly_rollups', '--verify')
+
+    call_command('rebuild_monthly_rollups')
+    call_command('rebuild_monthly_rollups', '--verify')
+    assert MonthlyRollup.objects.get(user=user).total == Decimal("90.00")
+
+
+def test_yearly_summary_reads_rollups(
+        user, api_client, category, django_assert_num_queries):
+    url = reverse('expense-list')
+    api_client.post(url, expense_data(category, "100.00", 5))
+    api_client.post(reverse('income-list'), {
+        **expense_data(None, "300.00", 1), "title": "Salário"})
+
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            reverse('finance-summary-yearly'), {'year': 2024})
+
+    assert response.status_code == 200
+    march = response.data['months'][2]
+    assert march == {
+        'month': 3,
+        'income_total': "300.00",
+        'expense_total': "100.00",
+        'balance': "200.00",
+    }
+    assert response.data['categories']['expenses'][0]['total'] == "100.00"
@@ -0,0 +1,117 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Category, Debt, Expense, Income, RecurringBill
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username='testuser',
+        email='test@example.com',
+        password='testpass123'
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def test_monthly_summary(user, api_client, django_assert_num_queries):
+    """Resumo mensal calculado inteiramente por agregações"""
+    salary = Category.objects.create(name="Salário")
+    food = Category.objects.create(name="Alimentação")
+    Income.objects.create(
+        user=user, title="Salário", value=Decimal("3000.00"),
+        description="Mensal", date=date(2024, 5, 5), category=salary)
+    Income.objects.create(
+        user=user, title="Extra", value=Decimal("500.00"),
+        description="Freela", date=date(2024, 5, 20))
+    Expense.objects.create(
+        user=user, title="Mercado", value=Decimal("800.00"),
+        description="Compras", date=date(2024, 5, 10), category=food)
+    Expense.objects.create(
+        user=user, title="Restaurante", value=Decimal("200.00"),
+        description="Jantar", date=date(2024, 5, 31), category=food)
+    # Fora do período
+    Expense.objects.create(
+        user=user, title="Junho", value=Decimal("999.00"),
+        description="Outro mês", date=date(2024, 6, 1), category=food)
+    Debt.objects.create(
+        user=user, name="Cartão", value=Decimal("450.00"),
+        description="Fatura", date=date(2024, 4, 20),
+        due_date=date(2024, 5, 15))
+    Debt.objects.create(
+        user=user, name="Pago", value=Decimal("100.00"),
+        description="Quitada", date=date(2024, 4, 20),
+        due_date=date(2024, 5, 15), paid=True)
+
+    rent = RecurringBill.objects.create(
+        user=user, name="Aluguel", value=Decimal("1200.00"), due_day=10)
+    RecurringBill.objects.create(
+        user=user, name="Internet", value=Decimal("100.00"), due_day=20)
+    RecurringBill.objects.create(
+        user=user, name="Academia", value=Decimal("90.00"), due_day=5,
+        is_active=False,
+        deactivated_at=timezone.make_aware(datetime(2024, 3, 10)))
+    rent.mark_paid_for_period(2024, 5, Decimal("1150.00"))
+
+    with django_assert_num_queries(5):
+        response = api_client.get(
+            reverse('finance-summary'), {'year': 2024, 'month': 5})
+
+    assert response.status_code == 200
+    data = response.data
+    assert data['income_total'] == "3500.00"
+    assert data['expense_total'] == "1000.00"
+    assert data['balance'] == "2500.00"
+    assert data['unpaid_debt_total'] == "450.00"
+    assert data['recurring_bills'] == {
+        'due_total': "1300.00",
+        'paid_total': "1150.00",
+        'pending_total': "150.00",
+    }
+    expenses = data['categories']['expenses']
+    assert [(c['category_name'], c['total']) for c in expenses] == [
+        ("Alimentação", "1000.00")]
+    incomes = {c['category']: c['total']
+               for c in data['categories']['incomes']}
+    assert incomes == {salary.pk: "3000.00", None: "500.00"}
+
+
+def test_monthly_summary_requires_period(api_client):
+    response = api_client.get(reverse('finance-summary'), {'year': 2024})
+    assert response.status_code == 400
+    response = api_client.get(
+        reverse('finance-summary'), {'year': 2024, 'month': 13})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('year', ['0', '10000', '²'])
+def test_summaries_reject_years_outside_date_range(api_client, year):
+    response = api_client.get(
+        reverse('finance-summary'), {'year': year, 'month': 1})
+    assert response.status_code == 400
+    response = api_client.get(
+        reverse('finance-summary-yearly'), {'year': year})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('year, month', [(1, 1), (9999, 12)])
+def test_monthly_summary_at_date_limits(api_client, year, month):
+    response = api_client.get(
+        reverse('finance-summary'), {'year': year, 'month': month})
+    assert response.status_code == 200
+    assert response.data['income_total'] == "0.00"
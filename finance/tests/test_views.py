@@ -1,11 +1,12 @@
 from datetime import date
+from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 
-from ..models import Category
+from ..models import Category, Expense, Objective
 
 pytestmark = pytest.mark.django_db
 
@@ -244,3 +245,75 @@ def test_objective_crud_and_error(api_client):
     # Error: retrieve inexistente
     response = api_client.get(url_detail)
     assert response.status_code == 404
+
+# FILTROS
+
+
+def test_transaction_date_and_category_filters(api_client):
+    """Filtra despesas por período e categoria na própria consulta."""
+    user = get_user_model().objects.get(email='test@example.com')
+    food = Category.objects.create(name="Comida")
+    transport = Category.objects.create(name="Transporte")
+    for day, category in [(5, food), (15, transport), (25, food)]:
+        Expense.objects.create(
+            user=user, title=f"Dia {day}", value="10.00",
+            description="Teste", date=date(2024, 3, day), category=category)
+    Expense.objects.create(
+        user=user, title="Abril", value="10.00", description="Teste",
+        date=date(2024, 4, 1), category=food)
+
+    url = reverse('expense-list')
+    response = api_client.get(
+        url, {'date_from': '2024-03-01', 'date_to': '2024-03-31'})
+    assert response.status_code == 200
+    assert [e['title'] for e in response.data['results']] == [
+        "Dia 25", "Dia 15", "Dia 5"]
+
+    response = api_client.get(
+        url, {'date_from': '2024-03-10', 'category': food.pk})
+    assert [e['title'] for e in response.data['results']] == [
+        "Abril", "Dia 25"]
+
+    response = api_client.get(url, {'date_from': '01/03/2024'})
+    assert response.status_code == 400
+    assert 'date_from' in response.data
+
+
+def test_objective_list_shows_recent_deposits_preview(
+        api_client, django_assert_num_queries):
+    """A listagem traz só os últimos depósitos e a contagem total."""
+    user = get_user_model().objects.get(email='test@example.com')
+    for n in range(3):
+        objective = Objective.objects.create(
+            user=user, title=f"Objetivo {n}", target_value=Decimal("10000.00"))
+        for amount in range(1, 8):
+            objective.add_deposit(amount)
+
+    # Objetivos anotados + depósitos recentes (prefetch)
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('objective-list'))
+    assert response.status_code == 200
+    for item in response.data:
+        assert 'deposits' not in item
+        assert item['deposits_count'] == 7
+        assert [d['amount'] for d in item['recent_deposits']] == [
+            "7.00", "6.00", "5.00", "4.00", "3.00"]
+
+
+def test_objective_deposits_paginated(api_client):
+    """O histórico completo fica em um sub-recurso paginado."""
+    user = get_user_model().objects.get(email='test@example.com')
+    objective = Objective.objects.create(
+        user=user, title="Reserva", target_value=Decimal("10000.00"))
+    for amount in range(1, 6):
+        objective.add_deposit(amount)
+
+    url = reverse('objective-deposits', args=[objective.slug])
+    amounts = []
+    url += '?page_size=2'
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        amounts.extend(d['amount'] for d in response.data['results'])
+        url = response.data['next']
+    assert amounts == ["5.00", "4.00", "3.00", "2.00", "1.00"]
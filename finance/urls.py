@@ -12,5 +12,10 @@ router.register('debts', views.DebtViewSet)
 router.register('recurring-bills', views.RecurringBillViewSet)
 
 urlpatterns = [
+    path('summary/', views.monthly_summary, name='finance-summary'),
+    path('summary/yearly/', views.yearly_summary,
+         name='finance-summary-yearly'),
+    path('import/', views.import_statement, name='finance-import'),
+    path('cache-stats/', views.cache_stats, name='finance-cache-stats'),
     path('', include(router.urls)),
 ]
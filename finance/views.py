@@ -1,36 +1,105 @@
+from datetime import MAXYEAR, MINYEAR
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from rest_framework import status, viewsets
-from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import (action, api_view, parser_classes,
+                                       permission_classes)
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from dot_equilibrium.conditional import (ConditionalListMixin,
+                                         conditional_per_user)
+from dot_equilibrium.fieldsets import SparseFieldsMixin
+from dot_equilibrium.instrumentation import InstrumentedViewMixin
+
+from . import bulk, cache, importer, rollups
+from .fastpath import FastListMixin
+from .filters import TransactionFilterBackend
 from .models import (Category, Debt, Expense, Income, Objective,
                      ObjectiveDeposit, RecurringBill, RecurringBillPayment)
+from .pagination import DepositPagination, KeysetPagination
 from .serializers import (CategorySerializer, DebtSerializer,
                           ExpenseSerializer, IncomeSerializer,
-                          ObjectiveDepositSerializer, ObjectiveSerializer,
+                          MonthlySummarySerializer, ObjectiveDepositSerializer,
+                          ObjectiveListSerializer, ObjectiveSerializer,
                           RecurringBillPaymentSerializer,
-                          RecurringBillSerializer)
+                          RecurringBillSerializer, RecurringBillYearSerializer,
+                          YearlySummarySerializer)
+from .summary import build_monthly_summary, build_yearly_summary
+
 
+class FinanceReadMixin(ConditionalListMixin, cache.CachedListMixin,
+                       InstrumentedViewMixin, SparseFieldsMixin):
+    """
+    Leituras com GET condicional, cache por usuário, campos esparsos e
+    tempo de serialização medido
+    """
+    version_namespace = cache.NAMESPACE
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class CategoryViewSet(InstrumentedViewMixin, SparseFieldsMixin,
+                      viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
     permission_classes = [IsAuthenticated]
 
 
-class ObjectiveViewSet(viewsets.ModelViewSet):
+class ObjectiveViewSet(FinanceReadMixin, viewsets.ModelViewSet):
     queryset = Objective.objects.all()
     serializer_class = ObjectiveSerializer
     lookup_field = 'slug'
     permission_classes = [IsAuthenticated]
+    # Quantidade de depósitos exibidos na listagem de objetivos
+    recent_deposits_limit = 5
+    sparse_field_dependencies = {
+        'progress_percentage': ('current_value', 'target_value'),
+        'remaining_amount': ('current_value', 'target_value'),
+        'days_remaining': ('deadline',),
+        'status': ('achieved',),
+        'category_display': ('category',),
+        'deposits': (),
+        'recent_deposits': (),
+        'deposits_count': (),
+    }
 
     def get_queryset(self):
-        return Objective.objects.filter(user=self.request.user)
+        queryset = Objective.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            if self.wants('deposits_count'):
+                queryset = queryset.annotate(deposits_count=Count('deposits'))
+            if self.wants('recent_deposits'):
+                recent = ObjectiveDeposit.objects.order_by(
+                    '-date_added', '-id')[:self.recent_deposits_limit]
+                queryset = queryset.prefetch_related(
+                    Prefetch('deposits', queryset=recent,
+                             to_attr='recent_deposits')
+                )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ObjectiveListSerializer
+        return ObjectiveSerializer
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=True, methods=['get'])
+    def deposits(self, request, slug=None):
+        """
+        Lista o histórico de depósitos do objetivo, paginado por cursor
+        """
+        objective = self.get_object()
+        paginator = DepositPagination()
+        page = paginator.paginate_queryset(
+            objective.deposits.all(), request, view=self)
+        serializer = ObjectiveDepositSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'])
     def add_deposit(self, request, slug=None):
         """
@@ -121,34 +190,182 @@ class ObjectiveViewSet(viewsets.ModelViewSet):
             )
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class MonthlyRollupMixin:
+    """
+    Mantém o MonthlyRollup atualizado nas escritas do viewset, na mesma
+    transação da alteração.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save(user=self.request.user)
+            rollups.apply(added=[rollups.contribution(instance)])
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old = rollups.contribution(serializer.instance)
+            instance = serializer.save()
+            rollups.apply(removed=[old],
+                          added=[rollups.contribution(instance)])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            rollups.apply(removed=[rollups.contribution(instance)])
+            instance.delete()
+
+
+def _is_id(value):
+    # bool é subclasse de int, mas true/false não são ids
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _item_id(item):
+    """Id inteiro do item, ou None se ausente ou inválido."""
+    value = item.get('id') if isinstance(item, dict) else None
+    if _is_id(value):
+        return value
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value)
+    return None
+
+
+class BulkWriteMixin:
+    """
+    Endpoint `bulk/` para criar (POST), atualizar (PUT/PATCH) e excluir
+    (DELETE) vários objetos em uma requisição e uma transação.
+
+    Criação e atualização são tudo ou nada: se algum item for inválido
+    nada é gravado e a resposta lista os erros com o índice de cada item.
+    """
+
+    def _check_bulk_items(self, items):
+        if not isinstance(items, list):
+            return 'Expected a list of items'
+        if len(items) > settings.FINANCE_BULK_MAX_ITEMS:
+            return f'Too many items (max {settings.FINANCE_BULK_MAX_ITEMS})'
+        return None
+
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'],
+            url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+        return self.bulk_update(request, partial=request.method == 'PATCH')
+
+    def bulk_create(self, request):
+        error = self._check_bulk_items(request.data)
+        if error:
+            return Response({'error': error},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            errors = [
+                {'index': index, 'errors': item_errors}
+                for index, item_errors in enumerate(serializer.errors)
+                if item_errors
+            ]
+            return Response({'errors': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        objs = bulk.create(self.queryset.model, request.user,
+                           serializer.validated_data)
+        return Response(self.get_serializer(objs, many=True).data,
+                        status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, partial=False):
+        items = request.data
+        error = self._check_bulk_items(items)
+        if error:
+            return Response({'error': error},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        ids = [_item_id(item) for item in items]
+        instances = self.get_queryset().in_bulk(
+            {pk for pk in ids if pk is not None})
+
+        errors = []
+        changes = []
+        seen = set()
+        for index, (pk, item) in enumerate(zip(ids, items)):
+            if pk is None:
+                missing = not isinstance(item, dict) or 'id' not in item
+                message = ('This field is required.' if missing
+                           else 'A valid integer is required.')
+                errors.append({'index': index, 'errors': {'id': [message]}})
+                continue
+            if pk in seen:
+                errors.append({'index': index,
+                               'errors': {'id': ['Duplicate id.']}})
+                continue
+            seen.add(pk)
+            instance = instances.get(pk)
+            if instance is None:
+                errors.append({'index': index,
+                               'errors': {'id': ['Not found.']}})
+                continue
+            serializer = self.get_serializer(
+                instance, data=item, partial=partial)
+            if serializer.is_valid():
+                changes.append((instance, serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        if errors:
+            return Response({'errors': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        objs = bulk.update(self.queryset.model, request.user, changes)
+        return Response(self.get_serializer(objs, many=True).data)
+
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(
+            request.data, dict) else None
+        error = self._check_bulk_items(ids)
+        if error:
+            return Response({'error': error},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not all(_is_id(pk) for pk in ids):
+            return Response({'error': 'Ids must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        deleted = bulk.delete(self.get_queryset().filter(pk__in=ids))
+        not_found = sorted(set(ids) - set(deleted))
+        return Response({'deleted': sorted(deleted), 'not_found': not_found})
+
+
+class IncomeViewSet(FinanceReadMixin, FastListMixin, MonthlyRollupMixin,
+                    BulkWriteMixin, viewsets.ModelViewSet):
     queryset = Income.objects.all()
     serializer_class = IncomeSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [TransactionFilterBackend]
 
     def get_queryset(self):
         return Income.objects.filter(user=self.request.user)
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(FinanceReadMixin, FastListMixin, MonthlyRollupMixin,
+                     BulkWriteMixin, viewsets.ModelViewSet):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [TransactionFilterBackend]
 
     def get_queryset(self):
         return Expense.objects.filter(user=self.request.user)
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
 
-
-class DebtViewSet(viewsets.ModelViewSet):
+class DebtViewSet(FinanceReadMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Debt.objects.all()
     serializer_class = DebtSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [TransactionFilterBackend]
 
     def get_queryset(self):
         return Debt.objects.filter(user=self.request.user)
@@ -157,17 +374,59 @@ class DebtViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class RecurringBillViewSet(viewsets.ModelViewSet):
+class RecurringBillViewSet(FinanceReadMixin, viewsets.ModelViewSet):
     queryset = RecurringBill.objects.all()
     serializer_class = RecurringBillSerializer
     permission_classes = [IsAuthenticated]
+    sparse_field_dependencies = {'payment_for_period': ()}
 
     def get_queryset(self):
-        return RecurringBill.objects.filter(user=self.request.user)
+        queryset = RecurringBill.objects.filter(user=self.request.user)
+        year = self.request.query_params.get('year')
+        month = self.request.query_params.get('month')
+        if (year and month and year.isdigit() and month.isdigit()
+                and self.wants('payment_for_period')):
+            # Busca os pagamentos do período de todas as contas em uma
+            # única consulta, evitando uma consulta por conta no serializer
+            queryset = queryset.prefetch_related(Prefetch(
+                'payments',
+                queryset=RecurringBillPayment.objects.filter(
+                    year=int(year), month=int(month)),
+                to_attr='period_payments'
+            ))
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def year_matrix(self, request):
+        """
+        Retorna todas as contas com a situação de cada mês de um ano
+        """
+        year = _parse_year(request.query_params.get('year', ''))
+        if not year:
+            return Response(
+                {'error': 'Year is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bills = list(
+            RecurringBill.objects.filter(user=request.user)
+            .order_by('due_day', 'name')
+        )
+        payments = {}
+        for payment in RecurringBillPayment.objects.filter(
+                recurring_bill__user=request.user, year=year):
+            payments.setdefault(
+                payment.recurring_bill_id, {})[payment.month] = payment
+
+        serializer = RecurringBillYearSerializer(
+            bills, many=True,
+            context={'request': request, 'year': year, 'payments': payments}
+        )
+        return Response({'year': year, 'bills': serializer.data})
+
     @action(detail=True, methods=['post'])
     def mark_paid(self, request, pk=None):
         """
@@ -243,3 +502,100 @@ class RecurringBillViewSet(viewsets.ModelViewSet):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+def _parse_year(value):
+    """Ano da query string, ou None se não for um ano válido para date()."""
+    if value.isdecimal() and MINYEAR <= int(value) <= MAXYEAR:
+        return int(value)
+    return None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_per_user(cache.NAMESPACE)
+@cache.cache_per_user
+def monthly_summary(request):
+    """
+    Resumo financeiro do mês
+    GET: Totais de receitas, despesas, dívidas em aberto e contas
+    recorrentes, além das somas por categoria (?year=&month=)
+    """
+    year = _parse_year(request.query_params.get('year', ''))
+    month = request.query_params.get('month', '')
+    if not (year and month.isdecimal() and 1 <= int(month) <= 12):
+        return Response(
+            {'error': 'Year and month are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    summary = build_monthly_summary(request.user, year, int(month))
+    return Response(MonthlySummarySerializer(summary).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_per_user(cache.NAMESPACE)
+@cache.cache_per_user
+def yearly_summary(request):
+    """
+    Resumo financeiro do ano
+    GET: Totais de receitas e despesas mês a mês e por categoria (?year=)
+    """
+    year = _parse_year(request.query_params.get('year', ''))
+    if not year:
+        return Response(
+            {'error': 'Year is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    summary = build_yearly_summary(request.user, year)
+    return Response(YearlySummarySerializer(summary).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_statement(request):
+    """
+    Importa um extrato bancário (CSV ou OFX) enviado no campo `file`.
+
+    Campos opcionais: `format` (padrão: extensão do arquivo), `encoding` e
+    `rules` (JSON com as regras de categorização). Responde com o
+    relatório da importação.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'File is required'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('format') or importer.guess_format(
+        upload.name)
+    if file_format not in importer.PARSERS:
+        return Response({'error': 'Unsupported file format'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        rules = importer.compile_rules(
+            request.data.get('rules')
+            or settings.FINANCE_IMPORT_CATEGORY_RULES)
+        rows = importer.read_file(
+            upload.file, file_format,
+            encoding=request.data.get('encoding') or 'utf-8-sig')
+        report = importer.import_transactions(request.user, rows, rules)
+    except LookupError:
+        return Response({'error': 'Unknown encoding'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    except importer.ImportFormatError as e:
+        return Response({'error': str(e)},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(report.as_dict())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    Contadores do cache de respostas do finance neste processo
+    """
+    return Response(cache.stats.snapshot())
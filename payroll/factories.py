@@ -0,0 +1,39 @@
+from datetime import date
+from decimal import Decimal
+
+import factory
+
+from accounts.factories import UserFactory
+
+from .models import Employee, PayrollPeriod, PayrollPeriodItem
+
+
+class EmployeeFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Employee
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f'Funcionário {n}')
+    role = 'Auxiliar'
+    salary = Decimal('2500.00')
+    hiring_date = date(2023, 1, 2)
+
+
+class PayrollPeriodFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PayrollPeriod
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f'Período {n}')
+    start_date = date(2024, 1, 1)
+    end_date = date(2024, 1, 31)
+
+
+class PayrollPeriodItemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PayrollPeriodItem
+
+    period = factory.SubFactory(PayrollPeriodFactory)
+    employee = factory.SubFactory(
+        EmployeeFactory, user=factory.SelfAttribute('..period.user'))
+    amount = Decimal('500.00')
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0004_remove_payroll_employee_remove_payroll_user_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payrollperiod',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payrollperioditem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['user', 'updated_at'], name='payroll_emp_user_id_0d65e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollperiod',
+            index=models.Index(fields=['user', 'updated_at'], name='payroll_pay_user_id_9354b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollperioditem',
+            index=models.Index(fields=['updated_at'], name='payroll_pay_updated_6d68c7_idx'),
+        ),
+    ]
@@ -20,12 +20,16 @@ class PayrollPeriod(models.Model):
                               default='active')
     created_at = models.DateTimeField(auto_now_add=True)
     closed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} ({self.start_date} - {self.end_date})"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
 
 class PayrollPeriodItem(models.Model):
@@ -52,6 +56,7 @@ class PayrollPeriodItem(models.Model):
     is_processed = models.BooleanField(default=False)
     payment_date = models.DateField(null=True, blank=True,
                                     help_text="Data do pagamento (manual)")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         type_display = dict(self.PAYMENT_TYPE_CHOICES).get(
@@ -60,6 +65,9 @@ class PayrollPeriodItem(models.Model):
 
     class Meta:
         ordering = ['-date_added']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
 
 class Employee(models.Model):
@@ -70,6 +78,12 @@ class Employee(models.Model):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     hiring_date = models.DateField()
     termination_date = models.DateField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return self.name
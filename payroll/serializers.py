@@ -1,3 +1,4 @@
+from django.db.models import Sum
 from rest_framework import serializers
 
 from .models import Employee, PayrollPeriod, PayrollPeriodItem
@@ -33,7 +34,19 @@ class PayrollPeriodSerializer(serializers.ModelSerializer):
         read_only_fields = ('user',)
 
     def get_total_amount(self, obj):
-        return sum(item.amount for item in obj.items.all())
+        # Usa a anotação do queryset do viewset quando disponível
+        total = getattr(obj, 'total_amount', None)
+        if total is None:
+            total = obj.items.aggregate(total=Sum('amount'))['total']
+        return total or 0
 
     def get_employees_count(self, obj):
-        return obj.items.values('employee').distinct().count()
+        count = getattr(obj, 'employees_count', None)
+        if count is None:
+            count = obj.items.values('employee').distinct().count()
+        return count
+
+
+class PayrollPeriodListSerializer(PayrollPeriodSerializer):
+    """Representação resumida do período para listagens, sem os itens"""
+    items = None
@@ -0,0 +1,12 @@
+from dot_equilibrium import versioning
+
+from .models import Employee, PayrollPeriod, PayrollPeriodItem
+
+NAMESPACE = 'payroll'
+
+# Toda escrita nestes modelos muda o ETag das listagens do usuário dono
+versioning.register(
+    NAMESPACE,
+    user_models=(Employee, PayrollPeriod),
+    child_models={PayrollPeriodItem: 'period'},
+)
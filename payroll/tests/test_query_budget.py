@@ -0,0 +1,46 @@
+"""
+Número de consultas das leituras da folha: não pode crescer com a
+quantidade de linhas (1, 10 e 100).
+"""
+import pytest
+from django.urls import reverse
+
+from ..factories import (EmployeeFactory, PayrollPeriodFactory,
+                         PayrollPeriodItemFactory)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_employees(query_budget, api_get, user):
+    query_budget(api_get(reverse('employee-list')),
+                 lambda n: EmployeeFactory.create_batch(n, user=user))
+
+
+def test_period_list_with_items(query_budget, api_get, user):
+    def seed(n):
+        for period in PayrollPeriodFactory.create_batch(n, user=user):
+            PayrollPeriodItemFactory.create_batch(2, period=period)
+
+    query_budget(api_get(reverse('payrollperiod-list')), seed)
+
+
+def test_period_detail_items(query_budget, api_get, user):
+    period = PayrollPeriodFactory(user=user)
+
+    query_budget(
+        api_get(reverse('payrollperiod-detail', args=[period.pk])),
+        lambda n: PayrollPeriodItemFactory.create_batch(n, period=period))
+    query_budget(
+        api_get(reverse('payrollperiod-active-period')),
+        lambda n: PayrollPeriodItemFactory.create_batch(n, period=period))
+
+
+def test_period_items(query_budget, api_get, user):
+    period = PayrollPeriodFactory(user=user)
+
+    query_budget(
+        api_get(reverse('payrollperioditem-list')),
+        lambda n: PayrollPeriodItemFactory.create_batch(n, period=period))
+    query_budget(
+        api_get(reverse('payrollperioditem-list'), period=period.pk),
+        lambda n: PayrollPeriodItemFactory.create_batch(n, period=period))
@@ -3,10 +3,12 @@ from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 
-from payroll.models import Employee
+from payroll.models import Employee, PayrollPeriod, PayrollPeriodItem
 
 pytestmark = pytest.mark.django_db
 
@@ -20,6 +22,35 @@ def api_client():
     return client
 
 
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='payroll@example.com', password='testpass')
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def create_period_with_items(user, name, amounts):
+    period = PayrollPeriod.objects.create(
+        user=user, name=name,
+        start_date=date(2024, 1, 1), end_date=date(2024, 1, 31))
+    employees = [
+        Employee.objects.create(
+            user=user, name=f"Funcionário {n}", role="Operador",
+            salary=Decimal("2000.00"), hiring_date=date(2023, 1, 1))
+        for n in range(2)
+    ]
+    for n, amount in enumerate(amounts):
+        PayrollPeriodItem.objects.create(
+            period=period, employee=employees[n % 2], amount=amount)
+    return period
+
+
 def test_employee_crud_and_error(api_client):
     """
     Testa CRUD e erro para Employee.
@@ -49,3 +80,111 @@ def test_employee_crud_and_error(api_client):
     # Error
     response = api_client.get(url_detail)
     assert response.status_code == 404
+
+
+def test_payroll_period_totals_from_annotations(user, user_client):
+    """Totais do período vêm das anotações do queryset."""
+    create_period_with_items(
+        user, "Janeiro", [Decimal("100.00"), Decimal("250.50"),
+                          Decimal("49.50")])
+    create_period_with_items(user, "Fevereiro", [])
+
+    response = user_client.get(reverse('payrollperiod-list'))
+    assert response.status_code == 200
+    totals = {
+        period['name']: (period['total_amount'], period['employees_count'])
+        for period in response.data
+    }
+    assert totals["Janeiro"] == (Decimal("400.00"), 2)
+    assert totals["Fevereiro"] == (0, 0)
+
+
+def test_payroll_period_list_is_summary_only(
+        user, user_client, django_assert_num_queries):
+    """A listagem não embute itens e custa uma única consulta."""
+    for n in range(3):
+        create_period_with_items(
+            user, f"Período {n}", [Decimal("10.00")] * (n + 1))
+
+    with django_assert_num_queries(1):
+        response = user_client.get(reverse('payrollperiod-list'))
+    assert response.status_code == 200
+    assert len(response.data) == 3
+    assert all('items' not in period for period in response.data)
+
+
+def test_payroll_period_detail_and_items_prefetched(
+        user, user_client, django_assert_num_queries):
+    """O detalhe traz os itens com o nome do funcionário sem N+1."""
+    period = create_period_with_items(
+        user, "Março", [Decimal("10.00")] * 4)
+
+    # Período anotado + itens com funcionário (select_related)
+    with django_assert_num_queries(2):
+        response = user_client.get(
+            reverse('payrollperiod-detail', args=[period.pk]))
+    assert len(response.data['items']) == 4
+    assert response.data['items'][0]['employee_name'].startswith(
+        "Funcionário")
+
+    with django_assert_num_queries(1):
+        response = user_client.get(
+            reverse('payrollperioditem-list'), {'period': period.pk})
+    assert len(response.data) == 4
+
+
+def test_payroll_lists_support_conditional_get(
+        user, user_client, django_assert_num_queries, settings):
+    """Listagens respondem 304 até uma escrita de qualquer modelo do payroll"""
+    settings.CONDITIONAL_GET_ENABLED = True
+    period = create_period_with_items(user, "Abril", [Decimal("10.00")])
+    url = reverse('payrollperiod-list')
+    etag = user_client.get(url)['ETag']
+
+    with django_assert_num_queries(0):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    # Itens são invalidados pelo usuário do período
+    item = period.items.first()
+    item.amount = Decimal("20.00")
+    item.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data[0]['total_amount'] == Decimal("20.00")
+
+    employees_url = reverse('employee-list')
+    etag = user_client.get(employees_url)['ETag']
+    period.delete()
+    response = user_client.get(employees_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+def test_payroll_sparse_fields_skip_aggregates_and_joins(
+        user, user_client):
+    period = create_period_with_items(
+        user, "Junho", [Decimal("10.00"), Decimal("20.00")])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(
+            reverse('payrollperiod-list'), {'fields': 'id,name'})
+    assert response.data == [{'id': period.pk, 'name': "Junho"}]
+    sql = queries.captured_queries[0]['sql']
+    assert 'SUM' not in sql.upper() and 'COUNT' not in sql.upper()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(
+            reverse('payrollperioditem-list'),
+            {'period': period.pk, 'fields': 'id,amount'})
+    assert sorted(row['amount'] for row in response.data) == [
+        "10.00", "20.00"]
+    assert len(queries) == 1
+    assert 'payroll_employee' not in queries.captured_queries[0]['sql']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(
+            reverse('payrollperioditem-list'),
+            {'period': period.pk, 'fields': 'amount,employee_name'})
+    assert len(queries) == 1
+    assert all(row['employee_name'].startswith("Funcionário")
+               for row in response.data)
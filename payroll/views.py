@@ -1,14 +1,25 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from dot_equilibrium.conditional import ConditionalListMixin
+from dot_equilibrium.fieldsets import SparseFieldsMixin
+from dot_equilibrium.instrumentation import InstrumentedViewMixin
+
 from .models import Employee, PayrollPeriod, PayrollPeriodItem
 from .serializers import (EmployeeSerializer, PayrollPeriodItemSerializer,
-                          PayrollPeriodSerializer)
+                          PayrollPeriodListSerializer, PayrollPeriodSerializer)
+from .signals import NAMESPACE
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ConditionalListMixin, InstrumentedViewMixin,
+                      SparseFieldsMixin, viewsets.ModelViewSet):
+    version_namespace = NAMESPACE
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [IsAuthenticated]
@@ -20,13 +31,41 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class PayrollPeriodViewSet(viewsets.ModelViewSet):
+class PayrollPeriodViewSet(ConditionalListMixin, InstrumentedViewMixin,
+                           SparseFieldsMixin, viewsets.ModelViewSet):
+    version_namespace = NAMESPACE
     queryset = PayrollPeriod.objects.all()
     serializer_class = PayrollPeriodSerializer
     permission_classes = [IsAuthenticated]
+    sparse_field_dependencies = {
+        'items': (),
+        'total_amount': (),
+        'employees_count': (),
+    }
 
     def get_queryset(self):
-        return PayrollPeriod.objects.filter(user=self.request.user)
+        queryset = PayrollPeriod.objects.filter(user=self.request.user)
+        # Totais calculados no banco, em vez de carregar os itens no Python
+        if self.wants('total_amount'):
+            queryset = queryset.annotate(total_amount=Coalesce(
+                Sum('items__amount'), Value(Decimal('0')),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ))
+        if self.wants('employees_count'):
+            queryset = queryset.annotate(
+                employees_count=Count('items__employee', distinct=True))
+        if self.action != 'list' and self.wants('items'):
+            # Apenas o detalhe traz os itens, já com o funcionário
+            queryset = queryset.prefetch_related(Prefetch(
+                'items',
+                queryset=PayrollPeriodItem.objects.select_related('employee')
+            ))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PayrollPeriodListSerializer
+        return PayrollPeriodSerializer
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -49,8 +88,8 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
     def active_period(self, request):
         """Obter o período ativo atual"""
         try:
-            active_period = PayrollPeriod.objects.filter(
-                user=self.request.user, status='active').first()
+            active_period = self.get_queryset().filter(
+                status='active').first()
             if active_period:
                 serializer = self.get_serializer(active_period)
                 return Response(serializer.data)
@@ -61,14 +100,22 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
                             status=404)
 
 
-class PayrollPeriodItemViewSet(viewsets.ModelViewSet):
+class PayrollPeriodItemViewSet(ConditionalListMixin, InstrumentedViewMixin,
+                               SparseFieldsMixin, viewsets.ModelViewSet):
+    version_namespace = NAMESPACE
     queryset = PayrollPeriodItem.objects.all()
     serializer_class = PayrollPeriodItemSerializer
     permission_classes = [IsAuthenticated]
+    sparse_field_dependencies = {
+        'employee_name': ('employee', 'employee__name'),
+        'payment_type_display': ('payment_type',),
+    }
 
     def get_queryset(self):
         queryset = PayrollPeriodItem.objects.filter(
             period__user=self.request.user)
+        if self.wants('employee_name'):
+            queryset = queryset.select_related('employee')
         period_id = self.request.query_params.get('period', None)
         if period_id is not None:
             queryset = queryset.filter(period=period_id)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_id', 'user', 'deleted_at')
+    list_filter = ('model', 'deleted_at')
@@ -0,0 +1,104 @@
+"""
+Exportação em fluxo de todos os dados de um usuário (NDJSON ou CSV).
+
+Os objetos são lidos com .iterator(chunk_size=...), que no PostgreSQL usa
+cursores do lado do servidor, e escritos linha a linha na resposta; a
+memória usada não cresce com o tamanho da conta.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .feed import SYNC_MODELS
+
+# Linhas agrupadas por escrita na resposta
+LINES_PER_WRITE = 500
+
+
+class _Echo:
+    """Pseudo-arquivo para o csv.writer devolver a linha escrita"""
+
+    def write(self, value):
+        return value
+
+
+def _columns(model):
+    """(nome exposto, atributo) dos campos; chaves estrangeiras como id."""
+    return [(field.name, field.attname)
+            for field in model._meta.concrete_fields]
+
+
+def _rows(user):
+    """Gera (modelo, colunas, valores) de todos os objetos do usuário."""
+    for model, owner in SYNC_MODELS:
+        columns = _columns(model)
+        queryset = (
+            model.objects
+            .filter(**{owner: user})
+            .order_by('pk')
+            .values_list(*(attname for _, attname in columns))
+        )
+        for values in queryset.iterator(
+                chunk_size=settings.SYNC_EXPORT_CHUNK_SIZE):
+            yield model, columns, values
+
+
+def _grouped(lines):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= LINES_PER_WRITE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def ndjson_lines(user):
+    """Um objeto JSON por linha: {"model": ..., "data": {...}}."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def lines():
+        for model, columns, values in _rows(user):
+            data = {name: value for (name, _), value in zip(columns, values)}
+            yield encoder.encode({
+                'model': model._meta.label_lower, 'data': data}) + '\n'
+
+    return _grouped(lines())
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(user):
+    """
+    Um bloco por modelo, cada um com seu cabeçalho; a primeira coluna de
+    todas as linhas identifica o modelo.
+    """
+    writer = csv.writer(_Echo())
+
+    def lines():
+        current = None
+        for model, columns, values in _rows(user):
+            label = model._meta.label_lower
+            if model is not current:
+                current = model
+                yield writer.writerow(
+                    ['model'] + [name for name, _ in columns])
+            yield writer.writerow(
+                [label] + [_csv_value(value) for value in values])
+
+    return _grouped(lines())
+
+
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+}
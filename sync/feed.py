@@ -0,0 +1,193 @@
+"""
+Feed de alterações por usuário para clientes offline.
+
+O cliente guarda o token devolvido a cada sync e o envia na próxima
+requisição; recebe então apenas os objetos criados ou alterados depois
+daquele instante (pelo `updated_at`) e os ids excluídos (pelos
+Tombstones). Sem token, o feed devolve todos os dados do usuário.
+
+O token é o instante da requisição em microssegundos. Como `updated_at`
+é definido antes do commit, uma transação longa pode gravar um valor
+anterior ao token emitido por outra requisição; por isso cada sync relê
+uma janela de SYNC_WINDOW_SECONDS antes do token. Objetos repetidos são
+esperados e devem ser aplicados pelo cliente como upsert.
+
+Cada resposta traz no máximo SYNC_PAGE_SIZE objetos e ids excluídos.
+Quando há mais, `next` traz um cursor de continuação que o cliente envia
+em `cursor` para buscar a página seguinte; o `token` é o mesmo em todas as
+páginas e só deve ser guardado depois da última (`next` nulo). Quando uma
+página termina exatamente no fim de um modelo, a seguinte pode vir vazia.
+"""
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from finance.models import (Debt, Expense, Income, Objective, ObjectiveDeposit,
+                            RecurringBill, RecurringBillPayment)
+from payroll.models import Employee, PayrollPeriod, PayrollPeriodItem
+
+from .models import Tombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Modelos sincronizados e o caminho até o usuário dono, com os pais antes
+# dos filhos para que o cliente possa aplicar na ordem recebida
+SYNC_MODELS = [
+    (Income, 'user'),
+    (Expense, 'user'),
+    (Debt, 'user'),
+    (RecurringBill, 'user'),
+    (RecurringBillPayment, 'recurring_bill__user'),
+    (Objective, 'user'),
+    (ObjectiveDeposit, 'objective__user'),
+    (Employee, 'user'),
+    (PayrollPeriod, 'user'),
+    (PayrollPeriodItem, 'period__user'),
+]
+
+_serializers = {}
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+class ExpiredToken(Exception):
+    """O token é anterior à retenção dos Tombstones: requer sync completo"""
+
+
+def encode_token(moment):
+    return str((moment - EPOCH) // timedelta(microseconds=1))
+
+
+def decode_token(token):
+    try:
+        return EPOCH + timedelta(microseconds=int(token))
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidToken(token)
+
+
+def encode_cursor(since, now, position, after=None):
+    """
+    Cursor de continuação: início do intervalo (vazio no sync completo),
+    token final, posição do modelo em SYNC_MODELS (os Tombstones vêm por
+    último) e a chave (instante, pk) da última linha entregue.
+    """
+    moment, pk = after or (None, None)
+    return ':'.join([
+        encode_token(since) if since is not None else '',
+        encode_token(now), str(position),
+        encode_token(moment) if moment is not None else '',
+        str(pk) if pk is not None else '',
+    ])
+
+
+def decode_cursor(cursor):
+    parts = cursor.split(':')
+    if len(parts) != 5:
+        raise InvalidToken(cursor)
+    since, now, position, moment, pk = parts
+    try:
+        position = int(position)
+        pk = int(pk) if pk else None
+    except ValueError:
+        raise InvalidToken(cursor)
+    if not 0 <= position <= len(SYNC_MODELS) or bool(moment) != bool(pk):
+        raise InvalidToken(cursor)
+    return (
+        decode_token(since) if since else None,
+        decode_token(now),
+        position,
+        (decode_token(moment), pk) if moment else None,
+    )
+
+
+def serializer_class(model):
+    """Serializer plano (chaves estrangeiras como ids) do modelo."""
+    if model not in _serializers:
+        meta = type('Meta', (), {'model': model, 'fields': '__all__'})
+        _serializers[model] = type(
+            f'{model.__name__}SyncSerializer',
+            (serializers.ModelSerializer,), {'Meta': meta})
+    return _serializers[model]
+
+
+def _after(field, after):
+    """Filtro das linhas depois da chave (instante, pk) do cursor."""
+    moment, pk = after
+    return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'pk__gt': pk})
+
+
+def build_changes(user, token=None, cursor=None):
+    """
+    Retorna uma página das alterações dos dados do usuário desde o token,
+    ou a continuação indicada pelo cursor.
+
+    Uma consulta por modelo, restrita pelos índices (user, updated_at), e
+    uma consulta aos Tombstones, cada uma limitada ao que resta da página.
+    """
+    if cursor is not None:
+        since, now, position, after = decode_cursor(cursor)
+    else:
+        now = timezone.now()
+        since = None
+        if token is not None:
+            moment = decode_token(token)
+            since = moment - timedelta(seconds=settings.SYNC_WINDOW_SECONDS)
+        position, after = 0, None
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if since is not None and since < timezone.now() - retention:
+        raise ExpiredToken(token or cursor)
+
+    changes = {model._meta.label_lower: [] for model, _ in SYNC_MODELS}
+    deleted = {model._meta.label_lower: [] for model, _ in SYNC_MODELS}
+    remaining = settings.SYNC_PAGE_SIZE
+    next_cursor = None
+    sources = len(SYNC_MODELS) + (since is not None)
+    for index in range(position, sources):
+        if remaining == 0:
+            next_cursor = encode_cursor(since, now, index)
+            break
+
+        if index < len(SYNC_MODELS):
+            model, owner = SYNC_MODELS[index]
+            field = 'updated_at'
+            queryset = model.objects.filter(**{owner: user})
+            if since is not None:
+                queryset = queryset.filter(updated_at__gt=since)
+        else:
+            field = 'deleted_at'
+            queryset = Tombstone.objects.filter(
+                user=user, deleted_at__gt=since)
+        if after is not None and index == position:
+            queryset = queryset.filter(_after(field, after))
+        # Uma linha a mais indica que o modelo continua na próxima página
+        rows = list(queryset.order_by(field, 'pk')[:remaining + 1])
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                since, now, index, (getattr(last, field), last.pk))
+        remaining -= len(rows)
+
+        if index < len(SYNC_MODELS):
+            changes[model._meta.label_lower] = serializer_class(model)(
+                rows, many=True).data
+        else:
+            for tombstone in rows:
+                deleted.setdefault(tombstone.model, []).append(
+                    tombstone.object_id)
+        if next_cursor is not None:
+            break
+
+    return {
+        'token': encode_token(now),
+        'full': since is None,
+        'changes': changes,
+        'deleted': deleted,
+        'next': next_cursor,
+    }
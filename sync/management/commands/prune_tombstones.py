@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = ("Apaga os registros de exclusão mais antigos que a retenção "
+            "(SYNC_TOMBSTONE_RETENTION_DAYS)")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Dias de retenção')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        count, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} registro(s) de exclusão apagado(s)"))
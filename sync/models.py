@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Registro de exclusão de um objeto sincronizável.
+
+    Permite que o feed de alterações informe ao cliente quais objetos
+    foram removidos desde o último sync. Os registros antigos são apagados
+    pelo comando prune_tombstones.
+    """
+    # Sem constraint no banco: a exclusão de um usuário gera registros
+    # durante a cascata, que são apagados ao final (ver sync.signals)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING,
+        db_constraint=False, related_name='+')
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} ({self.deleted_at})"
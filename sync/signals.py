@@ -0,0 +1,69 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from dot_equilibrium import versioning
+
+from .feed import SYNC_MODELS
+from .models import Tombstone
+
+# Usuários em exclusão: os objetos removidos em cascata não precisam de
+# Tombstone, já que não haverá mais cliente para sincronizar
+_deleting = threading.local()
+
+
+def _deleting_users():
+    if not hasattr(_deleting, 'users'):
+        _deleting.users = set()
+    return _deleting.users
+
+
+@contextmanager
+def batch_tombstones():
+    """
+    Grava os Tombstones das exclusões feitas no bloco com um único INSERT
+    ao final, em vez de um por objeto. Deve envolver a exclusão dentro da
+    mesma transação.
+    """
+    if getattr(_deleting, 'tombstones', None) is not None:
+        # Bloco aninhado: o externo grava
+        yield
+        return
+    _deleting.tombstones = []
+    try:
+        yield
+        Tombstone.objects.bulk_create(_deleting.tombstones)
+    finally:
+        _deleting.tombstones = None
+
+
+def record_tombstone(sender, instance, **kwargs):
+    user_id = versioning.owner_id(instance)
+    if user_id is None or user_id in _deleting_users():
+        return
+    tombstone = Tombstone(user_id=user_id, model=sender._meta.label_lower,
+                          object_id=instance.pk)
+    batch = getattr(_deleting, 'tombstones', None)
+    if batch is not None:
+        batch.append(tombstone)
+    else:
+        tombstone.save()
+
+
+for model, _ in SYNC_MODELS:
+    post_delete.connect(record_tombstone, sender=model,
+                        dispatch_uid=f'sync-tombstone-{model._meta}')
+
+
+@receiver(pre_delete, sender=get_user_model())
+def remember_deleted_user(sender, instance, **kwargs):
+    _deleting_users().add(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model())
+def delete_user_tombstones(sender, instance, **kwargs):
+    _deleting_users().discard(instance.pk)
+    Tombstone.objects.filter(user_id=instance.pk).delete()
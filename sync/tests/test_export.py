@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance.models import Income, Objective
+from payroll.models import Employee
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='export@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def data(user):
+    for n in range(3):
+        Income.objects.create(
+            user=user, title=f"Receita {n}", value=Decimal("10.50"),
+            description="Teste", date=date(2024, 5, n + 1))
+    objective = Objective.objects.create(
+        user=user, title="Reserva", target_value=Decimal("1000.00"))
+    objective.add_deposit(Decimal("100.00"), "Primeiro")
+    Employee.objects.create(
+        user=user, name="José", role="Operador", salary=Decimal("2000.00"),
+        hiring_date=date(2023, 1, 1))
+    Income.objects.create(
+        user=User.objects.create_user(email='outro@example.com',
+                                      password='x'),
+        title="Alheia", value=Decimal("1.00"), description="",
+        date=date(2024, 5, 1))
+
+
+def content(response):
+    assert response.streaming
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+def test_export_ndjson(api_client, data):
+    response = api_client.get(reverse('sync-export'))
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert 'attachment' in response['Content-Disposition']
+
+    records = [json.loads(line) for line in content(response).splitlines()]
+    models = [record['model'] for record in records]
+    assert models.count('finance.income') == 3
+    assert models.count('finance.objectivedeposit') == 1
+    assert models.count('payroll.employee') == 1
+
+    income = records[0]['data']
+    assert income['title'] == "Receita 0"
+    assert income['value'] == "10.50"
+    assert income['date'] == "2024-05-01"
+    deposit = records[models.index('finance.objectivedeposit')]['data']
+    assert deposit['objective'] == Objective.objects.get().pk
+    assert records[models.index('payroll.employee')]['data']['name'] == (
+        "José")
+
+
+def test_export_csv_sections(api_client, data):
+    response = api_client.get(reverse('sync-export'), {'output': 'csv'})
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+
+    rows = list(csv.reader(io.StringIO(content(response))))
+    headers = [row for row in rows if row[0] == 'model']
+    assert [header[1] for header in headers] == ['id'] * 4
+    incomes = [row for row in rows if row[0] == 'finance.income']
+    assert len(incomes) == 3
+    header = rows[0]
+    assert dict(zip(header, incomes[0]))['value'] == "10.50"
+
+
+def test_export_invalid_output(api_client):
+    response = api_client.get(reverse('sync-export'), {'output': 'xml'})
+    assert response.status_code == 400
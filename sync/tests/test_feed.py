@@ -0,0 +1,217 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finance.models import Category, Expense, Income, Objective
+from payroll.models import Employee, PayrollPeriod, PayrollPeriodItem
+from sync.feed import encode_token
+from sync.models import Tombstone
+from sync.signals import batch_tombstones
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def no_window(settings):
+    settings.SYNC_WINDOW_SECONDS = 0
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='sync@example.com', password='testpass123')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def create_income(user, title):
+    return Income.objects.create(
+        user=user, title=title, value=Decimal("10.00"),
+        description="Teste", date=date(2024, 5, 1))
+
+
+def sync(api_client, token=None):
+    params = {'since': token} if token is not None else {}
+    response = api_client.get(reverse('sync-changes'), params)
+    assert response.status_code == 200
+    return response.data
+
+
+def test_full_sync_returns_all_user_data(user, api_client):
+    create_income(user, "Salário")
+    create_income(User.objects.create_user(
+        email='outro@example.com', password='x'), "Outro")
+    period = PayrollPeriod.objects.create(
+        user=user, name="Maio", start_date=date(2024, 5, 1),
+        end_date=date(2024, 5, 31))
+    employee = Employee.objects.create(
+        user=user, name="Ana", role="Operadora", salary=Decimal("2000.00"),
+        hiring_date=date(2023, 1, 1))
+    PayrollPeriodItem.objects.create(
+        period=period, employee=employee, amount=Decimal("100.00"))
+
+    data = sync(api_client)
+    assert data['full'] is True
+    assert [row['title'] for row in data['changes']['finance.income']] == [
+        "Salário"]
+    assert len(data['changes']['payroll.payrollperioditem']) == 1
+    assert data['changes']['payroll.payrollperioditem'][0]['period'] == (
+        period.pk)
+
+
+def test_incremental_sync_returns_changes_and_tombstones(user, api_client):
+    kept = create_income(user, "Mantida")
+    changed = create_income(user, "Alterada")
+    removed = create_income(user, "Removida")
+    token = sync(api_client)['token']
+
+    changed.title = "Alterada 2"
+    changed.save()
+    removed_id = removed.pk
+    removed.delete()
+    new = create_income(user, "Nova")
+
+    data = sync(api_client, token)
+    assert data['full'] is False
+    ids = [row['id'] for row in data['changes']['finance.income']]
+    assert ids == [changed.pk, new.pk]
+    assert kept.pk not in ids
+    assert data['deleted']['finance.income'] == [removed_id]
+
+    # Nada mudou desde o último token
+    data = sync(api_client, data['token'])
+    assert data['changes']['finance.income'] == []
+    assert data['deleted']['finance.income'] == []
+
+
+def test_cascade_and_balance_updates_are_tracked(user, api_client):
+    objective = Objective.objects.create(
+        user=user, title="Viagem", target_value=Decimal("1000.00"))
+    objective.add_deposit(Decimal("100.00"))
+    deposit_id = objective.deposits.get().pk
+    token = sync(api_client)['token']
+
+    # O depósito altera o saldo com um UPDATE direto
+    objective.add_deposit(Decimal("50.00"))
+    data = sync(api_client, token)
+    assert [row['current_value'] for row in
+            data['changes']['finance.objective']] == ['150.00']
+
+    objective_id = objective.pk
+    objective.delete()
+    data = sync(api_client, data['token'])
+    assert data['deleted']['finance.objective'] == [objective_id]
+    assert deposit_id in data['deleted']['finance.objectivedeposit']
+
+
+def test_category_deletion_sends_uncategorized_rows(user, api_client):
+    category = Category.objects.create(name="Mercado")
+    create_income(user, "Sem categoria")
+    expense = Expense.objects.create(
+        user=user, title="Feira", value=Decimal("30.00"),
+        description="Teste", date=date(2024, 5, 2), category=category)
+    token = sync(api_client)['token']
+
+    # O SET_NULL é um UPDATE direto, sem auto_now
+    category.delete()
+    data = sync(api_client, token)
+    assert data['changes']['finance.income'] == []
+    rows = data['changes']['finance.expense']
+    assert [(row['id'], row['category']) for row in rows] == [
+        (expense.pk, None)]
+
+
+def test_invalid_and_expired_tokens(api_client, settings):
+    url = reverse('sync-changes')
+    response = api_client.get(url, {'since': 'abc'})
+    assert response.status_code == 400
+
+    old = timezone.now() - timedelta(
+        days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    response = api_client.get(url, {'since': encode_token(old)})
+    assert response.status_code == 410
+
+
+def test_user_deletion_leaves_no_tombstones(user):
+    create_income(user, "Salário")
+    user.delete()
+    assert not Tombstone.objects.exists()
+
+
+def test_batch_tombstones_writes_one_insert(user):
+    incomes = [create_income(user, f"Receita {i}") for i in range(3)]
+    with CaptureQueriesContext(connection) as context, batch_tombstones():
+        for income in incomes:
+            pk = income.pk
+            income.delete()
+    inserts = [query for query in context.captured_queries
+               if query['sql'].startswith('INSERT INTO "sync_tombstone"')]
+    assert len(inserts) == 1
+    assert Tombstone.objects.filter(model='finance.income').count() == 3
+    assert Tombstone.objects.filter(object_id=pk).exists()
+
+
+def test_prune_tombstones(user):
+    income = create_income(user, "Salário")
+    income.delete()
+    Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=10))
+    call_command('prune_tombstones', days=30)
+    assert Tombstone.objects.count() == 1
+    call_command('prune_tombstones', days=5)
+    assert not Tombstone.objects.exists()
+
+
+def sync_pages(api_client, token=None):
+    """Segue os cursores `next` até a última página."""
+    pages = [sync(api_client, token)]
+    while pages[-1]['next'] is not None:
+        response = api_client.get(
+            reverse('sync-changes'), {'cursor': pages[-1]['next']})
+        assert response.status_code == 200
+        pages.append(response.data)
+    return pages
+
+
+def test_changes_are_paginated_with_a_cursor(user, api_client, settings):
+    settings.SYNC_PAGE_SIZE = 2
+    incomes = [create_income(user, f"Receita {n}") for n in range(3)]
+    objective = Objective.objects.create(
+        user=user, title="Viagem", target_value=Decimal("1000.00"))
+
+    pages = sync_pages(api_client)
+    assert {page['token'] for page in pages} == {pages[0]['token']}
+    assert all(page['full'] for page in pages)
+    assert [len(page['changes']['finance.income']) for page in pages[:2]] == [
+        2, 1]
+    ids = [row['id'] for page in pages
+           for row in page['changes']['finance.income']]
+    assert ids == [income.pk for income in incomes]
+    assert pages[1]['changes']['finance.objective'][0]['id'] == objective.pk
+
+    # Exclusões também contam no limite da página
+    removed = [income.pk for income in incomes]
+    for income in incomes:
+        income.delete()
+    pages = sync_pages(api_client, pages[0]['token'])
+    assert [page['deleted']['finance.income'] for page in pages] == [
+        removed[:2], removed[2:]]
+
+
+@pytest.mark.parametrize('cursor', ['abc', '1:2:3', ':1:99::', ':1:0:5:'])
+def test_invalid_cursor(api_client, cursor):
+    response = api_client.get(reverse('sync-changes'), {'cursor': cursor})
+    assert response.status_code == 400
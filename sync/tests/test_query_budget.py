@@ -0,0 +1,33 @@
+"""
+Número de consultas do feed de sincronização e da exportação: não pode
+crescer com a quantidade de linhas (1, 10 e 100).
+"""
+import pytest
+from django.urls import reverse
+
+from finance.factories import (IncomeFactory, ObjectiveDepositFactory,
+                               RecurringBillPaymentFactory)
+from payroll.factories import PayrollPeriodItemFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def seed(user):
+    def create(n):
+        IncomeFactory.create_batch(n, user=user)
+        ObjectiveDepositFactory.create_batch(n, objective__user=user)
+        RecurringBillPaymentFactory.create_batch(
+            n, recurring_bill__user=user)
+        PayrollPeriodItemFactory.create_batch(n, period__user=user)
+    return create
+
+
+def test_changes(query_budget, api_client, user):
+    query_budget(lambda: api_client.get(reverse('sync-changes')), seed(user))
+
+
+@pytest.mark.parametrize('output', ['ndjson', 'csv'])
+def test_export(query_budget, api_client, user, output):
+    query_budget(
+        lambda: api_client.get(reverse('sync-export'), {'output': output}),
+        seed(user))
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('changes/', views.changes, name='sync-changes'),
+    path('export/', views.export_data, name='sync-export'),
+]
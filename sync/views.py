@@ -0,0 +1,52 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import export, feed
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def changes(request):
+    """
+    Alterações dos dados do usuário desde o token `since`.
+
+    Sem `since`, devolve todos os dados (sync completo). A resposta traz o
+    token a ser enviado no próximo sync e, se houver mais páginas, o
+    cursor `next` a ser enviado em `cursor`.
+    """
+    try:
+        data = feed.build_changes(
+            request.user, request.query_params.get('since'),
+            cursor=request.query_params.get('cursor'))
+    except feed.InvalidToken:
+        return Response({'error': 'Invalid sync token'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    except feed.ExpiredToken:
+        return Response({'error': 'Sync token expired, full sync required'},
+                        status=status.HTTP_410_GONE)
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_data(request):
+    """
+    Exporta todos os dados do usuário em fluxo.
+
+    `output`: ndjson (padrão) ou csv.
+    """
+    output = request.query_params.get('output', 'ndjson')
+    if output not in export.FORMATS:
+        return Response({'error': 'Output must be ndjson or csv'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    generate, content_type = export.FORMATS[output]
+    response = StreamingHttpResponse(
+        generate(request.user), content_type=content_type)
+    filename = f"equilibrium-{timezone.now():%Y%m%d}.{output}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response